@@ -4,3 +4,10 @@ from django.apps import AppConfig
 class TravelAppConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'Travel_App'
+
+    def ready(self):
+        from django.db.backends.signals import connection_created
+
+        from . import signals  # noqa: F401
+        from .metrics import install_query_recorder
+        connection_created.connect(install_query_recorder, dispatch_uid='travel_app_query_metrics')
@@ -0,0 +1,87 @@
+"""
+Hot/archive split for closed travel requests.
+
+archive_closed_requests() (the ``archive_requests`` command) moves closed
+requests submitted more than settings.ARCHIVE_AFTER_DAYS days ago from
+Employee_Request to ArchivedRequest, under their original ids, one
+chunk per transaction. Their search tokens go with the live rows, and the
+RequestCounter totals drop by the requests moved, so status_summary,
+request_facets, export_requests and search cover live requests only.
+
+The dashboards and filter_sort_search read the live table unless the
+request asks for ``include_archived=1``; then the archive is queried as
+well and the two are merged (pagination.KeysetPagination.paginate_querysets).
+"""
+import logging
+from collections import Counter
+from datetime import date, timedelta
+
+from django.conf import settings
+from django.db import transaction
+
+from .changes import DELETE, log_changes
+from .counters import apply_deltas, record_change, snapshot
+from .models import ArchivedRequest, Employee_Request
+
+logger = logging.getLogger(__name__)
+
+ARCHIVED_STATUS = "Closed"
+ARCHIVE_COLUMNS = [field.attname for field in Employee_Request._meta.concrete_fields]
+TRUE_VALUES = ("1", "true", "yes")
+NOT_SEARCHABLE_MESSAGE = "include_archived can't be combined with q: archived requests are not in the search index"
+
+
+def include_archived(params):
+    """Whether the query parameters ask for archived requests too."""
+    return params.get("include_archived", "").strip().lower() in TRUE_VALUES
+
+
+def archive_cutoff(older_than_days=None, today=None):
+    if older_than_days is None:
+        older_than_days = getattr(settings, "ARCHIVE_AFTER_DAYS", 365)
+    return (today or date.today()) - timedelta(days=older_than_days)
+
+
+def archivable_requests(cutoff):
+    """Closed requests submitted before ``cutoff`` (served by req_admin_status_idx)."""
+    return Employee_Request.objects.filter(admin_status=ARCHIVED_STATUS, date_of_sub__lt=cutoff)
+
+
+def _archive_chunk(cutoff, chunk_size):
+    with transaction.atomic():
+        rows = list(archivable_requests(cutoff).select_for_update()
+                    .order_by("date_of_sub", "id").values(*ARCHIVE_COLUMNS)[:chunk_size])
+        if not rows:
+            return 0
+        ArchivedRequest.objects.bulk_create([ArchivedRequest(**row) for row in rows])
+        deltas = Counter()
+        for row in rows:
+            record_change(before=snapshot(row), deltas=deltas)
+        apply_deltas(deltas)
+        # Gone from the live dashboards, as far as delta sync is concerned
+        log_changes(rows, DELETE)
+        Employee_Request.objects.filter(id__in=[row["id"] for row in rows]).delete()
+    return len(rows)
+
+
+def archive_closed_requests(older_than_days=None, chunk_size=None, today=None):
+    """
+    Move closed requests older than ``older_than_days`` to the archive.
+
+    Each chunk of ``chunk_size`` requests is copied, counted out and
+    deleted in its own transaction, so locks stay short and an interrupted
+    run leaves every request in exactly one table. Returns the number moved.
+    """
+    cutoff = archive_cutoff(older_than_days, today)
+    if chunk_size is None:
+        chunk_size = getattr(settings, "ARCHIVE_CHUNK_SIZE", 500)
+    moved = 0
+    while True:
+        count = _archive_chunk(cutoff, chunk_size)
+        moved += count
+        if count:
+            logger.info(f"Archived {count} closed requests ({moved} so far).")
+        if count < chunk_size:
+            break
+    logger.info(f"Archived {moved} closed requests submitted before {cutoff}.")
+    return moved
@@ -0,0 +1,413 @@
+"""
+Async (ASGI) versions of the dashboards, filter_sort_search, the logins and
+the status-update endpoints, served under ``travel/async/``.
+
+They take the same parameters and return the same JSON as the views in
+views.py, but read through Django's async ORM so a request waiting on the
+database does not hold a worker thread. Writes run inside one
+``sync_to_async`` call (transactions are sync-only). The logins'
+authenticate() calls, which hash the password, run on a bounded thread
+pool (settings.ASYNC_HASH_WORKERS), so a burst of logins can't take every
+core. Mail never blocks a request: it is queued in the outbox in the write
+transaction, as in views.py.
+
+events is the Server-Sent Events stream of ticket status changes
+(events.py), which has no sync counterpart.
+"""
+import asyncio
+import contextvars
+import json
+import logging
+import math
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial, wraps
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import authenticate
+from django.db import close_old_connections, transaction
+from django.http import JsonResponse, StreamingHttpResponse
+from rest_framework import exceptions
+
+from .archive import NOT_SEARCHABLE_MESSAGE, include_archived
+from .authentication import aauthenticate, aissue_token
+from .changes import log_change
+from .budgets import query_budget
+from .counters import count_change, snapshot
+from .events import EventStream, parse_event_id, profile_channels, publish_status
+from .filters import filter_requests
+from .metrics import timed
+from .models import ArchivedRequest, Employee_Request
+from .outbox import enqueue_mail
+from .pagination import KeysetPagination, merge_ordered
+from .profiles import aresolve_claims, aresolve_profile
+from .projections import ADMIN_TABLE, EMPLOYEE_TABLE, MANAGER_TABLE
+from .throttling import LOGIN_THROTTLES, DashboardThrottle
+from .views import MANAGER_STATUSES
+
+logger = logging.getLogger(__name__)
+
+# PBKDF2 releases the GIL, so a few threads hash in parallel; the bound
+# keeps a login burst from starving everything else
+HASH_EXECUTOR = ThreadPoolExecutor(max_workers=getattr(settings, "ASYNC_HASH_WORKERS", 4),
+                                   thread_name_prefix="password-hash")
+
+
+def _error(exc):
+    response = JsonResponse({"detail": str(exc.detail)}, status=exc.status_code)
+    if isinstance(exc, exceptions.Throttled) and exc.wait is not None:
+        response["Retry-After"] = str(math.ceil(exc.wait))
+    return response
+
+
+async def _check_throttles(request, throttle_classes):
+    for throttle_class in throttle_classes:
+        throttle = throttle_class()
+        # Bucket stores may sit on a network cache
+        if not await sync_to_async(throttle.allow_request)(request, None):
+            raise exceptions.Throttled(throttle.wait())
+
+
+def async_api(methods, role=None, authenticated=True, throttles=()):
+    """
+    The async views' stand-in for @api_view/@permission_classes/@throttle_classes.
+
+    Checks the method, authenticates the token, resolves the profile (as
+    ``request.travel_profile``, so get_profile() works) and requires
+    ``role`` if given. API errors are rendered as DRF would.
+    """
+    def decorator(view):
+        @wraps(view)
+        async def wrapped(request, *args, **kwargs):
+            if request.method not in methods:
+                return JsonResponse({"detail": f'Method "{request.method}" not allowed.'}, status=405)
+            try:
+                if authenticated:
+                    result = await aauthenticate(request)
+                    if result is None:
+                        raise exceptions.NotAuthenticated()
+                    request.user, request.auth = result
+                    if isinstance(request.auth, dict):  # signed token, see profiles.resolve_claims
+                        request.travel_profile = await aresolve_claims(request.auth)
+                    else:
+                        request.travel_profile = await aresolve_profile(request.user)
+                    if role is not None and getattr(request.travel_profile, role) is None:
+                        raise exceptions.PermissionDenied()
+                await _check_throttles(request, throttles)
+                return await view(request, *args, **kwargs)
+            except exceptions.APIException as e:
+                return _error(e)
+        # Token-authenticated API, like the DRF views
+        wrapped.csrf_exempt = True
+        return wrapped
+    return decorator
+
+
+def _json_body(request):
+    try:
+        return json.loads(request.body)
+    except json.JSONDecodeError:
+        raise exceptions.ParseError("Invalid JSON format")
+
+
+async def table_page(request, queryset, projection, archived):
+    """One keyset page of a dashboard table, read with the async ORM; ``archived`` as in views.table_page."""
+    paginator = KeysetPagination()
+    querysets = [queryset, archived] if include_archived(request.GET) else [queryset]
+    pages = []
+    for qs in querysets:
+        pages.append([row async for row in paginator.page_queryset(projection.values(qs), request)])
+    page = paginator.finish_page(merge_ordered(pages, paginator.page_ordering)[:paginator.page_size + 1])
+    with timed("serialize"):
+        data = projection.render(page)
+    return JsonResponse(paginator.get_paginated_data(data))
+
+
+def _authenticate(request, username, password):
+    # HASH_EXECUTOR threads keep their DB connections between logins, so
+    # expire them as a request would
+    close_old_connections()
+    try:
+        return authenticate(request, username=username, password=password)
+    finally:
+        close_old_connections()
+
+
+async def _login(request, role):
+    data = _json_body(request)
+    username, password = data.get("username"), data.get("password")
+    if not isinstance(username, str) or not isinstance(password, str):
+        return JsonResponse({"status": "failed", "message": "username and password are required"}, status=400)
+
+    # Through the configured backends, so user_login_failed and the
+    # backends' own checks behave as in the sync logins
+    call = partial(contextvars.copy_context().run, _authenticate, request, username, password)
+    user = await asyncio.get_running_loop().run_in_executor(HASH_EXECUTOR, call)
+    profile = await aresolve_profile(user)
+    if user is None or getattr(profile, role) is None:
+        logger.warning(f"Failed async {role} login for username: {username}")
+        return JsonResponse({"status": "failed", "message": "Invalid credentials"}, status=401)
+    if role == "admin" and not profile.admin.is_admin:
+        return JsonResponse({"status": "failed", "message": "User is not an admin"}, status=403)
+
+    request.user = user
+    token = await aissue_token(user, role)
+    logger.info(f"{role.capitalize()} {user.username} logged in successfully.")
+    return JsonResponse({"status": "success", "token": token})
+
+
+@query_budget(3)
+@async_api(["POST"], authenticated=False, throttles=LOGIN_THROTTLES)
+async def employee_login(request):
+    return await _login(request, "employee")
+
+
+@query_budget(3)
+@async_api(["POST"], authenticated=False, throttles=LOGIN_THROTTLES)
+async def manager_login(request):
+    return await _login(request, "manager")
+
+
+@query_budget(3)
+@async_api(["POST"], authenticated=False, throttles=LOGIN_THROTTLES)
+async def admin_login(request):
+    return await _login(request, "admin")
+
+
+@query_budget(3)
+@async_api(["GET"], role="employee", throttles=[DashboardThrottle])
+async def employee_dashboard(request):
+    employee = request.travel_profile.employee
+    return await table_page(request, Employee_Request.objects.filter(employee=employee), EMPLOYEE_TABLE,
+                            ArchivedRequest.objects.filter(employee=employee))
+
+
+@query_budget(3)
+@async_api(["GET"], role="manager", throttles=[DashboardThrottle])
+async def manager_dashboard(request):
+    manager = request.travel_profile.manager
+    return await table_page(request, Employee_Request.objects.filter(manager=manager), MANAGER_TABLE,
+                            ArchivedRequest.objects.filter(manager=manager))
+
+
+@query_budget(3)
+@async_api(["GET"], role="admin", throttles=[DashboardThrottle])
+async def admin_dashboard(request):
+    return await table_page(request, Employee_Request.objects.all(), ADMIN_TABLE, ArchivedRequest.objects.all())
+
+
+@query_budget(3)
+@async_api(["GET"], throttles=[DashboardThrottle])
+async def filter_sort_search(request):
+    """Same filters and rows as views.filter_sort_search."""
+    queryset, ordering = filter_requests(request.GET)
+    querysets = [queryset]
+    if include_archived(request.GET):
+        if request.GET.get("q", "").strip():
+            return JsonResponse({"status": "failed", "message": NOT_SEARCHABLE_MESSAGE}, status=400)
+        querysets.append(filter_requests(request.GET, ArchivedRequest.objects.all())[0])
+    sort_columns = [field.lstrip("-") for field in ordering]
+    tables = []
+    for qs in querysets:
+        tables.append([row async for row in EMPLOYEE_TABLE.values(qs.order_by(*ordering), extra=sort_columns)])
+    rows = merge_ordered(tables, ordering)
+    with timed("serialize"):
+        data = EMPLOYEE_TABLE.render(rows)
+    return JsonResponse(data, safe=False)
+
+
+class Rejected(Exception):
+    """A check on the locked ticket failed; ``response`` is sent instead of the write."""
+
+    def __init__(self, response):
+        super().__init__(response.status_code)
+        self.response = response
+
+
+def _reject(status, message, data=None):
+    return Rejected(JsonResponse({"status": "error", "message": message, "data": data}, status=status))
+
+
+def _locked_ticket(ticket_id, not_found="Ticket not found"):
+    # The row as it is now, locked until the transaction ends; the checks run on this
+    try:
+        return Employee_Request.objects.select_for_update().select_related("employee").get(id=ticket_id)
+    except (Employee_Request.DoesNotExist, ValueError, TypeError):
+        raise _reject(404, not_found)
+
+
+def _save_status_change(ticket_id, check, message, from_email, not_found="Ticket not found"):
+    """
+    Sync: lock the ticket and pass it to ``check``, which raises Rejected or
+    returns the changes to make; the ticket, its counters and the mail
+    ``message(ticket)`` then commit together.
+    """
+    with transaction.atomic():
+        ticket = _locked_ticket(ticket_id, not_found)
+        changes = check(ticket)
+        before = snapshot(ticket)
+        for field, value in changes.items():
+            setattr(ticket, field, value)
+        ticket.save()
+        count_change(before, snapshot(ticket))
+        log_change(ticket)
+        publish_status(ticket)
+        enqueue_mail("Travel Request Status Update", message(ticket), from_email, [ticket.employee.email])
+    return ticket
+
+
+@query_budget(9)
+@async_api(["PUT"], role="manager")
+async def manager_status_update(request):
+    """
+    views.manager_status_update for async servers. The manager is the caller;
+    a ``manager_id`` in the body is ignored.
+    """
+    data = _json_body(request)
+    ticket_id = data.get("ticket_id")
+    manager_status = data.get("manager_status")
+    manager = request.travel_profile.manager
+
+    def check(ticket):
+        if ticket.manager_id != manager.id:
+            logger.warning(f"Unauthorized status update attempt by manager {manager.id} for ticket {ticket_id}")
+            raise _reject(403, "Unauthorized: You can only manage requests assigned to you")
+        if manager_status not in MANAGER_STATUSES:
+            raise _reject(400, f"Invalid status. Choose from {', '.join(MANAGER_STATUSES)}.")
+        return {"manager_status": manager_status, "manager_note": data.get("feedback", "")}
+
+    try:
+        ticket = await sync_to_async(_save_status_change)(
+            ticket_id, check,
+            lambda ticket: f"Your travel request with ID {ticket.id} has been updated to {manager_status}.",
+            "manager@example.com")
+    except Rejected as e:
+        return e.response
+
+    logger.info(f"Manager {manager.id} updated status of ticket {ticket_id} to {manager_status}")
+    return JsonResponse({"data": {"ticket_id": ticket.id, "employee_id": ticket.employee_id,
+                                  "manager_id": ticket.manager_id, "manager_status": ticket.manager_status,
+                                  "manager_note": ticket.manager_note}}, status=200)
+
+
+@query_budget(9)
+@async_api(["POST"], role="admin")
+async def admin_status_update(request):
+    """views.admin_status_update for async servers."""
+    data = _json_body(request)
+    ticket_id = data.get("ticket_id")
+    user_role = data.get("user_role")
+    status_update = data.get("status_update")
+    feedback = data.get("feedback", "")
+
+    def check(ticket):
+        if user_role == "Manager":
+            if str(ticket.manager_id) != str(data.get("user_id")):
+                raise _reject(403, "Unauthorized: You can only update requests assigned to you")
+            changes = {"manager_note": feedback}
+        elif user_role == "Admin":
+            changes = {"admin_note": feedback}
+        else:
+            raise _reject(403, 'Invalid role. Only "Manager" or "Admin" allowed.')
+        if status_update not in ["Approved", "Canceled", "Pending"]:
+            raise _reject(400, "Invalid status. Choose from Approved, Canceled, or Pending.")
+        return {**changes, "manager_status": status_update}
+
+    try:
+        ticket = await sync_to_async(_save_status_change)(
+            ticket_id, check,
+            lambda ticket: f"Your travel request with ID {ticket.id} has been updated to {status_update}.",
+            "indulekshmi@example.com", not_found="Request not found")
+    except Rejected as e:
+        return e.response
+
+    logger.info(f"Status of ticket {ticket_id} updated to {status_update} by {user_role} {data.get('user_id')}")
+    return JsonResponse({"data": {"ticket_id": ticket.id, "employee_id": ticket.employee_id,
+                                  "manager_id": ticket.manager_id, "manager_status": ticket.manager_status,
+                                  "manager_note": ticket.manager_note, "admin_note": ticket.admin_note}}, status=200)
+
+
+def _close(ticket_id, admin_note):
+    """
+    Sync: close the ticket, or only update the note of one already closed;
+    ``(ticket, closed)``. The checks run on the locked row.
+    """
+    with transaction.atomic():
+        ticket = _locked_ticket(ticket_id)
+        if ticket.manager_status != "Approved":
+            raise _reject(400, "Only approved requests can be closed",
+                          {"ticket_id": ticket.id, "manager_status": ticket.manager_status,
+                           "admin_status": ticket.admin_status})
+        if ticket.admin_status == "Closed":
+            if not admin_note:
+                raise _reject(400, "Admin note is required for closed tickets")
+            ticket.admin_note = admin_note
+            ticket.save(update_fields=["admin_note", "updated_at"])
+            log_change(ticket)
+            publish_status(ticket)
+            return ticket, False
+
+        before = snapshot(ticket)
+        ticket.admin_status = "Closed"
+        ticket.admin_note = admin_note or "No additional notes."
+        ticket.save()
+        count_change(before, snapshot(ticket))
+        log_change(ticket)
+        publish_status(ticket)
+        enqueue_mail("Travel Request Closed",
+                     f"Your travel request with ID {ticket.id} has been closed. Note: {ticket.admin_note}",
+                     "admin@example.com", [ticket.employee.email])
+    return ticket, True
+
+
+@query_budget(11)
+@async_api(["POST"], role="admin")
+async def close_ticket(request):
+    """views.close_ticket for async servers."""
+    data = _json_body(request)
+    admin_note = (data.get("admin_note") or "").strip()
+
+    try:
+        ticket, closed = await sync_to_async(_close)(data.get("ticket_id"), admin_note)
+    except Rejected as e:
+        return e.response
+
+    if not closed:
+        return JsonResponse({"status": "success", "message": "Admin note updated for closed ticket",
+                             "data": {"ticket_id": ticket.id, "admin_status": ticket.admin_status,
+                                      "admin_note": ticket.admin_note}}, status=200)
+    return JsonResponse({"status": "success", "message": "Ticket closed successfully",
+                         "data": {"ticket_id": ticket.id, "employee_id": ticket.employee_id,
+                                  "manager_id": ticket.manager_id, "manager_status": ticket.manager_status,
+                                  "admin_status": ticket.admin_status, "admin_note": ticket.admin_note}}, status=200)
+
+
+@query_budget(2)
+@async_api(["GET"])
+async def events(request):
+    """
+    Server-Sent Events stream of status changes to the caller's tickets
+    (events.py). Needs an ASGI server: under WSGI it would hold a worker
+    thread for as long as it is open.
+
+    Resumes after the ``Last-Event-ID`` header, or the ``last_event_id``
+    parameter for clients that can't set headers. ``stream_seconds`` ends
+    the stream early, up to settings.EVENTS_STREAM_SECONDS.
+    """
+    channels = profile_channels(request.travel_profile)
+    if not channels:
+        raise exceptions.PermissionDenied("Only employees and managers receive ticket events")
+    last_event_id = parse_event_id(request.headers.get("Last-Event-ID", request.GET.get("last_event_id")))
+    stream_seconds = getattr(settings, "EVENTS_STREAM_SECONDS", 300)
+    try:
+        stream_seconds = min(max(float(request.GET.get("stream_seconds", stream_seconds)), 0), stream_seconds)
+    except ValueError:
+        return JsonResponse({"status": "failed", "message": "stream_seconds must be a number"}, status=400)
+
+    response = StreamingHttpResponse(EventStream(channels, last_event_id, stream_seconds),
+                                     content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    # Don't let a proxy hold the events back
+    response["X-Accel-Buffering"] = "no"
+    logger.info(f"User {request.user.id} subscribed to {', '.join(channels)} from event {last_event_id}")
+    return response
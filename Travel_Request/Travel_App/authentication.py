@@ -0,0 +1,169 @@
+import secrets
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core import signing
+from rest_framework import exceptions
+from rest_framework.authentication import BaseAuthentication, TokenAuthentication, get_authorization_header
+from rest_framework.authtoken.models import Token
+
+from .profiles import PROFILE_RELATIONS
+
+SIGNED_TOKEN_SALT = "Travel_App.authentication.SignedTokenAuthentication"
+
+
+class RevocationList:
+    """
+    In-process set of revoked signed-token ids.
+
+    Entries are dropped once the token would have expired anyway, so the set
+    only ever holds tokens that are still inside their lifetime. Each worker
+    process keeps its own list.
+    """
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def revoke(self, token_id, expires_at):
+        with self._lock:
+            self._entries[token_id] = expires_at
+
+    def is_revoked(self, token_id):
+        now = time.time()
+        with self._lock:
+            expires_at = self._entries.get(token_id)
+            if expires_at is not None and expires_at < now:
+                del self._entries[token_id]
+                return False
+            if len(self._entries) > 1024:
+                self._purge(now)
+            return expires_at is not None
+
+    def _purge(self, now):
+        for token_id in [k for k, exp in self._entries.items() if exp < now]:
+            del self._entries[token_id]
+
+    def __len__(self):
+        return len(self._entries)
+
+
+revoked_tokens = RevocationList()
+
+
+def issue_signed_token(user, role, ttl=None):
+    """Return an HMAC-signed token carrying the user id, role and expiry."""
+    ttl = ttl if ttl is not None else settings.SIGNED_TOKEN_TTL
+    payload = {
+        "uid": user.pk,
+        "usr": user.username,
+        "role": role,
+        "exp": int(time.time()) + ttl,
+        "jti": secrets.token_urlsafe(8),
+    }
+    return signing.dumps(payload, salt=SIGNED_TOKEN_SALT)
+
+
+def issue_token(user, role):
+    """Token handed out by the login views: signed if enabled, else a DRF Token key."""
+    if settings.SIGNED_AUTH_TOKENS:
+        return issue_signed_token(user, role)
+    token, created = Token.objects.get_or_create(user=user)
+    return token.key
+
+
+async def aissue_token(user, role):
+    """issue_token() for async views."""
+    if settings.SIGNED_AUTH_TOKENS:
+        return issue_signed_token(user, role)
+    token, created = await Token.objects.aget_or_create(user=user)
+    return token.key
+
+
+async def aauthenticate(request):
+    """
+    The async views' counterpart of the DRF authentication classes.
+
+    Accepts the same ``Authorization: Token ...`` header. Signed tokens are
+    verified in process; DRF token keys are looked up together with the
+    user's profile rows. Returns ``(user, auth)`` or None when no token was
+    sent, and raises AuthenticationFailed for a bad one.
+    """
+    auth = get_authorization_header(request).split()
+    if len(auth) != 2 or auth[0].lower() != b"token":
+        return None
+    try:
+        key = auth[1].decode()
+    except UnicodeError:
+        raise exceptions.AuthenticationFailed("Invalid token header.")
+    if ":" in key:
+        return SignedTokenAuthentication().authenticate_credentials(key)
+
+    relations = ["user"] + [f"user__{name}" for name in PROFILE_RELATIONS]
+    try:
+        token = await Token.objects.select_related(*relations).aget(key=key)
+    except Token.DoesNotExist:
+        raise exceptions.AuthenticationFailed("Invalid token.")
+    if not token.user.is_active:
+        raise exceptions.AuthenticationFailed("User inactive or deleted.")
+    return (token.user, token)
+
+
+class ProfileTokenAuthentication(TokenAuthentication):
+    """
+    TokenAuthentication that loads the user's Employee/Manager/Admin row in
+    the same query as the token, so profiles.get_profile() needs no query.
+    """
+
+    def authenticate_credentials(self, key):
+        model = self.get_model()
+        relations = ["user"] + [f"user__{name}" for name in PROFILE_RELATIONS]
+        try:
+            token = model.objects.select_related(*relations).get(key=key)
+        except model.DoesNotExist:
+            raise exceptions.AuthenticationFailed("Invalid token.")
+        if not token.user.is_active:
+            raise exceptions.AuthenticationFailed("User inactive or deleted.")
+        return (token.user, token)
+
+
+class SignedTokenAuthentication(BaseAuthentication):
+    """
+    Verify ``Authorization: Token <signed token>`` without touching the database.
+
+    Plain DRF token keys (no ``:`` separator) are left for TokenAuthentication.
+    ``request.auth`` is the decoded payload; ``request.user`` is an unsaved
+    User carrying only the id and username from the token.
+    """
+    keyword = "Token"
+
+    def authenticate(self, request):
+        auth = get_authorization_header(request).split()
+        if len(auth) != 2 or auth[0].lower() != self.keyword.lower().encode():
+            return None
+        try:
+            key = auth[1].decode()
+        except UnicodeError:
+            return None
+        if ":" not in key:
+            return None
+        return self.authenticate_credentials(key)
+
+    def authenticate_credentials(self, key):
+        try:
+            payload = signing.loads(key, salt=SIGNED_TOKEN_SALT)
+        except signing.BadSignature:
+            raise exceptions.AuthenticationFailed("Invalid token.")
+        if payload["exp"] < time.time():
+            raise exceptions.AuthenticationFailed("Token has expired.")
+        if revoked_tokens.is_revoked(payload["jti"]):
+            raise exceptions.AuthenticationFailed("Token has been revoked.")
+
+        user = User(id=payload["uid"], username=payload["usr"], is_active=True)
+        user._state.adding = False
+        return (user, payload)
+
+    def authenticate_header(self, request):
+        return self.keyword
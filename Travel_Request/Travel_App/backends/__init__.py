@@ -0,0 +1,6 @@
+# Django's database backends with pooled connections, see pooled.py.
+# Maps each stock engine to its pooled counterpart.
+POOLED_ENGINES = {
+    "django.db.backends.mysql": "Travel_App.backends.mysql",
+    "django.db.backends.sqlite3": "Travel_App.backends.sqlite3",
+}
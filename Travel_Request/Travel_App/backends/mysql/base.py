@@ -0,0 +1,10 @@
+from django.db.backends.mysql import base
+
+from ..pooled import PooledDatabaseWrapperMixin
+
+
+class DatabaseWrapper(PooledDatabaseWrapperMixin, base.DatabaseWrapper):
+    """MySQL with pooled connections: ENGINE = 'Travel_App.backends.mysql'."""
+
+    def ping(self, raw):
+        raw.ping()
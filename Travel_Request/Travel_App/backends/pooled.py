@@ -0,0 +1,78 @@
+from ..pool import ConnectionPool, get_pool
+
+POOL_DEFAULTS = {
+    "MIN_SIZE": 0,
+    "MAX_SIZE": 10,
+    "MAX_LIFETIME": 1800,  # seconds a connection is reused before it is replaced
+    "TIMEOUT": 5.0,  # seconds a checkout waits for a free connection
+    "HEALTH_CHECK": True,  # ping idle connections on checkout
+}
+
+
+def pool_key(conn_params):
+    """A comparable identity for the database ``conn_params`` connect to."""
+    return repr(sorted(conn_params.items()))
+
+
+class PooledDatabaseWrapperMixin:
+    """
+    Take raw connections from a per-process ConnectionPool instead of
+    opening one per request, and hand them back instead of closing them.
+
+    Configure with a ``POOL`` dict in the database settings (see
+    POOL_DEFAULTS). Keep CONN_MAX_AGE at 0: Django then "closes" the
+    connection after every request, which returns it to the pool.
+
+    ping() runs ``SELECT 1`` for the health check; engines with a cheaper
+    native check override it.
+    """
+
+    def ping(self, raw):
+        """Raise if the raw DB-API connection ``raw`` no longer works."""
+        cursor = raw.cursor()
+        try:
+            cursor.execute("SELECT 1")
+        finally:
+            cursor.close()
+
+    def pool_options(self):
+        return {**POOL_DEFAULTS, **self.settings_dict.get("POOL", {})}
+
+    def _create_pool(self, conn_params):
+        options = self.pool_options()
+        pool = ConnectionPool(
+            lambda: super(PooledDatabaseWrapperMixin, self).get_new_connection(conn_params),
+            check=self.ping if options["HEALTH_CHECK"] else None,
+            min_size=options["MIN_SIZE"],
+            max_size=options["MAX_SIZE"],
+            max_lifetime=options["MAX_LIFETIME"],
+            timeout=options["TIMEOUT"],
+            name=self.alias,
+        )
+        pool.fill()
+        return pool
+
+    def _pool_for(self, conn_params):
+        # Keyed on the parameters, so a changed settings_dict (the test
+        # database, throwaway_database()) never reuses the old pool
+        return get_pool(self.alias, lambda: self._create_pool(conn_params), key=pool_key(conn_params))
+
+    @property
+    def pool(self):
+        return self._pool_for(self.get_connection_params())
+
+    def get_new_connection(self, conn_params):
+        return self._pool_for(conn_params).acquire()
+
+    def _close(self):
+        if self.connection is None:
+            return
+        with self.wrap_database_errors:
+            discard = False
+            if self.in_atomic_block or not self.get_autocommit():
+                # Never hand out a connection with a transaction still open
+                try:
+                    self.connection.rollback()
+                except self.Database.Error:
+                    discard = True
+            self.pool.release(self.connection, discard=discard)
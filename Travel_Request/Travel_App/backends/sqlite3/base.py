@@ -0,0 +1,12 @@
+from django.db.backends.sqlite3 import base
+
+from ..pooled import PooledDatabaseWrapperMixin
+
+
+class DatabaseWrapper(PooledDatabaseWrapperMixin, base.DatabaseWrapper):
+    """
+    SQLite with pooled connections: ENGINE = 'Travel_App.backends.sqlite3'.
+
+    For local runs against a database file; in-memory databases are never
+    closed by Django and gain nothing from the pool.
+    """
@@ -0,0 +1,6 @@
+"""
+Benchmark helpers for the travel request app.
+
+Everything in here runs against a throwaway test database (see
+``db.throwaway_database``) so a benchmark never touches real tickets.
+"""
@@ -0,0 +1,36 @@
+import time
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from ..authentication import SignedTokenAuthentication, issue_signed_token
+
+
+def _measure(authenticator, header, iterations):
+    factory = APIRequestFactory()
+    requests = [Request(factory.get("/", HTTP_AUTHORIZATION=header)) for _ in range(iterations)]
+    with CaptureQueriesContext(connection) as queries:
+        started = time.perf_counter()
+        for request in requests:
+            authenticator.authenticate(request)
+        elapsed = time.perf_counter() - started
+    return {
+        "us_per_request": round(elapsed * 1e6 / iterations, 2),
+        "queries_per_request": len(queries) / iterations,
+    }
+
+
+def compare_authentication(iterations=5000):
+    """Per-request cost of DRF TokenAuthentication against SignedTokenAuthentication."""
+    user = User.objects.create(username="bench_auth_user")
+    token = Token.objects.create(user=user)
+    return {
+        "TokenAuthentication": _measure(TokenAuthentication(), f"Token {token.key}", iterations),
+        "SignedTokenAuthentication": _measure(
+            SignedTokenAuthentication(), f"Token {issue_signed_token(user, 'employee')}", iterations),
+    }
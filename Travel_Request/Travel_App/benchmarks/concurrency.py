@@ -0,0 +1,122 @@
+import asyncio
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.asgi import get_asgi_application
+from django.core.handlers.wsgi import WSGIHandler
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.test import RequestFactory
+
+
+def _summary(latencies, elapsed, statuses):
+    latencies = sorted(latencies)
+    return {
+        "requests": len(latencies),
+        "rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies) * 1000, 1),
+        "p95_ms": round(latencies[int(len(latencies) * 0.95) - 1] * 1000, 1),
+        "errors": sum(1 for status in statuses if status >= 400),
+    }
+
+
+def run_wsgi(path, token, clients, threads):
+    """
+    ``clients`` simultaneous GETs against the WSGI handler, served by a
+    pool of ``threads`` worker threads (a threaded WSGI server).
+    """
+    handler = WSGIHandler()
+    factory = RequestFactory()
+
+    def call(submitted):
+        environ = factory.get(path, HTTP_AUTHORIZATION=f"Token {token}").environ
+        statuses = []
+        body = handler(environ, lambda status, headers: statuses.append(int(status.split()[0])))
+        b"".join(body)
+        body.close()
+        return time.perf_counter() - submitted, statuses[0]
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        results = list(pool.map(call, [started] * clients))
+    return _summary([r[0] for r in results], time.perf_counter() - started, [r[1] for r in results])
+
+
+async def _asgi_call(app, path, token):
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": path, "raw_path": path.encode(), "query_string": b"", "root_path": "",
+        "headers": [(b"host", b"testserver"), (b"authorization", f"Token {token}".encode())],
+        "client": ("127.0.0.1", 50000), "server": ("testserver", 80),
+    }
+    sent_body = False
+    status = []
+
+    async def receive():
+        nonlocal sent_body
+        if not sent_body:
+            sent_body = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await asyncio.Future()  # the client never disconnects early
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            status.append(message["status"])
+
+    started = time.perf_counter()
+    await app(scope, receive, send)
+    return time.perf_counter() - started, status[0]
+
+
+def run_asgi(path, token, clients):
+    """``clients`` simultaneous GETs against the ASGI application, as an ASGI server would issue them."""
+    app = get_asgi_application()
+
+    async def burst():
+        return await asyncio.gather(*[_asgi_call(app, path, token) for _ in range(clients)])
+
+    started = time.perf_counter()
+    results = asyncio.run(burst())
+    return _summary([r[0] for r in results], time.perf_counter() - started, [r[1] for r in results])
+
+
+class _QueryLatency:
+    """Sleep ``ms`` per query on every connection, standing in for a networked database."""
+
+    def __init__(self, ms):
+        self.seconds = ms / 1000
+
+    def __call__(self, execute, sql, params, many, context):
+        time.sleep(self.seconds)
+        return execute(sql, params, many, context)
+
+    def install(self, sender=None, connection=None, **kwargs):
+        if self not in connection.execute_wrappers:
+            connection.execute_wrappers.append(self)
+
+    def __enter__(self):
+        if not self.seconds:
+            return self
+        connection_created.connect(self.install)
+        for connection in connections.all(initialized_only=True):
+            self.install(connection=connection)
+        return self
+
+    def __exit__(self, *exc):
+        connection_created.disconnect(self.install)
+
+
+def compare_servers(token, clients=500, wsgi_threads=32, db_latency_ms=0):
+    """
+    Throughput and latency of the same dashboard under WSGI and ASGI.
+
+    WSGI runs the sync view on ``wsgi_threads`` threads. ASGI runs the async
+    view and, for reference, the sync view through Django's async adapter.
+    """
+    with _QueryLatency(db_latency_ms):
+        return {
+            "wsgi_sync_view": run_wsgi("/travel/employee_dashboard/", token, clients, wsgi_threads),
+            "asgi_async_view": run_asgi("/travel/async/employee_dashboard/", token, clients),
+            "asgi_sync_view": run_asgi("/travel/employee_dashboard/", token, clients),
+        }
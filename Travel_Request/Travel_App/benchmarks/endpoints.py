@@ -0,0 +1,314 @@
+import statistics
+import time
+import tracemalloc
+from datetime import date
+
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection, transaction
+from django.test import Client
+from django.urls import URLPattern, URLResolver, resolve
+from rest_framework.authtoken.models import Token
+
+from .. import urls as app_urls
+from ..metrics import TRANSACTION_SQL
+from ..models import Admin, Employee, Employee_Request, Manager
+from .seed import SEED_PASSWORD
+
+URL_PREFIX = "/travel/"
+SEARCH_QUERY = "manager_status=Approved&sort_field=date_of_sub&sort_order=desc"
+CALENDAR_WINDOW = "start=2024-06-03&end=2024-06-16"
+
+# Relative slack before a slower p50/p95/p99 or higher peak memory counts
+# as a regression, and the absolute changes below which it is noise
+DEFAULT_TOLERANCE = 0.2
+NOISE_FLOOR_MS = 1.0
+NOISE_FLOOR_KB = 64
+
+
+class _Rollback(Exception):
+    pass
+
+
+def bench_fixtures():
+    """
+    Ids and tokens the route cases need, from the data seed() created.
+
+    Adds two tickets in a known state (pending, and approved but open) and
+    an unreferenced manager and employee, so the write cases don't depend
+    on the random seed.
+    """
+    employee = Employee.objects.select_related("manager").get(username="bench_emp0")
+    manager = employee.manager
+    admin = Admin.objects.select_related("user_auth").get(username="bench_admin")
+    base = dict(employee=employee, manager=manager, purpose="Bench trip", from_loc="Kochi", to_loc="Delhi",
+                travel_mode="Flight", from_date=date(2025, 3, 1), to_date=date(2025, 3, 4),
+                additional_request="", manager_note="", admin_note="", no_of_resub=1)
+    pending = Employee_Request.objects.create(**base)
+    approved = Employee_Request.objects.create(**base, manager_status="Approved")
+    # Nothing references these, so the delete cases succeed
+    spare_manager = Manager.objects.create(
+        username="bench_spare_mgr", first_name="Spare", last_name="Manager", email="spare_mgr@bench.example.com",
+        user_auth=User.objects.create(username="bench_spare_mgr", password=admin.user_auth.password))
+    spare_employee = Employee.objects.create(
+        username="bench_spare_emp", first_name="Spare", last_name="Employee", manager=manager,
+        email="spare_emp@bench.example.com",
+        user_auth=User.objects.create(username="bench_spare_emp", password=admin.user_auth.password))
+    tokens = {
+        role: Token.objects.get_or_create(user_id=profile.user_auth_id)[0].key
+        for role, profile in (("employee", employee), ("manager", manager), ("admin", admin))
+    }
+    return {
+        "tokens": tokens,
+        "employee": employee,
+        "manager": manager,
+        "pending_id": pending.id,
+        "approved_id": approved.id,
+        "manager_ticket_ids": list(Employee_Request.objects.filter(manager=manager)
+                                   .values_list("id", flat=True)[:50]),
+        "spare_manager_id": spare_manager.id,
+        "spare_employee_id": spare_employee.id,
+    }
+
+
+def _import_csv(count=20):
+    lines = ["username,first_name,last_name,email,password,manager_username"]
+    lines += [f"bench_import{i},Import,Person{i},bench_import{i}@bench.example.com,{SEED_PASSWORD},bench_mgr0"
+              for i in range(count)]
+    return "\n".join(lines)
+
+
+def route_cases(fx):
+    """
+    One request per route in Travel_App/urls.py: ``(name, method, path, role, data)``.
+
+    ``role`` picks the token sent (None: anonymous). Dicts are sent as JSON
+    except for import_people, which is a multipart upload.
+    """
+    employee, manager = fx["employee"], fx["manager"]
+    login = {"username": employee.username, "password": SEED_PASSWORD}
+    manager_login = {"username": manager.username, "password": SEED_PASSWORD}
+    admin_login = {"username": "bench_admin", "password": SEED_PASSWORD}
+    new_request = {"purpose": "Bench", "from_loc": "Kochi", "to_loc": "Pune", "travel_mode": "Train",
+                   "from_date": "2025-05-01", "to_date": "2025-05-03"}
+    person = {"username": "bench_new", "first_name": "New", "last_name": "Person",
+              "email": "bench_new@bench.example.com", "password": SEED_PASSWORD}
+    manager_decision = {"ticket_id": fx["pending_id"], "manager_status": "Approved", "feedback": "ok"}
+    admin_decision = {"ticket_id": fx["pending_id"], "user_role": "Admin", "user_id": 0,
+                      "status_update": "Approved", "feedback": "ok"}
+    close = {"ticket_id": fx["approved_id"], "admin_note": "done"}
+    return [
+        ("admin_login", "post", "admin_login/", None, admin_login),
+        ("add_admin", "post", "admin/", None, {**person, "date_in": "2025-01-01"}),
+        ("employee_login", "post", "employee_login/", None, login),
+        ("employee_dashboard", "get", "employee_dashboard/", "employee", None),
+        ("new_travel_request", "post", "new_travel_request/", "employee", new_request),
+        ("edit_travel_request", "put", f"edit_travel_request/{fx['pending_id']}/", "employee", {"purpose": "Edited"}),
+        ("delete_travel_request", "delete", f"delete_travel_request/{fx['pending_id']}/", "employee", None),
+        ("manager_login", "post", "manager_login/", None, manager_login),
+        ("manager_dashboard", "get", "manager_dashboard/", "manager", None),
+        ("filter_sort_search", "get", f"filter_sort_search/?{SEARCH_QUERY}", "admin", None),
+        ("filter_sort_search_archived", "get", f"filter_sort_search/?{SEARCH_QUERY}&include_archived=1", "admin",
+         None),
+        ("request_facets", "get", "request_facets/?admin_status=Not_closed", "admin", None),
+        ("request_changes", "get", "changes/?since=0", "manager", None),
+        ("travel_calendar", "get", f"travel_calendar/?{CALENDAR_WINDOW}", "admin", None),
+        ("travel_occupancy", "get", f"travel_occupancy/?{CALENDAR_WINDOW}", "admin", None),
+        ("status_summary", "get", "status_summary/", "manager", None),
+        ("export_requests", "get", "export_requests/?output=csv&manager_status=Pending", "admin", None),
+        ("manager_status_update", "put", "manager_status_update/", "manager",
+         {**manager_decision, "manager_id": manager.id}),
+        ("manager_bulk_status_update", "put", "manager_bulk_status_update/", "manager",
+         {"ticket_ids": fx["manager_ticket_ids"], "manager_status": "Approved"}),
+        ("admin_dashboard", "get", "admin_dashboard/", "admin", None),
+        ("admin_dashboard_archived", "get", "admin_dashboard/?include_archived=1", "admin", None),
+        ("add_manager", "post", "add_manager/", "admin", {**person, "date_of_joining": "2025-01-01"}),
+        ("edit_manager", "put", f"edit_manager/{fx['spare_manager_id']}/", "admin", {"last_name": "Edited"}),
+        ("delete_manager", "delete", f"delete_manager/{fx['spare_manager_id']}/", "admin", None),
+        ("add_employee", "post", "add_employee/", "admin",
+         {**person, "manager_id": manager.id, "date_in": "2025-01-01"}),
+        ("import_people", "post", "import_people/", "admin", {"kind": "employee", "csv": _import_csv()}),
+        ("edit_employee", "put", f"edit_employee/{fx['spare_employee_id']}/", "admin", {"last_name": "Edited"}),
+        ("delete_employee", "delete", f"delete_employee/{fx['spare_employee_id']}/", "admin", None),
+        ("admin_status_update", "post", "admin_status_update/", "admin", admin_decision),
+        ("close_ticket", "post", "close_ticket/", "admin", close),
+        ("list_employees", "get", "list_employees/", "admin", None),
+        ("list_managers", "get", "list_managers/", "admin", None),
+        ("logout", "post", "logout/", "employee", None),
+        ("async_employee_login", "post", "async/employee_login/", None, login),
+        ("async_manager_login", "post", "async/manager_login/", None, manager_login),
+        ("async_admin_login", "post", "async/admin_login/", None, admin_login),
+        ("async_employee_dashboard", "get", "async/employee_dashboard/", "employee", None),
+        ("async_manager_dashboard", "get", "async/manager_dashboard/", "manager", None),
+        ("async_admin_dashboard", "get", "async/admin_dashboard/", "admin", None),
+        ("async_admin_dashboard_archived", "get", "async/admin_dashboard/?include_archived=1", "admin", None),
+        ("async_filter_sort_search", "get", f"async/filter_sort_search/?{SEARCH_QUERY}", "admin", None),
+        ("async_manager_status_update", "put", "async/manager_status_update/", "manager", manager_decision),
+        ("async_admin_status_update", "post", "async/admin_status_update/", "admin", admin_decision),
+        ("async_close_ticket", "post", "async/close_ticket/", "admin", close),
+        # Ends at once; the bench times the subscribe, not the wait
+        ("async_events", "get", "async/events/?stream_seconds=0", "employee", None),
+    ]
+
+
+def _patterns(patterns, prefix=""):
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            yield from _patterns(pattern.url_patterns, prefix + str(pattern.pattern))
+        elif isinstance(pattern, URLPattern):
+            yield prefix + str(pattern.pattern)
+
+
+def uncovered_routes(cases):
+    """Patterns in Travel_App/urls.py that no case requests."""
+    covered = {resolve(URL_PREFIX + path.split("?")[0]).route for _, _, path, _, _ in cases}
+    return sorted({"travel/" + route for route in _patterns(app_urls.urlpatterns)} - covered)
+
+
+def _send(client, fx, case):
+    name, method, path, role, data = case
+    headers = {"HTTP_AUTHORIZATION": f"Token {fx['tokens'][role]}"} if role else {}
+    url = URL_PREFIX + path
+    if name == "import_people":
+        upload = SimpleUploadedFile("people.csv", data["csv"].encode(), content_type="text/csv")
+        response = client.post(url, {"kind": data["kind"], "file": upload}, **headers)
+    elif data is None:
+        response = getattr(client, method)(url, **headers)
+    else:
+        response = getattr(client, method)(url, data, content_type="application/json", **headers)
+    if response.streaming:
+        if response.is_async:
+            async_to_sync(_drain)(response.streaming_content)
+        else:
+            b"".join(response.streaming_content)
+    return response.status_code
+
+
+async def _drain(stream):
+    async for _ in stream:
+        pass
+
+
+def _isolated(client, fx, case):
+    """Send ``case`` inside a transaction that is rolled back, so every run sees the same data."""
+    try:
+        with transaction.atomic():
+            status = _send(client, fx, case)
+            raise _Rollback
+    except _Rollback:
+        pass
+    return status
+
+
+class _QueryCounter:
+    """
+    Execute wrapper counting the view's queries.
+
+    (CaptureQueriesContext can't span requests: each request clears the
+    query log.) Like RequestMetricsMiddleware it leaves out transaction
+    control, which here includes the isolation transaction's savepoints.
+    """
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        if not sql.startswith(TRANSACTION_SQL):
+            self.count += 1
+        return execute(sql, params, many, context)
+
+
+def count_queries(client, fx, case):
+    """``(status, queries)`` of one isolated run of ``case``."""
+    counter = _QueryCounter()
+    with connection.execute_wrapper(counter):
+        status = _isolated(client, fx, case)
+    return status, counter.count
+
+
+def _percentile(sorted_values, fraction):
+    index = min(len(sorted_values) - 1, max(0, round(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def measure_route(client, fx, case, iterations=30, warmup=3):
+    """Latency percentiles, queries per request and peak traced memory of one route."""
+    for _ in range(warmup):
+        _isolated(client, fx, case)
+
+    latencies, statuses = [], set()
+    queries = _QueryCounter()
+    with connection.execute_wrapper(queries):
+        for _ in range(iterations):
+            started = time.perf_counter()
+            statuses.add(_isolated(client, fx, case))
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    # A separate run: tracemalloc slows everything down too much to time under it
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+        _isolated(client, fx, case)
+        peak = tracemalloc.get_traced_memory()[1] - baseline
+    finally:
+        tracemalloc.stop()
+
+    latencies.sort()
+    return {
+        "status": sorted(statuses),
+        "p50_ms": round(statistics.median(latencies), 3),
+        "p95_ms": round(_percentile(latencies, 0.95), 3),
+        "p99_ms": round(_percentile(latencies, 0.99), 3),
+        "queries": round(queries.count / iterations, 2),
+        "peak_kb": round(peak / 1024, 1),
+    }
+
+
+def run_benchmarks(iterations=30, only=None):
+    """
+    Measure every route (or those named in ``only``) against the seeded data.
+
+    Returns the baseline document: ``{"routes": {name: result}, "uncovered": [...]}``.
+    """
+    fx = bench_fixtures()
+    cases = route_cases(fx)
+    # Unhandled view errors are recorded as 500s, as a server would return them
+    client = Client(raise_request_exception=False)
+    routes = {}
+    for case in cases:
+        if only and case[0] not in only:
+            continue
+        routes[case[0]] = dict(measure_route(client, fx, case, iterations), method=case[1].upper(),
+                               path=URL_PREFIX + case[2])
+    return {"iterations": iterations, "routes": routes, "uncovered": uncovered_routes(cases)}
+
+
+def _slower(current, previous, floor, tolerance):
+    return current > previous * (1 + tolerance) and current - previous > floor
+
+
+def compare(baseline, current, tolerance=DEFAULT_TOLERANCE):
+    """
+    Regressions of ``current`` against ``baseline``, as readable strings.
+
+    A route regresses when a latency percentile or its peak memory grows by
+    more than ``tolerance`` (and past the noise floor), when it runs more
+    queries, or when its status codes change.
+    """
+    regressions = []
+    for name, now in current["routes"].items():
+        before = baseline["routes"].get(name)
+        if before is None:
+            continue
+        for key in ("p50_ms", "p95_ms", "p99_ms"):
+            if _slower(now[key], before[key], NOISE_FLOOR_MS, tolerance):
+                regressions.append(f"{name}: {key} {before[key]} -> {now[key]}")
+        if now["queries"] > before["queries"]:
+            regressions.append(f"{name}: queries {before['queries']} -> {now['queries']}")
+        if _slower(now["peak_kb"], before["peak_kb"], NOISE_FLOOR_KB, tolerance):
+            regressions.append(f"{name}: peak_kb {before['peak_kb']} -> {now['peak_kb']}")
+        if now["status"] != before["status"]:
+            regressions.append(f"{name}: status {before['status']} -> {now['status']}")
+    return regressions
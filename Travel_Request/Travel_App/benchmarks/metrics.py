@@ -0,0 +1,69 @@
+import statistics
+import time
+
+from django.conf import settings
+from django.core.handlers.wsgi import WSGIHandler
+from django.db import connection
+from django.test import RequestFactory
+from django.test.utils import override_settings
+
+from ..metrics import METRICS_MIDDLEWARE, record_query, reset_metrics
+
+
+def _request_times(handler, path, token, count):
+    factory = RequestFactory()
+    times = []
+    for _ in range(count):
+        environ = factory.get(path, HTTP_AUTHORIZATION=f"Token {token}").environ
+        started = time.perf_counter()
+        body = handler(environ, lambda status, headers: None)
+        b"".join(body)
+        body.close()
+        times.append(time.perf_counter() - started)
+    return times
+
+
+def _without_recorder():
+    connection.ensure_connection()
+    if record_query in connection.execute_wrappers:
+        connection.execute_wrappers.remove(record_query)
+
+
+def _with_recorder():
+    connection.ensure_connection()
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+def measure_overhead(path, token, requests=2000, rounds=5):
+    """
+    Median per-request time of ``path`` through the WSGI handler with the
+    metrics middleware and query recorder, and with both removed.
+
+    The two variants alternate for ``rounds`` rounds so drift hits both.
+    """
+    plain_middleware = [m for m in settings.MIDDLEWARE if m != METRICS_MIDDLEWARE]
+    with override_settings(MIDDLEWARE=plain_middleware):
+        plain = WSGIHandler()
+    instrumented = WSGIHandler()
+
+    _request_times(instrumented, path, token, 50)  # warm up caches and the connection
+    samples = {"without_metrics": [], "with_metrics": []}
+    per_round = max(requests // rounds, 1)
+    try:
+        for _ in range(rounds):
+            _without_recorder()
+            samples["without_metrics"] += _request_times(plain, path, token, per_round)
+            _with_recorder()
+            samples["with_metrics"] += _request_times(instrumented, path, token, per_round)
+    finally:
+        _with_recorder()
+        reset_metrics()
+
+    results = {name: {"median_us": round(statistics.median(times) * 1e6, 1)} for name, times in samples.items()}
+    overhead = results["with_metrics"]["median_us"] - results["without_metrics"]["median_us"]
+    results["overhead"] = {
+        "median_us": round(overhead, 1),
+        "percent": round(overhead * 100 / results["without_metrics"]["median_us"], 2),
+    }
+    return results
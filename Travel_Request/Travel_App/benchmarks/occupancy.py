@@ -0,0 +1,51 @@
+import time
+from datetime import date, timedelta
+
+from django.core.cache import cache
+
+from ..models import Employee_Request
+from ..occupancy import TRIP_BOUND_KEY, daily_occupancy, overlapping
+from .query_plans import is_full_scan
+from .seed import seed_requests
+
+# Inside the range seed_requests() spreads trips over
+WINDOW_START = date(2024, 6, 3)
+
+
+def _best_ms(run, repeat):
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        run()
+        elapsed = (time.perf_counter() - started) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return round(best, 3)
+
+
+def measure_overlap(sizes, window_days=14, repeat=5):
+    """
+    Grow the table through ``sizes`` and time the overlap queries at each size.
+
+    Expects the bench org from seed(). Compares overlapping() with the plain
+    ``from_date <= end AND to_date >= start`` query it replaces, and times
+    daily_occupancy() over the same window.
+    """
+    start, end = WINDOW_START, WINDOW_START + timedelta(days=window_days - 1)
+    table = Employee_Request._meta.db_table
+    results = []
+    for size in sorted(sizes):
+        seed_requests(size - Employee_Request.objects.count())
+        cache.delete(TRIP_BOUND_KEY)  # bulk_create doesn't raise the cached bound
+
+        bounded = overlapping(Employee_Request.objects.all(), start, end).values_list("id", flat=True)
+        plain = Employee_Request.objects.filter(from_date__lte=end, to_date__gte=start).values_list("id", flat=True)
+        results.append({
+            "rows": Employee_Request.objects.count(),
+            "trips": len(list(bounded.all())),
+            # .all() so every run queries again instead of reading the result cache
+            "bounded_ms": _best_ms(lambda: list(bounded.all()), repeat),
+            "plain_ms": _best_ms(lambda: list(plain.all()), repeat),
+            "occupancy_ms": _best_ms(lambda: daily_occupancy(start, end), repeat),
+            "bounded_full_scan": is_full_scan(bounded.explain(), table),
+        })
+    return results
@@ -0,0 +1,46 @@
+import time
+
+from django.conf import settings
+from django.db.utils import ConnectionHandler
+
+from ..backends import POOLED_ENGINES
+from ..pool import drop_pool
+
+STOCK_ENGINES = {pooled: stock for stock, pooled in POOLED_ENGINES.items()}
+
+
+def _requests(connection, count):
+    """``count`` request lifecycles: connect, one query, close (as Django does per request)."""
+    started = time.perf_counter()
+    for _ in range(count):
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1")
+            cursor.fetchone()
+        connection.close()
+    return round((time.perf_counter() - started) * 1e6 / count, 2)
+
+
+def compare_connection_pool(alias="default", requests=500):
+    """
+    Per-request cost of opening a connection every request against checking
+    one out of the pool, for the database configured as ``alias``.
+    """
+    database = settings.DATABASES[alias]
+    engine = STOCK_ENGINES.get(database["ENGINE"], database["ENGINE"])
+    if engine not in POOLED_ENGINES:
+        raise ValueError(f"No pooled backend for {engine}")
+    # A private handler: its "default" is the stock backend, not the app's connection
+    handler = ConnectionHandler({
+        "default": {**database, "ENGINE": engine, "CONN_MAX_AGE": 0},
+        "bench_pooled": {**database, "ENGINE": POOLED_ENGINES[engine], "CONN_MAX_AGE": 0},
+    })
+    try:
+        results = {
+            "per_request_connection": {"us_per_request": _requests(handler["default"], requests)},
+            "pooled_connection": {"us_per_request": _requests(handler["bench_pooled"], requests)},
+        }
+        results["pooled_connection"]["pool"] = handler["bench_pooled"].pool.stats()
+    finally:
+        handler.close_all()
+        drop_pool("bench_pooled")
+    return results
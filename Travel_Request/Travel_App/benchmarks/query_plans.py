@@ -0,0 +1,75 @@
+import re
+import time
+from datetime import timedelta
+
+from django.db import connection
+
+from ..models import Employee_Request
+from ..occupancy import overlapping
+from ..pagination import KeysetPagination, seek_filter
+
+PAGE = KeysetPagination.page_size + 1
+
+
+def _deep_page_filter():
+    """Seek filter for a cursor taken from the middle of the table."""
+    middle = Employee_Request.objects.order_by("-date_of_sub", "-id").values("date_of_sub", "id")[
+        Employee_Request.objects.count() // 2]
+    return seek_filter(KeysetPagination.ordering, [str(middle["date_of_sub"]), middle["id"]])
+
+
+def query_shapes(manager, employee):
+    """The hot Employee_Request queries, as the views build them."""
+    ordering = KeysetPagination.ordering
+    first_trip = Employee_Request.objects.order_by("from_date").values_list("from_date", flat=True).first()
+    return {
+        "admin_dashboard": lambda: Employee_Request.objects.select_related("employee", "manager")
+            .order_by(*ordering)[:PAGE],
+        "admin_dashboard_deep_page": lambda: Employee_Request.objects.select_related("employee", "manager")
+            .filter(_deep_page_filter()).order_by(*ordering)[:PAGE],
+        "manager_dashboard": lambda: Employee_Request.objects.select_related("employee")
+            .filter(manager=manager).order_by(*ordering)[:PAGE],
+        "employee_dashboard": lambda: Employee_Request.objects.filter(employee=employee).order_by(*ordering)[:PAGE],
+        "manager_pending_queue": lambda: Employee_Request.objects.filter(manager=manager, manager_status="Pending"),
+        "filter_admin_status": lambda: Employee_Request.objects.filter(admin_status="Not_closed")
+            .order_by("date_of_sub")[:PAGE],
+        "filter_travel_dates": lambda: Employee_Request.objects.filter(
+            from_date__gte=first_trip, to_date__lte=first_trip + timedelta(days=14)),
+        "travel_calendar": lambda: overlapping(Employee_Request.objects.all(), first_trip + timedelta(days=30),
+                                               first_trip + timedelta(days=44)).order_by("from_date", "id")[:PAGE],
+    }
+
+
+def is_full_scan(plan, table, vendor=None):
+    """True if ``plan`` reads ``table`` without using any index."""
+    vendor = vendor or connection.vendor
+    for line in plan.splitlines():
+        if table not in line:
+            continue
+        if vendor == "sqlite" and re.search(rf"\bSCAN {re.escape(table)}\b", line) and "USING" not in line:
+            return True
+        if vendor == "mysql" and re.search(r"\bALL\b", line):
+            return True
+        if vendor == "postgresql" and "Seq Scan" in line:
+            return True
+    return False
+
+
+def capture_plans(manager, employee):
+    """Run EXPLAIN plus a timed execution for every query shape."""
+    table = Employee_Request._meta.db_table
+    results = []
+    for name, build in query_shapes(manager, employee).items():
+        queryset = build()
+        plan = queryset.explain()
+        started = time.perf_counter()
+        rows = len(list(queryset))
+        elapsed = time.perf_counter() - started
+        results.append({
+            "name": name,
+            "rows": rows,
+            "ms": round(elapsed * 1000, 3),
+            "full_scan": is_full_scan(plan, table),
+            "plan": plan,
+        })
+    return results
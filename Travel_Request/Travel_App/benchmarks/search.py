@@ -0,0 +1,53 @@
+import time
+
+from ..models import Employee, Employee_Request
+from ..search import rebuild_index, search_requests
+from .seed import seed_requests
+
+NEEDLE_PURPOSE = "Zanzibar summit"
+NEEDLES_PER_STEP = 10
+
+
+def _best_ms(run, repeat):
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        run()
+        elapsed = (time.perf_counter() - started) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return round(best, 3)
+
+
+def _add_needles(employee):
+    for _ in range(NEEDLES_PER_STEP):
+        Employee_Request.objects.create(
+            employee=employee, manager_id=employee.manager_id, purpose=NEEDLE_PURPOSE, from_loc="Kochi",
+            to_loc="Zanzibar", travel_mode="Flight", from_date="2024-05-01", to_date="2024-05-05",
+            additional_request="", manager_note="", admin_note="", no_of_resub=1,
+        )
+
+
+def measure_search(sizes, repeat=5):
+    """
+    Grow the table through ``sizes`` and time a selective search at each size.
+
+    Expects the bench org from seed() with no requests yet. Compares the
+    SearchToken lookup with the icontains scan it replaces.
+    """
+    employee = Employee.objects.filter(username__startswith="bench_emp").first()
+    results = []
+    for size in sorted(sizes):
+        last_id = Employee_Request.objects.order_by("-id").values_list("id", flat=True).first() or 0
+        seed_requests(size - Employee_Request.objects.count() - NEEDLES_PER_STEP)
+        rebuild_index(queryset=Employee_Request.objects.filter(id__gt=last_id))
+        _add_needles(employee)
+
+        indexed = search_requests(Employee_Request.objects.all(), "zanzibar summit").order_by("-search_rank", "-id")
+        scan = Employee_Request.objects.filter(purpose__icontains="zanzibar summit").order_by("-id")
+        results.append({
+            "rows": Employee_Request.objects.count(),
+            "matches": len(list(indexed.values_list("id", flat=True))),
+            "indexed_ms": _best_ms(lambda: list(indexed.values_list("id", flat=True)), repeat),
+            "icontains_ms": _best_ms(lambda: list(scan.values_list("id", flat=True)), repeat),
+        })
+    return results
@@ -0,0 +1,124 @@
+import random
+from contextlib import contextmanager
+from datetime import date, timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import connection
+
+from ..counters import reconcile_counters
+from ..models import Admin, Employee, Employee_Request, Manager
+from ..search import rebuild_index
+
+CITIES = ["Kochi", "Delhi", "Mumbai", "Chennai", "Bengaluru", "Pune", "Hyderabad", "Kolkata"]
+TRAVEL_MODES = ["Flight", "Train", "Bus", "Car"]
+PURPOSES = ["Client visit", "Conference", "Training", "Site audit", "Team offsite"]
+SEED_PASSWORD = "bench-pass-123"
+
+
+def _bulk_users(prefix, count, password_hash, batch_size):
+    usernames = [f"{prefix}{i}" for i in range(count)]
+    User.objects.bulk_create(
+        [User(username=name, email=f"{name}@bench.example.com", password=password_hash) for name in usernames],
+        batch_size=batch_size,
+    )
+    # MySQL does not hand primary keys back from bulk_create, so look them up
+    return dict(User.objects.filter(username__in=usernames).values_list("username", "id"))
+
+
+def seed(managers=10, employees=100, requests=1000, start=date(2023, 1, 1), days=1000,
+         batch_size=5000, rng_seed=1):
+    """
+    Insert a synthetic org and ``requests`` travel tickets with bulk_create.
+
+    Every generated user shares the password ``SEED_PASSWORD`` (hashed once).
+    Returns a dict with the created admin, managers and employees.
+    """
+    rng = random.Random(rng_seed)
+    password_hash = make_password(SEED_PASSWORD)
+
+    admin_user = User.objects.create(username="bench_admin", password=password_hash)
+    admin = Admin.objects.create(username="bench_admin", first_name="Bench", last_name="Admin",
+                                 email="bench_admin@bench.example.com", user_auth=admin_user)
+
+    manager_users = _bulk_users("bench_mgr", managers, password_hash, batch_size)
+    Manager.objects.bulk_create(
+        [Manager(username=name, first_name="Manager", last_name=name, email=f"{name}@bench.example.com",
+                 user_auth_id=user_id) for name, user_id in manager_users.items()],
+        batch_size=batch_size,
+    )
+    manager_ids = list(Manager.objects.filter(username__startswith="bench_mgr").values_list("id", flat=True))
+
+    employee_users = _bulk_users("bench_emp", employees, password_hash, batch_size)
+    Employee.objects.bulk_create(
+        [Employee(username=name, first_name="Employee", last_name=name, manager_id=rng.choice(manager_ids),
+                  Gender=rng.choice(["M", "F"]), Place=rng.choice(CITIES), email=f"{name}@bench.example.com",
+                  user_auth_id=user_id) for name, user_id in employee_users.items()],
+        batch_size=batch_size,
+    )
+    seed_requests(requests, start=start, days=days, batch_size=batch_size, rng=rng)
+
+    return {
+        "admin": admin,
+        "managers": Manager.objects.filter(id__in=manager_ids),
+        "employees": Employee.objects.filter(username__startswith="bench_emp"),
+    }
+
+
+def seed_requests(count, start=date(2023, 1, 1), days=1000, batch_size=5000, rng=None):
+    """Add ``count`` tickets spread over the seeded bench employees."""
+    rng = rng or random.Random(count)
+    staff = list(Employee.objects.filter(username__startswith="bench_emp").values_list("id", "manager_id"))
+    batch = []
+    for _ in range(count):
+        employee_id, manager_id = rng.choice(staff)
+        submitted = start + timedelta(days=rng.randrange(days))
+        leave = submitted + timedelta(days=rng.randrange(1, 30))
+        manager_status = rng.choices(["Approved", "Declined", "Pending"], weights=[7, 1, 2])[0]
+        closed = manager_status == "Approved" and rng.random() < 0.6
+        batch.append(Employee_Request(
+            employee_id=employee_id, manager_id=manager_id, date_of_sub=submitted,
+            purpose=rng.choice(PURPOSES), from_loc=rng.choice(CITIES), to_loc=rng.choice(CITIES),
+            travel_mode=rng.choice(TRAVEL_MODES), from_date=leave,
+            to_date=leave + timedelta(days=rng.randrange(1, 10)),
+            lodging_required=rng.choice(["Yes", "No"]), additional_request="", manager_note="",
+            admin_note="", no_of_resub=1, manager_status=manager_status,
+            admin_status="Closed" if closed else "Not_closed",
+        ))
+        if len(batch) >= batch_size:
+            Employee_Request.objects.bulk_create(batch)
+            batch = []
+    if batch:
+        Employee_Request.objects.bulk_create(batch)
+
+
+@contextmanager
+def fast_sqlite_writes():
+    """On SQLite, skip fsyncs and keep the journal in memory while seeding."""
+    # Neither pragma can change inside a transaction
+    if connection.vendor != "sqlite" or connection.in_atomic_block:
+        yield
+        return
+    with connection.cursor() as cursor:
+        synchronous = cursor.execute("PRAGMA synchronous").fetchone()[0]
+        journal_mode = cursor.execute("PRAGMA journal_mode").fetchone()[0]
+        cursor.execute("PRAGMA synchronous = OFF")
+        cursor.execute("PRAGMA journal_mode = MEMORY")
+    try:
+        yield
+    finally:
+        with connection.cursor() as cursor:
+            cursor.execute(f"PRAGMA synchronous = {int(synchronous)}")
+            cursor.execute(f"PRAGMA journal_mode = {journal_mode}")
+
+
+def seed_all(managers=10, employees=100, requests=1000, **kwargs):
+    """
+    seed() plus what bulk_create skips: the search index and the status
+    counters. Use it when the seeded data is served through the API.
+    """
+    with fast_sqlite_writes():
+        created = seed(managers=managers, employees=employees, requests=requests, **kwargs)
+        rebuild_index()
+        reconcile_counters(fix=True)
+    return created
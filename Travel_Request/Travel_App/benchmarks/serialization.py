@@ -0,0 +1,33 @@
+import time
+
+from ..models import Employee_Request
+from ..projections import ADMIN_TABLE, EMPLOYEE_TABLE, MANAGER_TABLE
+from ..serializers import AdminTableSerializer, EmployeeTableSerializer, ManagerTableSerializer
+
+TABLES = {
+    "admin": (AdminTableSerializer, ADMIN_TABLE, ("employee", "manager")),
+    "manager": (ManagerTableSerializer, MANAGER_TABLE, ("employee",)),
+    "employee": (EmployeeTableSerializer, EMPLOYEE_TABLE, ("manager",)),
+}
+
+
+def _timed(render):
+    started = time.perf_counter()
+    data = render()
+    return round((time.perf_counter() - started) * 1000, 1), len(data)
+
+
+def compare_serialization(limit):
+    """Fetch and render ``limit`` rows per table with the serializer and the projection."""
+    results = {}
+    for name, (serializer_class, projection, related) in TABLES.items():
+        queryset = Employee_Request.objects.select_related(*related).order_by("-date_of_sub", "-id")[:limit]
+        serializer_ms, rows = _timed(lambda: serializer_class(queryset.all(), many=True).data)
+        projection_ms, _ = _timed(lambda: projection.render(projection.values(queryset.all())))
+        results[name] = {
+            "rows": rows,
+            "serializer_ms": serializer_ms,
+            "projection_ms": projection_ms,
+            "speedup": round(serializer_ms / projection_ms, 1) if projection_ms else None,
+        }
+    return results
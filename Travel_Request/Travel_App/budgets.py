@@ -0,0 +1,82 @@
+"""
+Per-view query budgets.
+
+A view declares the most queries one request may run with
+``@query_budget(n)``, as its outermost decorator. The budget counts every
+query of the request (authentication, throttling and the view itself),
+not transaction control, and must not grow with the number of rows: tests.QueryBudgetTests checks
+each budget at several table sizes. In DEBUG, QueryBudgetMiddleware
+compares each request with its view's budget, using the count kept by
+RequestMetricsMiddleware.
+"""
+import logging
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+from .metrics import current_metrics
+
+logger = logging.getLogger(__name__)
+
+
+class QueryBudgetExceeded(Exception):
+    """A request ran more queries than its view's budget."""
+
+
+def query_budget(max_queries):
+    """Declare the most queries a request to the view may run (put it above @api_view)."""
+    def decorator(view):
+        view.query_budget = max_queries
+        return view
+    return decorator
+
+
+def view_budget(view):
+    return getattr(view, "query_budget", None)
+
+
+def check_budget(view_name, budget, queries):
+    """Log, or with settings.QUERY_BUDGET_RAISE raise, when ``queries`` is over ``budget``."""
+    if budget is None or queries <= budget:
+        return
+    message = f"{view_name} ran {queries} queries, over its budget of {budget}"
+    if getattr(settings, "QUERY_BUDGET_RAISE", False):
+        raise QueryBudgetExceeded(message)
+    logger.warning(message)
+
+
+class QueryBudgetMiddleware:
+    """
+    DEBUG only: check every request against its view's @query_budget.
+
+    Place it after RequestMetricsMiddleware, whose query count it reads.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.DEBUG:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def _check(self, request):
+        metrics = current_metrics()
+        match = getattr(request, "resolver_match", None)
+        if metrics is None or match is None:
+            return
+        check_budget(match.view_name, view_budget(match.func), metrics.db_queries)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        response = self.get_response(request)
+        self._check(request)
+        return response
+
+    async def __acall__(self, request):
+        response = await self.get_response(request)
+        self._check(request)
+        return response
@@ -0,0 +1,126 @@
+"""
+Delta sync for the dashboards: which requests changed since a cursor.
+
+Every write to Employee_Request appends a RequestChange entry in the same
+transaction (log_change()/log_changes(), next to the counter updates). The
+entry id is the cursor: ``changes?since=<cursor>`` returns the requests
+upserted and deleted after it, scoped to one dashboard, and the cursor to
+send next time. updated_at on the request is a plain timestamp for
+readers; it isn't the cursor because timestamps tie and deletes leave no
+row behind.
+
+Ids are handed out when a transaction inserts, not when it commits, so an
+entry can become visible after a higher one. The cursor returned only
+moves past entries older than settings.CHANGES_SETTLE_SECONDS, which must
+exceed the longest write transaction; newer ones are returned again on the
+next poll, which is harmless since a client applies changes by id.
+
+Entries older than settings.CHANGES_RETENTION_DAYS are removed by
+``manage.py prune_request_changes``; a cursor from before the oldest
+entry left gets ``reset``, and the client reloads its dashboard.
+"""
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from .models import Employee_Request, RequestChange
+from .projections import ADMIN_TABLE, EMPLOYEE_TABLE, MANAGER_TABLE
+
+logger = logging.getLogger(__name__)
+
+UPSERT = "upsert"
+DELETE = "delete"
+
+# dashboard -> (projection, RequestChange/Employee_Request owner column, profile attribute)
+DASHBOARDS = {
+    "employee": (EMPLOYEE_TABLE, "employee_id", "employee"),
+    "manager": (MANAGER_TABLE, "manager_id", "manager"),
+    "admin": (ADMIN_TABLE, None, "admin"),
+}
+
+
+def _entry(ticket, kind, now):
+    if isinstance(ticket, dict):
+        return RequestChange(request_id=ticket["id"], employee_id=ticket["employee_id"],
+                             manager_id=ticket["manager_id"], kind=kind, changed_at=now)
+    return RequestChange(request_id=ticket.id, employee_id=ticket.employee_id, manager_id=ticket.manager_id,
+                         kind=kind, changed_at=now)
+
+
+def log_changes(tickets, kind=UPSERT):
+    """Record a change of each ticket (instance or values() dict); call inside the write transaction."""
+    now = timezone.now()
+    RequestChange.objects.bulk_create([_entry(ticket, kind, now) for ticket in tickets])
+
+
+def log_change(ticket, kind=UPSERT):
+    log_changes([ticket], kind)
+
+
+def latest_cursor():
+    return RequestChange.objects.order_by("-id").values_list("id", flat=True).first() or 0
+
+
+def changes_since(since, dashboard, owner_id=None, limit=None):
+    """
+    The changes of ``dashboard`` (restricted to ``owner_id``) after cursor ``since``.
+
+    Returns ``{"cursor", "has_more", "reset", "upserted", "deleted"}``:
+    the requests changed since, as the dashboard renders them, and the ids
+    of those gone from it. With ``has_more`` the client asks again at once.
+    """
+    limit = limit or getattr(settings, "CHANGES_PAGE_SIZE", 500)
+    oldest = RequestChange.objects.order_by("id").values_list("id", flat=True).first()
+    if oldest is not None and since < oldest - 1:
+        # Entries after the cursor may have been pruned
+        return {"cursor": str(latest_cursor()), "has_more": False, "reset": True, "upserted": [], "deleted": []}
+
+    projection, owner_column, _ = DASHBOARDS[dashboard]
+    entries = RequestChange.objects.filter(id__gt=since)
+    requests = Employee_Request.objects.all()
+    if owner_column is not None:
+        entries = entries.filter(**{owner_column: owner_id})
+        requests = requests.filter(**{owner_column: owner_id})
+    entries = list(entries.order_by("id").values_list("id", "request_id", "kind", "changed_at")[:limit + 1])
+    has_more = len(entries) > limit
+    entries = entries[:limit]
+
+    # Move the cursor up to the first entry that may still have an older,
+    # uncommitted neighbour; what follows it is sent again next time
+    settled = timezone.now() - timedelta(seconds=getattr(settings, "CHANGES_SETTLE_SECONDS", 10))
+    cursor = since
+    settling = False
+    latest = {}
+    for entry_id, request_id, kind, changed_at in entries:
+        latest[request_id] = kind
+        if changed_at > settled:
+            settling = True
+        if not settling:
+            cursor = entry_id
+
+    upserted_ids = [request_id for request_id, kind in latest.items() if kind == UPSERT]
+    rows = []
+    if upserted_ids:
+        rows = list(projection.values(requests.filter(id__in=upserted_ids)).order_by("id"))
+    found = {row.id for row in rows}
+    # Deleted, or changed and then moved out of this dashboard
+    deleted = sorted(request_id for request_id in latest if request_id not in found)
+    return {
+        "cursor": str(cursor),
+        "has_more": has_more and not settling,
+        "reset": False,
+        "upserted": projection.render(rows),
+        "deleted": deleted,
+    }
+
+
+def prune_changes(older_than_days=None):
+    """Delete change entries older than ``older_than_days`` (settings.CHANGES_RETENTION_DAYS)."""
+    if older_than_days is None:
+        older_than_days = getattr(settings, "CHANGES_RETENTION_DAYS", 7)
+    cutoff = timezone.now() - timedelta(days=older_than_days)
+    deleted, _ = RequestChange.objects.filter(changed_at__lt=cutoff).delete()
+    logger.info(f"Pruned {deleted} request changes older than {cutoff}.")
+    return deleted
@@ -0,0 +1,135 @@
+import logging
+from collections import Counter
+
+from django.db import IntegrityError, transaction
+from django.db.models import Case, Count, F, Q, Value, When
+
+from .models import Employee_Request, RequestCounter
+
+logger = logging.getLogger(__name__)
+
+COUNTED_FIELDS = ("manager_status", "admin_status")
+SNAPSHOT_FIELDS = ("employee_id", "manager_id", *COUNTED_FIELDS)
+
+
+def snapshot(ticket):
+    """The fields of ``ticket`` (instance or dict) that decide which counters it is in."""
+    if isinstance(ticket, dict):
+        return {field: ticket[field] for field in SNAPSHOT_FIELDS}
+    return {field: getattr(ticket, field) for field in SNAPSHOT_FIELDS}
+
+
+def _keys(state):
+    owners = (("all", 0), ("manager", state["manager_id"]), ("employee", state["employee_id"]))
+    return [(scope, owner_id, field, state[field]) for scope, owner_id in owners for field in COUNTED_FIELDS]
+
+
+def _counter(key, count):
+    scope, owner_id, field, value = key
+    return RequestCounter(scope=scope, owner_id=owner_id, field=field, value=value, count=count)
+
+
+def _key_filter(key):
+    scope, owner_id, field, value = key
+    return Q(scope=scope, owner_id=owner_id, field=field, value=value)
+
+
+def record_change(before=None, after=None, deltas=None):
+    """
+    Add one request's move from ``before`` to ``after`` to ``deltas``.
+
+    Either side may be None for a create or a delete. Returns ``deltas``.
+    """
+    deltas = Counter() if deltas is None else deltas
+    if before is not None:
+        for key in _keys(before):
+            deltas[key] -= 1
+    if after is not None:
+        for key in _keys(after):
+            deltas[key] += 1
+    return deltas
+
+
+def apply_deltas(deltas):
+    """
+    Write ``deltas`` to RequestCounter; call inside the transaction of the change.
+
+    All existing counters move with one UPDATE; counters seen for the first
+    time are inserted (the insert is retried as an update if another
+    transaction created the row first).
+    """
+    deltas = {key: delta for key, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    matches = Q()
+    for key in deltas:
+        matches |= _key_filter(key)
+    updated = RequestCounter.objects.filter(matches).update(count=F("count") + Case(
+        *[When(_key_filter(key), then=Value(delta)) for key, delta in deltas.items()], default=Value(0)))
+    if updated == len(deltas):
+        return
+
+    existing = set(RequestCounter.objects.filter(matches).values_list("scope", "owner_id", "field", "value"))
+    missing = [key for key in deltas if key not in existing]
+    try:
+        with transaction.atomic():
+            RequestCounter.objects.bulk_create([_counter(key, deltas[key]) for key in missing])
+    except IntegrityError:
+        for key in missing:
+            if not RequestCounter.objects.filter(_key_filter(key)).update(count=F("count") + deltas[key]):
+                _counter(key, deltas[key]).save()
+
+
+def count_change(before=None, after=None):
+    """apply_deltas() for a single request."""
+    apply_deltas(record_change(before, after))
+
+
+def counter_summary(scope, owner_id=0):
+    """``{field: {value: count}}`` for one owner, read from RequestCounter."""
+    summary = {field: {} for field in COUNTED_FIELDS}
+    rows = RequestCounter.objects.filter(scope=scope, owner_id=owner_id, count__gt=0)
+    for field, value, count in rows.values_list("field", "value", "count"):
+        summary[field][value] = count
+    return summary
+
+
+def expected_counters():
+    """Recount every counter from Employee_Request with GROUP BY queries."""
+    expected = Counter()
+    owners = (("all", None), ("manager", "manager_id"), ("employee", "employee_id"))
+    for scope, owner_column in owners:
+        for field in COUNTED_FIELDS:
+            columns = [field] if owner_column is None else [owner_column, field]
+            groups = Employee_Request.objects.order_by().values(*columns).annotate(n=Count("id"))
+            for group in groups:
+                owner_id = 0 if owner_column is None else group[owner_column]
+                expected[(scope, owner_id, field, group[field])] = group["n"]
+    return expected
+
+
+def reconcile_counters(fix=True):
+    """
+    Compare RequestCounter with a full recount.
+
+    Returns ``{key: (stored, expected)}`` for every counter that drifted.
+    With ``fix`` the table is rebuilt from the recount in one transaction.
+    """
+    with transaction.atomic():
+        expected = expected_counters()
+        stored = {
+            (scope, owner_id, field, value): count
+            for scope, owner_id, field, value, count in RequestCounter.objects.values_list(
+                "scope", "owner_id", "field", "value", "count")
+        }
+        drift = {
+            key: (stored.get(key, 0), expected.get(key, 0))
+            for key in set(stored) | set(expected)
+            if stored.get(key, 0) != expected.get(key, 0)
+        }
+        if fix and drift:
+            RequestCounter.objects.all().delete()
+            RequestCounter.objects.bulk_create([_counter(key, count) for key, count in expected.items()],
+                                               batch_size=1000)
+            logger.warning(f"Rebuilt request counters, {len(drift)} had drifted")
+    return drift
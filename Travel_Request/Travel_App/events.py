@@ -0,0 +1,275 @@
+"""
+Live ticket status events, pushed to clients over Server-Sent Events.
+
+The status views publish an event when a ticket's status changes
+(publish_statuses(), run once the write transaction commits) to the
+channels of the ticket's employee and manager, ``employee:<id>`` and
+``manager:<id>``. The ``travel/async/events/`` stream (async_views.events,
+served by the ASGI app) subscribes to the channels of the caller's
+profiles and writes each event as it arrives.
+
+Every event gets an id, sent as the SSE ``id:`` field. A reconnecting
+EventSource sends the last one back as ``Last-Event-ID`` and the stream
+first replays what the broker still holds after it. When that history
+doesn't reach back far enough the stream sends a ``reset`` event, and the
+client catches up through ``changes?since=`` (changes.py) instead.
+
+The broker is settings.EVENTS_BROKER, any class with Broker's methods.
+InMemoryBroker keeps channels in this process: it suits one ASGI process
+serving both the status updates and the streams, and the tests. With
+several processes, plug in a broker backed by a shared pub/sub service.
+"""
+import asyncio
+import json
+import threading
+import time
+from collections import deque
+
+from django.conf import settings
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+STATUS_EVENT = "ticket_status"
+RESET_EVENT = "reset"
+EVENT_FIELDS = ("employee_id", "manager_id", "manager_status", "admin_status", "manager_note", "admin_note")
+
+
+class Broker:
+    """The interface EVENTS_BROKER classes implement."""
+
+    def publish(self, channels, event):
+        """Append ``event`` (a JSON-able dict) to every channel in ``channels``; return its id."""
+        raise NotImplementedError
+
+    def replay(self, channels, after_id):
+        """
+        ``(events, complete)``: the ``(id, event)`` pairs held for ``channels``
+        with ids after ``after_id``, in id order, and whether the history
+        still reaches back to ``after_id``.
+        """
+        raise NotImplementedError
+
+    def subscribe(self, channels):
+        """
+        A subscription to ``channels``, created on the running event loop:
+        ``await sub.get(timeout)`` returns the next ``(id, event)`` or None,
+        ``sub.overflowed`` tells it fell behind and lost events, and
+        ``sub.close()`` unsubscribes.
+        """
+        raise NotImplementedError
+
+
+class _Subscription:
+    def __init__(self, broker, channels, queue_size):
+        self.broker = broker
+        self.channels = channels
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(queue_size)
+        self.overflowed = False
+
+    def deliver(self, entry):
+        # Called from the publishing thread
+        try:
+            self.loop.call_soon_threadsafe(self._put, entry)
+        except RuntimeError:  # the loop is closed
+            pass
+
+    def _put(self, entry):
+        try:
+            self.queue.put_nowait(entry)
+        except asyncio.QueueFull:
+            self.overflowed = True
+
+    async def get(self, timeout):
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def close(self):
+        self.broker._unsubscribe(self)
+
+
+class InMemoryBroker(Broker):
+    """
+    Channels in a dict of this process, each keeping its last
+    settings.EVENTS_HISTORY events for replay.
+
+    Ids continue from the time the broker was created (in microseconds),
+    so ids from before a restart are older than every new one and get a
+    reset instead of a silently incomplete replay.
+    """
+
+    def __init__(self, history=None, queue_size=None):
+        self.history = history or getattr(settings, "EVENTS_HISTORY", 1000)
+        self.queue_size = queue_size or getattr(settings, "EVENTS_QUEUE_SIZE", 100)
+        self._lock = threading.Lock()
+        self._first_id = time.time_ns() // 1000
+        self._last_id = self._first_id
+        self._events = {}  # channel -> deque of (id, event)
+        self._dropped = {}  # channel -> newest id dropped from its history
+        self._subscribers = {}  # channel -> set of _Subscription
+
+    def publish(self, channels, event):
+        with self._lock:
+            self._last_id += 1
+            entry = (self._last_id, event)
+            subscribers = set()
+            for channel in channels:
+                events = self._events.setdefault(channel, deque())
+                if len(events) >= self.history:
+                    self._dropped[channel] = events.popleft()[0]
+                events.append(entry)
+                subscribers.update(self._subscribers.get(channel, ()))
+        for subscription in subscribers:
+            subscription.deliver(entry)
+        return entry[0]
+
+    def replay(self, channels, after_id):
+        with self._lock:
+            complete = after_id >= self._first_id and all(
+                self._dropped.get(channel, 0) <= after_id for channel in channels)
+            # One event published to two of the channels is replayed once
+            events = {entry[0]: entry for channel in channels
+                      for entry in self._events.get(channel, ()) if entry[0] > after_id}
+        return [events[event_id] for event_id in sorted(events)], complete
+
+    def subscribe(self, channels):
+        subscription = _Subscription(self, channels, self.queue_size)
+        with self._lock:
+            for channel in channels:
+                self._subscribers.setdefault(channel, set()).add(subscription)
+        return subscription
+
+    def _unsubscribe(self, subscription):
+        with self._lock:
+            for channel in subscription.channels:
+                subscribers = self._subscribers.get(channel)
+                if subscribers is not None:
+                    subscribers.discard(subscription)
+                    if not subscribers:
+                        del self._subscribers[channel]
+
+
+_broker = None
+
+
+def broker():
+    """The broker named by settings.EVENTS_BROKER, created once per process."""
+    global _broker
+    if _broker is None:
+        _broker = import_string(getattr(settings, "EVENTS_BROKER", "Travel_App.events.InMemoryBroker"))()
+    return _broker
+
+
+def reset_broker():
+    global _broker
+    _broker = None
+
+
+def ticket_channels(ticket):
+    return [f"employee:{ticket['employee_id']}", f"manager:{ticket['manager_id']}"]
+
+
+def profile_channels(profile):
+    """The channels a user with ``profile`` listens on."""
+    channels = []
+    if profile.employee is not None:
+        channels.append(f"employee:{profile.employee.id}")
+    if profile.manager is not None:
+        channels.append(f"manager:{profile.manager.id}")
+    return channels
+
+
+def status_event(ticket):
+    """The event for ``ticket`` (an instance, or a dict with its fields) as it is now."""
+    if isinstance(ticket, dict):
+        return {"ticket_id": ticket["id"], **{field: ticket.get(field) for field in EVENT_FIELDS}}
+    return {"ticket_id": ticket.id, **{field: getattr(ticket, field) for field in EVENT_FIELDS}}
+
+
+def publish_statuses(tickets):
+    """Publish the status of each ticket once the current transaction commits (now, outside one)."""
+    events = [status_event(ticket) for ticket in tickets]
+
+    def publish():
+        for event in events:
+            broker().publish(ticket_channels(event), event)
+    transaction.on_commit(publish)
+
+
+def publish_status(ticket):
+    publish_statuses([ticket])
+
+
+def format_event(data, event_id=None, event=STATUS_EVENT):
+    lines = [] if event_id is None else [f"id: {event_id}"]
+    lines.append(f"event: {event}")
+    lines.append(f"data: {json.dumps(data, separators=(',', ':'))}")
+    return "\n".join(lines) + "\n\n"
+
+
+def parse_event_id(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class EventStream:
+    """
+    The SSE body: replay after ``last_event_id``, then live events and
+    keep-alive comments for ``stream_seconds``, after which the client
+    reconnects with its Last-Event-ID.
+
+    The stream also ends early if it falls behind, and the reconnect
+    replays what it missed. The response calls close() once it is done
+    with the body, which unsubscribes. Django's ASGI handler doesn't notice
+    a client leaving mid-stream, so stream_seconds is also what bounds a
+    stream nobody reads any more.
+    """
+
+    def __init__(self, channels, last_event_id=None, stream_seconds=None):
+        self.channels = channels
+        self.last_event_id = last_event_id
+        if stream_seconds is None:
+            stream_seconds = getattr(settings, "EVENTS_STREAM_SECONDS", 300)
+        self.stream_seconds = stream_seconds
+        self.subscription = None
+
+    def __aiter__(self):
+        return self._events()
+
+    def close(self):
+        if self.subscription is not None:
+            self.subscription.close()
+
+    async def _events(self):
+        heartbeat = getattr(settings, "EVENTS_HEARTBEAT_SECONDS", 15)
+        events = broker()
+        # Subscribe before replaying, so nothing published in between is lost
+        self.subscription = subscription = events.subscribe(self.channels)
+        try:
+            yield f"retry: {getattr(settings, 'EVENTS_RETRY_MS', 3000)}\n\n"
+            sent = self.last_event_id or 0
+            if self.last_event_id is not None:
+                replayed, complete = events.replay(self.channels, self.last_event_id)
+                if not complete:
+                    yield format_event({}, event=RESET_EVENT)
+                for event_id, event in replayed:
+                    sent = event_id
+                    yield format_event(event, event_id)
+
+            deadline = time.monotonic() + self.stream_seconds
+            while not subscription.overflowed:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                entry = await subscription.get(min(heartbeat, remaining))
+                if entry is None:
+                    yield ": keep-alive\n\n"
+                elif entry[0] > sent:
+                    sent = entry[0]
+                    yield format_event(entry[1], entry[0])
+        finally:
+            subscription.close()
@@ -0,0 +1,62 @@
+import csv
+import json
+
+EXPORT_CHUNK_SIZE = 2000
+LINES_PER_WRITE = 500
+
+
+class _Echo:
+    """File-like object whose write() hands the line back to the csv writer."""
+
+    def write(self, value):
+        return value
+
+
+def _flatten(data):
+    flat = {}
+    for key, value in data.items():
+        if isinstance(value, dict):
+            for sub_key, sub_value in value.items():
+                flat[f"{key}_{sub_key}"] = sub_value
+        else:
+            flat[key] = value
+    return flat
+
+
+def csv_header(projection):
+    header = []
+    for key, index, nested, is_date in projection.plan:
+        if nested is not None:
+            header.extend(f"{key}_{sub_key}" for sub_key, i in nested)
+        else:
+            header.append(key)
+    return header
+
+
+def _batched(lines):
+    batch = []
+    for line in lines:
+        batch.append(line)
+        if len(batch) >= LINES_PER_WRITE:
+            yield "".join(batch)
+            batch = []
+    if batch:
+        yield "".join(batch)
+
+
+def stream_csv(rows, projection):
+    """CSV text for ``rows``, with nested objects flattened to ``key_subkey`` columns."""
+    writer = csv.writer(_Echo())
+    yield writer.writerow(csv_header(projection))
+    yield from _batched(writer.writerow(_flatten(projection.render_row(row)).values()) for row in rows)
+
+
+def stream_ndjson(rows, projection):
+    """One JSON object per line, in the same shape as the dashboard tables."""
+    yield from _batched(json.dumps(projection.render_row(row)) + "\n" for row in rows)
+
+
+EXPORT_FORMATS = {
+    "csv": ("text/csv", stream_csv),
+    "ndjson": ("application/x-ndjson", stream_ndjson),
+}
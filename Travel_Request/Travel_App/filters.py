@@ -0,0 +1,115 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count
+
+from .models import Employee_Request
+from .search import search_requests
+
+# sort_field values accepted by filter_sort_search, mapped to ORM fields
+SORT_FIELDS = {
+    "date_of_sub": "date_of_sub",
+    "from_date": "from_date",
+    "to_date": "to_date",
+    "first_name": "employee__first_name",
+    "last_name": "employee__last_name",
+}
+
+# Parameters that narrow the result set (sorting does not change counts)
+FILTER_PARAMS = ("q", "first_name", "last_name", "employee_id", "start_date", "end_date",
+                 "manager_status", "admin_status", "travel_mode", "lodging_required")
+
+FACET_FIELDS = ("manager_status", "admin_status", "travel_mode", "lodging_required")
+FACET_CACHE_PREFIX = "request_facets"
+
+
+def filter_requests(params, queryset=None):
+    """
+    Apply the filter_sort_search query parameters.
+
+    Returns ``(queryset, ordering)``; ``ordering`` always ends in ``id`` so it
+    can be used for keyset iteration. With ``q`` and no explicit sort_field
+    the results are ordered by search rank.
+    """
+    q = params.get("q", "").strip()
+    first_name = params.get("first_name", "").strip()
+    last_name = params.get("last_name", "").strip()
+    employee_id = params.get("employee_id", "").strip()
+    start_date = params.get("start_date", "").strip()
+    end_date = params.get("end_date", "").strip()
+    manager_status = params.get("manager_status", "").strip()
+    admin_status = params.get("admin_status", "").strip()
+    travel_mode = params.get("travel_mode", "").strip()
+    lodging_required = params.get("lodging_required", "").strip()
+    sort_field = params.get("sort_field", "date_of_sub").strip()
+    sort_order = params.get("sort_order", "asc").strip()
+
+    if queryset is None:
+        queryset = Employee_Request.objects.all()
+
+    if first_name:
+        queryset = queryset.filter(employee__first_name__icontains=first_name)
+    if last_name:
+        queryset = queryset.filter(employee__last_name__icontains=last_name)
+    if employee_id:
+        queryset = queryset.filter(employee__id=employee_id)
+    if start_date:
+        queryset = queryset.filter(from_date__gte=start_date)
+    if end_date:
+        queryset = queryset.filter(to_date__lte=end_date)
+    if manager_status:
+        queryset = queryset.filter(manager_status=manager_status)
+    if admin_status:
+        queryset = queryset.filter(admin_status=admin_status)
+    if travel_mode:
+        queryset = queryset.filter(travel_mode=travel_mode)
+    if lodging_required:
+        queryset = queryset.filter(lodging_required=lodging_required)
+    if q:
+        queryset = search_requests(queryset, q)
+
+    if q and "sort_field" not in params:
+        return queryset, ("-search_rank", "-id")
+
+    field = SORT_FIELDS.get(sort_field, "date_of_sub")
+    if sort_order == "desc":
+        ordering = (f"-{field}", "-id")
+    else:
+        ordering = (field, "id")
+    return queryset, ordering
+
+
+def facet_counts(params):
+    """
+    Per-value counts of FACET_FIELDS over the requests matching ``params``.
+
+    One GROUP BY over all facet columns together (a few dozen groups at
+    most) is folded into ``{"total": n, field: {value: count}}``; values
+    with no matching requests are left out.
+    """
+    queryset, _ = filter_requests(params)
+    groups = queryset.order_by().values(*FACET_FIELDS).annotate(count=Count("id"))
+    facets = {field: {} for field in FACET_FIELDS}
+    total = 0
+    for group in groups:
+        total += group["count"]
+        for field in FACET_FIELDS:
+            counts = facets[field]
+            counts[group[field]] = counts.get(group[field], 0) + group["count"]
+    return {"total": total, **facets}
+
+
+def facet_cache_key(params):
+    filters = "&".join(f"{name}={params.get(name, '').strip()}" for name in FILTER_PARAMS)
+    return f"{FACET_CACHE_PREFIX}:{hashlib.md5(filters.encode()).hexdigest()}"
+
+
+def cached_facet_counts(params):
+    """facet_counts() cached for settings.FACET_CACHE_TTL seconds per filter combination."""
+    key = facet_cache_key(params)
+    facets = cache.get(key)
+    if facets is None:
+        facets = facet_counts(params)
+        cache.set(key, facets, getattr(settings, "FACET_CACHE_TTL", 30))
+    return facets
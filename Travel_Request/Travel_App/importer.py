@@ -0,0 +1,186 @@
+import csv
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime
+
+import django
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import IntegrityError, transaction
+
+from .list_cache import LIST_FOR_MODEL, bump_on_commit
+from .models import Employee, Manager
+
+logger = logging.getLogger(__name__)
+
+IMPORT_CHUNK_SIZE = 500
+REQUIRED_COLUMNS = ("username", "first_name", "last_name", "email", "password")
+LOOKUP_BATCH_SIZE = 1000
+IMPORT_KINDS = {"employee": Employee, "manager": Manager}
+
+
+def _init_worker(settings_module):
+    # Spawned workers (macOS, Windows) start without Django configured
+    if settings_module:
+        os.environ.setdefault("DJANGO_SETTINGS_MODULE", settings_module)
+    django.setup()
+
+
+def hash_passwords(passwords, workers=None):
+    """
+    make_password() for every password, spread over a process pool.
+
+    PBKDF2 is CPU bound, so threads would serialise on the GIL. ``workers``
+    of 0 or 1 hashes in this process.
+    """
+    passwords = list(passwords)
+    if workers is None:
+        workers = min(4, os.cpu_count() or 1)
+    if workers <= 1 or len(passwords) < 2:
+        return [make_password(password) for password in passwords]
+    chunksize = max(1, len(passwords) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(os.environ.get("DJANGO_SETTINGS_MODULE"),)) as pool:
+        return list(pool.map(make_password, passwords, chunksize=chunksize))
+
+
+def read_csv(lines):
+    """Rows of a CSV file (header line first) as ``(line_number, dict)`` pairs."""
+    reader = csv.DictReader(lines)
+    return [(reader.line_num, {key.strip(): (value or "").strip() for key, value in row.items() if key})
+            for row in reader]
+
+
+def _existing(model, field, values):
+    values = list(values)
+    found = set()
+    for start in range(0, len(values), LOOKUP_BATCH_SIZE):
+        chunk = values[start:start + LOOKUP_BATCH_SIZE]
+        found.update(model.objects.filter(**{f"{field}__in": chunk}).values_list(field, flat=True))
+    return found
+
+
+def _parse_date(value):
+    if not value:
+        return date.today()
+    return datetime.strptime(value, "%Y-%m-%d").date()
+
+
+def validate_rows(kind, rows):
+    """
+    Check every row before anything is written.
+
+    Returns ``(valid, errors)``: ``valid`` is a list of ``(line, row)`` with
+    ``date_in`` parsed and, for employees, ``manager_id`` resolved; ``errors``
+    maps line numbers to messages. Uniqueness is checked against the file
+    itself and, with a handful of IN queries, against the database.
+    """
+    model = IMPORT_KINDS[kind]
+    errors = {}
+    seen_usernames, seen_emails = set(), set()
+
+    def fail(line, message):
+        errors.setdefault(line, []).append(message)
+
+    for line, row in rows:
+        missing = [column for column in REQUIRED_COLUMNS if not row.get(column)]
+        if missing:
+            fail(line, f"Missing {', '.join(missing)}")
+        try:
+            row["date_in"] = _parse_date(row.get("date_in", ""))
+        except ValueError:
+            fail(line, "Invalid date_in, use YYYY-MM-DD")
+        if kind == "employee" and not (row.get("manager_id") or row.get("manager_username")):
+            fail(line, "Missing manager_id or manager_username")
+        if row.get("username") in seen_usernames:
+            fail(line, f"Duplicate username {row['username']} in file")
+        if row.get("email") in seen_emails:
+            fail(line, f"Duplicate email {row['email']} in file")
+        seen_usernames.add(row.get("username"))
+        seen_emails.add(row.get("email"))
+
+    usernames = _existing(User, "username", seen_usernames) | _existing(model, "username", seen_usernames)
+    emails = _existing(User, "email", seen_emails) | _existing(model, "email", seen_emails)
+    managers_by_username, manager_ids = {}, set()
+    if kind == "employee":
+        manager_ids = _existing(Manager, "id", {int(row["manager_id"]) for _, row in rows
+                                                if row.get("manager_id", "").isdigit()})
+        wanted = {row["manager_username"] for _, row in rows if row.get("manager_username")}
+        managers_by_username = dict(Manager.objects.filter(username__in=wanted).values_list("username", "id"))
+
+    for line, row in rows:
+        if row.get("username") in usernames:
+            fail(line, f"Username {row['username']} already registered")
+        if row.get("email") in emails:
+            fail(line, f"Email {row['email']} already registered")
+        if kind == "employee":
+            if row.get("manager_username"):
+                row["manager_id"] = managers_by_username.get(row["manager_username"])
+            elif row.get("manager_id", "").isdigit() and int(row["manager_id"]) in manager_ids:
+                row["manager_id"] = int(row["manager_id"])
+            else:
+                row["manager_id"] = None
+            if row["manager_id"] is None and line not in errors:
+                fail(line, "Manager not found")
+
+    valid = [(line, row) for line, row in rows if line not in errors]
+    return valid, errors
+
+
+def _profile(kind, row, user_id):
+    fields = dict(username=row["username"], first_name=row["first_name"], last_name=row["last_name"],
+                  email=row["email"], date_in=row["date_in"], user_auth_id=user_id)
+    status = row.get("active_status") or "Active"
+    if kind == "employee":
+        return Employee(manager_id=row["manager_id"], Gender=row.get("gender", ""), Place=row.get("place", ""),
+                        employee_active_status=status, **fields)
+    return Manager(manager_active_status=status, **fields)
+
+
+def _create_chunk(kind, chunk):
+    with transaction.atomic():
+        User.objects.bulk_create([
+            User(username=row["username"], email=row["email"], password=row["password_hash"])
+            for _, row in chunk
+        ])
+        # MySQL does not hand primary keys back from bulk_create, so look them up
+        user_ids = dict(User.objects.filter(username__in=[row["username"] for _, row in chunk])
+                        .values_list("username", "id"))
+        model = IMPORT_KINDS[kind]
+        model.objects.bulk_create([_profile(kind, row, user_ids[row["username"]]) for _, row in chunk])
+        # bulk_create sends no post_save
+        bump_on_commit(LIST_FOR_MODEL[model])
+
+
+def import_people(kind, rows, workers=None, chunk_size=IMPORT_CHUNK_SIZE, dry_run=False):
+    """
+    Create employees or managers (with their Users) from parsed CSV rows.
+
+    Invalid rows are reported and skipped, the rest are created in chunks
+    of ``chunk_size``, each chunk in its own transaction. A chunk that still
+    hits a constraint (a concurrent insert) is reported row by row and the
+    import carries on. Returns ``{"created": n, "errors": [...]}``.
+    """
+    if kind not in IMPORT_KINDS:
+        raise ValueError(f"kind must be one of {', '.join(IMPORT_KINDS)}")
+    valid, errors = validate_rows(kind, rows)
+    created = 0
+    if not dry_run and valid:
+        hashes = hash_passwords((row["password"] for _, row in valid), workers)
+        for (_, row), password_hash in zip(valid, hashes):
+            row["password_hash"] = password_hash
+        for start in range(0, len(valid), chunk_size):
+            chunk = valid[start:start + chunk_size]
+            try:
+                _create_chunk(kind, chunk)
+                created += len(chunk)
+            except IntegrityError as e:
+                logger.error(f"Import chunk starting at line {chunk[0][0]} failed: {str(e)}")
+                for line, _ in chunk:
+                    errors.setdefault(line, []).append(f"Not created: {str(e)}")
+    return {
+        "created": created,
+        "valid": len(valid),
+        "errors": [{"line": line, "errors": messages} for line, messages in sorted(errors.items())],
+    }
@@ -0,0 +1,91 @@
+"""
+Versioned cache for the list_employees/list_managers responses.
+
+Each list has a version number in the cache, kept without expiry. The
+rendered JSON is stored under its version for settings.LIST_CACHE_TTL
+seconds, so bodies of old versions age out, and every change to the
+model bumps the version once the change has committed (signals.py;
+importer.py for bulk inserts). A hot read is two cache lookups and no
+query, and a read never sees data older than the last committed change:
+a response rendered from pre-commit data is stored under a version that
+is already gone.
+
+The cache alias is settings.LIST_CACHE. A local-memory cache only sees
+bumps made in its own process, so use a shared cache (Redis, Memcached)
+with several workers.
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.http import HttpResponse, HttpResponseNotModified
+from rest_framework.renderers import JSONRenderer
+
+from .models import Employee, Manager
+
+LIST_CACHE_PREFIX = "list_cache"
+
+# list name -> (model, fields returned)
+CACHED_LISTS = {
+    "employees": (Employee, ("id", "first_name", "last_name", "email")),
+    "managers": (Manager, ("id", "first_name", "last_name", "email")),
+}
+LIST_FOR_MODEL = {model: name for name, (model, _) in CACHED_LISTS.items()}
+
+
+def list_cache():
+    return caches[getattr(settings, "LIST_CACHE", "default")]
+
+
+def _version_key(name):
+    return f"{LIST_CACHE_PREFIX}:{name}:version"
+
+
+def list_version(name):
+    cache = list_cache()
+    version = cache.get(_version_key(name))
+    if version is None:
+        # A lost counter restarts at a value never used before, so it
+        # can't land on a version whose stored response is stale
+        cache.add(_version_key(name), time.time_ns(), None)
+        version = cache.get(_version_key(name))
+    return version
+
+
+def bump_list_version(name):
+    cache = list_cache()
+    try:
+        cache.incr(_version_key(name))
+    except ValueError:
+        cache.add(_version_key(name), time.time_ns(), None)
+
+
+def bump_on_commit(name):
+    """Bump ``name`` once the current transaction commits (now, outside one)."""
+    transaction.on_commit(lambda: bump_list_version(name))
+
+
+def cached_list(name):
+    """``(version, JSON body)`` of list ``name``, rendering it on a miss."""
+    cache = list_cache()
+    version = list_version(name)
+    key = f"{LIST_CACHE_PREFIX}:{name}:{version}"
+    body = cache.get(key)
+    if body is None:
+        model, fields = CACHED_LISTS[name]
+        body = JSONRenderer().render({name: list(model.objects.values(*fields))})
+        cache.set(key, body, getattr(settings, "LIST_CACHE_TTL", 300))
+    return version, body
+
+
+def cached_list_response(request, name):
+    """The list as JSON, with an ETag of its version; 304 when the client's copy is current."""
+    version, body = cached_list(name)
+    etag = f'"{name}-{version}"'
+    if request.META.get("HTTP_IF_NONE_MATCH") == etag:
+        response = HttpResponseNotModified()
+    else:
+        response = HttpResponse(body, content_type="application/json")
+    response["ETag"] = etag
+    return response
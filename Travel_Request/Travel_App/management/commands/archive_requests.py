@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from Travel_App.archive import archivable_requests, archive_closed_requests, archive_cutoff
+
+
+class Command(BaseCommand):
+    help = "Move closed travel requests older than --days into the archive table, one chunk per transaction."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=None,
+                            help="Archive requests submitted more than this many days ago (settings.ARCHIVE_AFTER_DAYS).")
+        parser.add_argument("--chunk-size", type=int, default=None,
+                            help="Requests moved per transaction (settings.ARCHIVE_CHUNK_SIZE).")
+        parser.add_argument("--dry-run", action="store_true", help="Only count the requests that would move.")
+
+    def handle(self, *args, **options):
+        cutoff = archive_cutoff(options["days"])
+        if options["dry_run"]:
+            count = archivable_requests(cutoff).count()
+            self.stdout.write(f"{count} closed requests submitted before {cutoff} would be archived.")
+            return
+        moved = archive_closed_requests(options["days"], options["chunk_size"])
+        self.stdout.write(self.style.SUCCESS(f"Archived {moved} closed requests submitted before {cutoff}."))
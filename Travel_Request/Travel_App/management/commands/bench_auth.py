@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from Travel_App.benchmarks.auth import compare_authentication
+from Travel_App.benchmarks.db import throwaway_database
+
+
+class Command(BaseCommand):
+    help = "Compare per-request overhead of DB-backed and signed token authentication."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=5000)
+
+    def handle(self, *args, **options):
+        with throwaway_database():
+            results = compare_authentication(options["iterations"])
+        for name, result in results.items():
+            self.stdout.write(
+                f"{name:<28} {result['us_per_request']:>9} us/request  "
+                f"{result['queries_per_request']:.1f} queries/request"
+            )
@@ -0,0 +1,35 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.test.utils import override_settings
+from rest_framework.authtoken.models import Token
+
+from Travel_App.benchmarks.concurrency import compare_servers
+from Travel_App.benchmarks.db import throwaway_database
+from Travel_App.benchmarks.seed import seed
+from Travel_App.models import Employee
+
+
+class Command(BaseCommand):
+    help = ("Fire N simultaneous employee_dashboard requests at the WSGI handler (threaded) and at the "
+            "ASGI application (sync and async views) and compare throughput and latency.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--clients", type=int, default=500)
+        parser.add_argument("--wsgi-threads", type=int, default=32)
+        parser.add_argument("--db-latency-ms", type=float, default=0,
+                            help="Added to every query to stand in for a networked database.")
+        parser.add_argument("--requests", type=int, default=5000, help="Travel requests to seed.")
+
+    def handle(self, *args, **options):
+        # Throttling would turn most of the burst into 429s
+        rest_framework = {**settings.REST_FRAMEWORK, "DEFAULT_THROTTLE_RATES": {}}
+        with throwaway_database(), override_settings(REST_FRAMEWORK=rest_framework):
+            seed(managers=5, employees=50, requests=options["requests"])
+            employee = Employee.objects.get(username="bench_emp0")
+            token = Token.objects.create(user_id=employee.user_auth_id).key
+            results = compare_servers(token, options["clients"], options["wsgi_threads"], options["db_latency_ms"])
+        for name, result in results.items():
+            self.stdout.write(
+                f"{name:<16} {result['rps']:>8} req/s  p50={result['p50_ms']:>8} ms  p95={result['p95_ms']:>8} ms  "
+                f"errors={result['errors']}/{result['requests']}"
+            )
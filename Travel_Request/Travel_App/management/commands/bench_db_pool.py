@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from Travel_App.benchmarks.pool import compare_connection_pool
+
+
+class Command(BaseCommand):
+    help = ("Compare the per-request cost of a fresh database connection with a pooled one, "
+            "against the configured database (no tables are touched).")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--database", default="default")
+        parser.add_argument("--requests", type=int, default=500)
+
+    def handle(self, *args, **options):
+        results = compare_connection_pool(options["database"], options["requests"])
+        for name, result in results.items():
+            self.stdout.write(f"{name:<24} {result['us_per_request']:>9} us/request")
+        stats = results["pooled_connection"]["pool"]
+        self.stdout.write(f"pool: created={stats['created']} checkouts={stats['checkouts']} "
+                          f"idle={stats['idle']} in_use={stats['in_use']}")
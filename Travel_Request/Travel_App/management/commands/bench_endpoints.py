@@ -0,0 +1,63 @@
+import json
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+
+from Travel_App.archive import archive_closed_requests
+from Travel_App.benchmarks.db import throwaway_database
+from Travel_App.benchmarks.endpoints import DEFAULT_TOLERANCE, compare, run_benchmarks
+from Travel_App.benchmarks.seed import seed_all
+
+
+class Command(BaseCommand):
+    help = ("Benchmark every Travel_App route against seeded data in a throwaway database: p50/p95/p99 "
+            "latency, queries per request and peak memory. Writes a JSON baseline, or compares with one.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--managers", type=int, default=10)
+        parser.add_argument("--employees", type=int, default=100)
+        parser.add_argument("--requests", type=int, default=10000)
+        parser.add_argument("--archive-days", type=int, default=None,
+                            help="Archive closed requests older than this many days after seeding.")
+        parser.add_argument("--iterations", type=int, default=30)
+        parser.add_argument("--routes", nargs="+", help="Only these route names.")
+        parser.add_argument("--output", help="Write the results to this JSON file.")
+        parser.add_argument("--compare", help="Baseline JSON to check the results against.")
+        parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                            help="Allowed relative slowdown before a route is flagged.")
+
+    def handle(self, *args, **options):
+        baseline = None
+        if options["compare"]:
+            with open(options["compare"]) as f:
+                baseline = json.load(f)
+
+        # Throttling would turn the repeated logins into 429s
+        rest_framework = {**settings.REST_FRAMEWORK, "DEFAULT_THROTTLE_RATES": {}}
+        with throwaway_database(), override_settings(REST_FRAMEWORK=rest_framework):
+            seed_all(managers=options["managers"], employees=options["employees"], requests=options["requests"])
+            if options["archive_days"] is not None:
+                archive_closed_requests(options["archive_days"])
+            results = run_benchmarks(options["iterations"], options["routes"])
+        results["seed"] = {key: options[key] for key in ("managers", "employees", "requests", "archive_days")}
+
+        for name, result in results["routes"].items():
+            self.stdout.write(
+                f"{name:<28} p50={result['p50_ms']:>9} p95={result['p95_ms']:>9} p99={result['p99_ms']:>9} ms  "
+                f"queries={result['queries']:>6}  peak={result['peak_kb']:>8} KB  status={result['status']}"
+            )
+        if results["uncovered"]:
+            self.stderr.write(f"Routes without a benchmark case: {', '.join(results['uncovered'])}")
+        if options["output"]:
+            with open(options["output"], "w") as f:
+                json.dump(results, f, indent=2, sort_keys=True)
+            self.stdout.write(f"Wrote {options['output']}")
+
+        if baseline is not None:
+            if baseline.get("seed") != results["seed"]:
+                self.stderr.write(f"Baseline was seeded with {baseline.get('seed')}, this run with {results['seed']}")
+            regressions = compare(baseline, results, options["tolerance"])
+            if regressions:
+                raise CommandError("Regressions against the baseline:\n  " + "\n  ".join(regressions))
+            self.stdout.write("No regressions against the baseline.")
@@ -0,0 +1,30 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.test.utils import override_settings
+from rest_framework.authtoken.models import Token
+
+from Travel_App.benchmarks.db import throwaway_database
+from Travel_App.benchmarks.metrics import measure_overhead
+from Travel_App.benchmarks.seed import seed
+from Travel_App.models import Employee
+
+
+class Command(BaseCommand):
+    help = "Measure the per-request cost of the request metrics middleware and query recorder."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--path", default="/travel/employee_dashboard/")
+        parser.add_argument("--requests", type=int, default=2000)
+
+    def handle(self, *args, **options):
+        # Throttling would turn most of the run into 429s
+        rest_framework = {**settings.REST_FRAMEWORK, "DEFAULT_THROTTLE_RATES": {}}
+        with throwaway_database(), override_settings(REST_FRAMEWORK=rest_framework):
+            seed(managers=5, employees=50, requests=2000)
+            employee = Employee.objects.get(username="bench_emp0")
+            token = Token.objects.create(user_id=employee.user_auth_id).key
+            results = measure_overhead(options["path"], token, options["requests"])
+        for name in ("without_metrics", "with_metrics"):
+            self.stdout.write(f"{name:<16} {results[name]['median_us']:>10} us/request (median)")
+        overhead = results["overhead"]
+        self.stdout.write(f"overhead         {overhead['median_us']:>10} us/request ({overhead['percent']}%)")
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from Travel_App.benchmarks.db import throwaway_database
+from Travel_App.benchmarks.occupancy import measure_overlap
+from Travel_App.benchmarks.seed import seed
+
+
+class Command(BaseCommand):
+    help = "Time the bounded date-overlap query and the daily occupancy sweep as the table grows."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, nargs="+", default=[10000, 100000, 1000000])
+        parser.add_argument("--window-days", type=int, default=14)
+        parser.add_argument("--repeat", type=int, default=5)
+
+    def handle(self, *args, **options):
+        with throwaway_database():
+            seed(managers=50, employees=2000, requests=0)
+            for result in measure_overlap(options["rows"], options["window_days"], options["repeat"]):
+                plan = "FULL SCAN" if result["bounded_full_scan"] else "index"
+                self.stdout.write(
+                    f"rows={result['rows']:<8} trips={result['trips']:<6} bounded={result['bounded_ms']:>8} ms "
+                    f"({plan})  plain={result['plain_ms']:>8} ms  occupancy={result['occupancy_ms']:>8} ms"
+                )
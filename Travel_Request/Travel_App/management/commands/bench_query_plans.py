@@ -0,0 +1,40 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from Travel_App.benchmarks.db import throwaway_database
+from Travel_App.benchmarks.query_plans import capture_plans
+from Travel_App.benchmarks.seed import seed
+
+
+class Command(BaseCommand):
+    help = "Seed a throwaway database and EXPLAIN the hot Employee_Request queries."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=200000)
+        parser.add_argument("--managers", type=int, default=50)
+        parser.add_argument("--employees", type=int, default=2000)
+        parser.add_argument("--output", help="Write the plans to this JSON file")
+        parser.add_argument("--keepdb", action="store_true", help="Reuse the benchmark database between runs")
+
+    def handle(self, *args, **options):
+        with throwaway_database(keepdb=options["keepdb"]):
+            self.stdout.write(f"Seeding {options['requests']} requests...")
+            org = seed(managers=options["managers"], employees=options["employees"],
+                       requests=options["requests"])
+            employee = org["employees"].first()
+            results = capture_plans(employee.manager, employee)
+
+        for result in results:
+            verdict = "FULL SCAN" if result["full_scan"] else "index"
+            self.stdout.write(f"{result['name']:<28} {verdict:<10} {result['ms']:>9} ms  rows={result['rows']}")
+            self.stdout.write("    " + result["plan"].replace("\n", "\n    "))
+
+        if options["output"]:
+            with open(options["output"], "w") as handle:
+                json.dump(results, handle, indent=2)
+
+        scans = [r["name"] for r in results if r["full_scan"]]
+        if scans:
+            raise CommandError(f"Full table scans in: {', '.join(scans)}")
+        self.stdout.write(self.style.SUCCESS("Every query shape uses an index."))
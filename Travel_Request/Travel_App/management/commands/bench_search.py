@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from Travel_App.benchmarks.db import throwaway_database
+from Travel_App.benchmarks.search import measure_search
+from Travel_App.benchmarks.seed import seed
+
+
+class Command(BaseCommand):
+    help = "Time indexed request search against icontains scans as the table grows."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, nargs="+", default=[10000, 100000, 1000000])
+        parser.add_argument("--repeat", type=int, default=5)
+
+    def handle(self, *args, **options):
+        with throwaway_database():
+            seed(managers=50, employees=2000, requests=0)
+            for result in measure_search(options["rows"], options["repeat"]):
+                self.stdout.write(
+                    f"rows={result['rows']:<8} matches={result['matches']:<4} "
+                    f"indexed={result['indexed_ms']:>8} ms  icontains={result['icontains_ms']:>9} ms"
+                )
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from Travel_App.benchmarks.db import throwaway_database
+from Travel_App.benchmarks.seed import seed
+from Travel_App.benchmarks.serialization import compare_serialization
+
+
+class Command(BaseCommand):
+    help = "Compare table serializers with the values() projections at several row counts."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, nargs="+", default=[10000, 100000])
+
+    def handle(self, *args, **options):
+        sizes = sorted(options["rows"])
+        with throwaway_database():
+            seed(managers=50, employees=2000, requests=sizes[-1])
+            for size in sizes:
+                for table, result in compare_serialization(size).items():
+                    self.stdout.write(
+                        f"{table:<9} rows={result['rows']:<7} serializer={result['serializer_ms']:>9} ms  "
+                        f"projection={result['projection_ms']:>8} ms  x{result['speedup']}"
+                    )
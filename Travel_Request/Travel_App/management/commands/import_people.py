@@ -0,0 +1,29 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from Travel_App.importer import IMPORT_CHUNK_SIZE, IMPORT_KINDS, import_people, read_csv
+
+
+class Command(BaseCommand):
+    help = ("Bulk-create employees or managers from a CSV file with columns username, first_name, "
+            "last_name, email, password and optionally date_in, active_status, gender, place, "
+            "manager_id / manager_username (employees).")
+
+    def add_arguments(self, parser):
+        parser.add_argument("kind", choices=sorted(IMPORT_KINDS))
+        parser.add_argument("csv_file")
+        parser.add_argument("--workers", type=int, default=None,
+                            help="Processes used to hash passwords (default: up to 4).")
+        parser.add_argument("--chunk-size", type=int, default=IMPORT_CHUNK_SIZE)
+        parser.add_argument("--dry-run", action="store_true", help="Only validate the file.")
+
+    def handle(self, *args, **options):
+        with open(options["csv_file"], newline="", encoding="utf-8-sig") as f:
+            rows = read_csv(f)
+        result = import_people(options["kind"], rows, workers=options["workers"],
+                               chunk_size=options["chunk_size"], dry_run=options["dry_run"])
+        for error in result["errors"]:
+            self.stderr.write(f"line {error['line']}: {'; '.join(error['errors'])}")
+        self.stdout.write(json.dumps({"created": result["created"], "valid": result["valid"],
+                                      "errors": len(result["errors"])}))
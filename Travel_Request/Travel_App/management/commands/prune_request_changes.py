@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from Travel_App.changes import prune_changes
+
+
+class Command(BaseCommand):
+    help = "Delete delta-sync change entries older than --days; clients with older cursors reload."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=None,
+                            help="Keep this many days of changes (settings.CHANGES_RETENTION_DAYS).")
+
+    def handle(self, *args, **options):
+        deleted = prune_changes(options["days"])
+        self.stdout.write(self.style.SUCCESS(f"Pruned {deleted} request changes."))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from Travel_App.search import rebuild_index
+
+
+class Command(BaseCommand):
+    help = "Rebuild the SearchToken index for every travel request (after bulk loads)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        total = rebuild_index(options["chunk_size"])
+        self.stdout.write(self.style.SUCCESS(f"Indexed {total} requests."))
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from Travel_App.counters import reconcile_counters
+
+
+class Command(BaseCommand):
+    help = "Recount RequestCounter from the travel requests, report drift and rebuild the table."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--check", action="store_true", help="Only report drift, change nothing.")
+
+    def handle(self, *args, **options):
+        drift = reconcile_counters(fix=not options["check"])
+        for (scope, owner_id, field, value), (stored, expected) in sorted(drift.items(), key=str):
+            self.stdout.write(f"{scope} {owner_id} {field}={value}: stored {stored}, expected {expected}")
+        if not drift:
+            self.stdout.write(self.style.SUCCESS("Counters match the requests."))
+        elif options["check"]:
+            self.stdout.write(self.style.WARNING(f"{len(drift)} counters drifted."))
+        else:
+            self.stdout.write(self.style.SUCCESS(f"Rebuilt counters, {len(drift)} had drifted."))
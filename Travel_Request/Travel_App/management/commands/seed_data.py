@@ -0,0 +1,29 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from Travel_App.benchmarks.seed import SEED_PASSWORD, seed_all
+from Travel_App.models import Admin
+
+
+class Command(BaseCommand):
+    help = ("Fill the configured database with a synthetic org and travel requests (bulk inserts), "
+            "then build the search index and status counters for it.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--managers", type=int, default=10)
+        parser.add_argument("--employees", type=int, default=100)
+        parser.add_argument("--requests", type=int, default=10000)
+        parser.add_argument("--batch-size", type=int, default=5000)
+
+    def handle(self, *args, **options):
+        if Admin.objects.filter(username="bench_admin").exists():
+            raise CommandError("This database already holds seeded data (bench_admin exists).")
+        started = time.perf_counter()
+        seed_all(managers=options["managers"], employees=options["employees"], requests=options["requests"],
+                 batch_size=options["batch_size"])
+        self.stdout.write(
+            f"Seeded {options['managers']} managers, {options['employees']} employees and "
+            f"{options['requests']} requests in {time.perf_counter() - started:.1f}s "
+            f"(password for every bench_* user: {SEED_PASSWORD})"
+        )
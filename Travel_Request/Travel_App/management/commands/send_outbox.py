@@ -0,0 +1,45 @@
+import logging
+import time
+
+from django.core.management.base import BaseCommand
+
+from Travel_App.outbox import drain_outbox, outbox_metrics
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = "Send queued notification mails from the outbox in batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=100)
+        parser.add_argument("--max-attempts", type=int, default=5)
+        parser.add_argument("--loop", action="store_true", help="Keep polling instead of exiting when drained")
+        parser.add_argument("--interval", type=float, default=5.0, help="Seconds to sleep when the queue is empty")
+
+    def handle(self, *args, **options):
+        while True:
+            try:
+                drain_outbox(options["batch_size"], options["max_attempts"])
+            except Exception as e:
+                if not options["loop"]:
+                    raise
+                # The database went away; keep the worker alive and try again
+                logger.error(f"Outbox worker: batch failed: {str(e)}")
+                time.sleep(options["interval"])
+                continue
+            metrics = outbox_metrics()
+            if metrics["last_batch_size"]:
+                self._report(metrics)
+            if metrics["last_batch_size"] < options["batch_size"]:
+                if not options["loop"]:
+                    break
+                time.sleep(options["interval"])
+        self._report(metrics)
+
+    def _report(self, metrics):
+        self.stdout.write(
+            f"queue_depth={metrics['queue_depth']} sent_total={metrics['sent_total']} "
+            f"failed_total={metrics['failed_total']} retried_total={metrics['retried_total']} "
+            f"last_send_ms={metrics['last_send_ms']}"
+        )
@@ -0,0 +1,317 @@
+"""
+Per-endpoint request metrics.
+
+RequestMetricsMiddleware times every request and, through a query wrapper
+installed on each new DB connection, counts its queries and their time.
+Views mark extra phases with ``timed("serialize")``. Totals are kept per
+(method, route) in this process and served in Prometheus text format by
+the ``metrics`` view; each response also gets a ``Server-Timing`` header.
+
+Every worker process keeps its own registry, so scrape each worker (or run
+one metrics endpoint per process) rather than a load-balanced URL.
+"""
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+
+from .outbox import outbox_table_metrics
+from .pool import pool_metrics
+
+DEFAULT_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+UNMATCHED_ROUTE = "<unmatched>"
+METRICS_MIDDLEWARE = "Travel_App.metrics.RequestMetricsMiddleware"
+# Statements the ORM sends for atomic(), as the backends spell them
+TRANSACTION_SQL = ("BEGIN", "SAVEPOINT", "RELEASE SAVEPOINT", "ROLLBACK TO SAVEPOINT")
+
+# The RequestMetrics of the request being served, if any
+_current = ContextVar("request_metrics", default=None)
+
+
+class RequestMetrics:
+    """What one request spent its time on, filled in while it runs."""
+    __slots__ = ("started", "db_queries", "db_seconds", "phases")
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.db_queries = 0
+        self.db_seconds = 0.0
+        self.phases = {}
+
+    def add_phase(self, name, seconds):
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+
+def current_metrics():
+    return _current.get()
+
+
+def record_query(execute, sql, params, many, context):
+    """
+    Connection execute wrapper: count the query against the current request.
+
+    Transaction control statements add to the DB time but are not counted
+    as queries, so counts don't depend on whether a view runs in an outer
+    transaction.
+    """
+    metrics = _current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        if not sql.startswith(TRANSACTION_SQL):
+            metrics.db_queries += 1
+        metrics.db_seconds += time.perf_counter() - started
+
+
+def install_query_recorder(sender=None, connection=None, **kwargs):
+    """connection_created receiver, connected in TravelAppConfig.ready()."""
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+@contextmanager
+def timed(phase):
+    """Add the time spent in the block to ``phase`` of the current request."""
+    metrics = _current.get()
+    if metrics is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.add_phase(phase, time.perf_counter() - started)
+
+
+class _RouteStats:
+    __slots__ = ("buckets", "count", "seconds", "statuses", "db_queries", "db_seconds", "phases",
+                 "response_bytes")
+
+    def __init__(self, bucket_count):
+        self.buckets = [0] * (bucket_count + 1)  # the last one is +Inf
+        self.count = 0
+        self.seconds = 0.0
+        self.statuses = {}
+        self.db_queries = 0
+        self.db_seconds = 0.0
+        self.phases = {}
+        self.response_bytes = 0
+
+
+class MetricsRegistry:
+    """Thread-safe per-(method, route) totals and latency histograms."""
+
+    def __init__(self, buckets=DEFAULT_LATENCY_BUCKETS):
+        self.bounds = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        self._routes = {}
+
+    def observe(self, method, route, status, seconds, metrics, response_bytes):
+        bucket = bisect.bisect_left(self.bounds, seconds)
+        with self._lock:
+            stats = self._routes.get((method, route))
+            if stats is None:
+                stats = self._routes[(method, route)] = _RouteStats(len(self.bounds))
+            stats.buckets[bucket] += 1
+            stats.count += 1
+            stats.seconds += seconds
+            stats.statuses[status] = stats.statuses.get(status, 0) + 1
+            stats.db_queries += metrics.db_queries
+            stats.db_seconds += metrics.db_seconds
+            for phase, phase_seconds in metrics.phases.items():
+                stats.phases[phase] = stats.phases.get(phase, 0.0) + phase_seconds
+            stats.response_bytes += response_bytes
+
+    def snapshot(self):
+        """``{(method, route): stats dict}`` with cumulative histogram buckets."""
+        with self._lock:
+            routes = {
+                key: {
+                    "buckets": list(stats.buckets), "count": stats.count, "seconds": stats.seconds,
+                    "statuses": dict(stats.statuses), "db_queries": stats.db_queries,
+                    "db_seconds": stats.db_seconds, "phases": dict(stats.phases),
+                    "response_bytes": stats.response_bytes,
+                }
+                for key, stats in self._routes.items()
+            }
+        for stats in routes.values():
+            running = 0
+            for i, n in enumerate(stats["buckets"]):
+                running += n
+                stats["buckets"][i] = running
+        return routes
+
+    def reset(self):
+        with self._lock:
+            self._routes.clear()
+
+
+registry = MetricsRegistry(getattr(settings, "METRICS_LATENCY_BUCKETS", DEFAULT_LATENCY_BUCKETS))
+
+
+def reset_metrics():
+    registry.reset()
+
+
+def _route(request):
+    match = getattr(request, "resolver_match", None)
+    # The URL pattern, not the path, so ids don't explode the label set
+    return match.route if match is not None else UNMATCHED_ROUTE
+
+
+def _response_bytes(response):
+    if response.streaming:
+        return 0
+    return len(response.content)
+
+
+def server_timing(total_seconds, metrics):
+    parts = [f"app;dur={total_seconds * 1000:.2f}",
+             f'db;dur={metrics.db_seconds * 1000:.2f};desc="{metrics.db_queries} queries"']
+    parts.extend(f"{phase};dur={seconds * 1000:.2f}" for phase, seconds in metrics.phases.items())
+    return ", ".join(parts)
+
+
+class RequestMetricsMiddleware:
+    """
+    Record latency, DB queries/time, phases and response size per route.
+
+    Put it first in MIDDLEWARE so the timing covers the whole stack. Adds a
+    Server-Timing header unless settings.METRICS_SERVER_TIMING is False.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.server_timing = getattr(settings, "METRICS_SERVER_TIMING", True)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def _finish(self, request, response, metrics):
+        seconds = time.perf_counter() - metrics.started
+        registry.observe(request.method, _route(request), response.status_code, seconds, metrics,
+                         _response_bytes(response))
+        if self.server_timing:
+            response["Server-Timing"] = server_timing(seconds, metrics)
+        return response
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self._finish(request, response, metrics)
+
+    async def __acall__(self, request):
+        metrics = RequestMetrics()
+        # sync_to_async copies the context, so queries run on worker threads
+        # still land in this request's metrics
+        token = _current.set(metrics)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self._finish(request, response, metrics)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(**labels):
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + "}"
+
+
+def _format_le(bound):
+    return f"{bound:g}"
+
+
+def render_prometheus():
+    """All request, outbox and connection pool metrics in Prometheus text format."""
+    lines = []
+
+    def family(name, kind, help_text):
+        # Counter families are named without _total; their samples carry it
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+
+    routes = sorted(registry.snapshot().items())
+
+    family("travel_http_request_duration_seconds", "histogram", "Request latency by route.")
+    for (method, route), stats in routes:
+        for bound, cumulative in zip((*map(_format_le, registry.bounds), "+Inf"), stats["buckets"]):
+            lines.append(f"travel_http_request_duration_seconds_bucket"
+                         f"{_labels(method=method, route=route, le=bound)} {cumulative}")
+        labels = _labels(method=method, route=route)
+        lines.append(f"travel_http_request_duration_seconds_sum{labels} {stats['seconds']:.6f}")
+        lines.append(f"travel_http_request_duration_seconds_count{labels} {stats['count']}")
+
+    family("travel_http_responses", "counter", "Responses by route and status code.")
+    for (method, route), stats in routes:
+        for status, count in sorted(stats["statuses"].items()):
+            lines.append(f"travel_http_responses_total{_labels(method=method, route=route, status=status)} {count}")
+
+    family("travel_http_response_bytes", "counter", "Response body bytes by route (not streamed).")
+    for (method, route), stats in routes:
+        lines.append(f"travel_http_response_bytes_total{_labels(method=method, route=route)} "
+                     f"{stats['response_bytes']}")
+
+    family("travel_db_queries", "counter", "Database queries run while serving the route.")
+    for (method, route), stats in routes:
+        lines.append(f"travel_db_queries_total{_labels(method=method, route=route)} {stats['db_queries']}")
+
+    family("travel_db_query_seconds", "counter", "Time spent in database queries by route.")
+    for (method, route), stats in routes:
+        lines.append(f"travel_db_query_seconds_total{_labels(method=method, route=route)} "
+                     f"{stats['db_seconds']:.6f}")
+
+    family("travel_phase_seconds", "counter", "Time in named phases (e.g. serialize) by route.")
+    for (method, route), stats in routes:
+        for phase, seconds in sorted(stats["phases"].items()):
+            lines.append(f"travel_phase_seconds_total{_labels(method=method, route=route, phase=phase)} "
+                         f"{seconds:.6f}")
+
+    # From the table, so every worker reports the same queue
+    outbox = outbox_table_metrics()
+    family("travel_outbox_queued", "gauge", "Mails waiting in the outbox.")
+    lines.append(f"travel_outbox_queued {outbox['queued']}")
+    family("travel_outbox_failed", "gauge", "Mails the outbox gave up on.")
+    lines.append(f"travel_outbox_failed {outbox['failed']}")
+    family("travel_outbox_oldest_pending_seconds", "gauge", "Age of the oldest mail waiting in the outbox.")
+    lines.append(f"travel_outbox_oldest_pending_seconds {outbox['oldest_pending_seconds']:.3f}")
+
+    pools = sorted(pool_metrics().items())
+    for key, kind in (("size", "gauge"), ("in_use", "gauge"), ("idle", "gauge"), ("checkouts", "counter"),
+                      ("created", "counter"), ("timeouts", "counter"), ("waits", "counter")):
+        family(f"travel_db_pool_{key}", kind, f"Connection pool {key.replace('_', ' ')}.")
+        sample = f"travel_db_pool_{key}_total" if kind == "counter" else f"travel_db_pool_{key}"
+        for alias, stats in pools:
+            lines.append(f"{sample}{_labels(alias=alias)} {stats[key]}")
+    family("travel_db_pool_wait_seconds", "counter", "Time checkouts spent waiting for a free connection.")
+    for alias, stats in pools:
+        lines.append(f"travel_db_pool_wait_seconds_total{_labels(alias=alias)} {stats['wait_ms_total'] / 1000:.6f}")
+    family("travel_db_pool_wait_max_seconds", "gauge", "Longest wait for a free connection.")
+    for alias, stats in pools:
+        lines.append(f"travel_db_pool_wait_max_seconds{_labels(alias=alias)} {stats['wait_ms_max'] / 1000:.6f}")
+    return "\n".join(lines) + "\n"
+
+
+def metrics(request):
+    """Prometheus scrape endpoint; open to settings.METRICS_ALLOWED_IPS."""
+    allowed = getattr(settings, "METRICS_ALLOWED_IPS", ["127.0.0.1", "::1"])
+    if request.META.get("REMOTE_ADDR") not in allowed:
+        return HttpResponseForbidden()
+    return HttpResponse(render_prometheus(), content_type="text/plain; version=0.0.4; charset=utf-8")
@@ -0,0 +1,37 @@
+# Generated by Django 4.2 on 2026-10-18 14:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Travel_App', '0002_admin_is_admin'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='employee_request',
+            index=models.Index(fields=['date_of_sub', 'id'], name='req_sub_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='employee_request',
+            index=models.Index(fields=['manager', 'date_of_sub', 'id'], name='req_mgr_sub_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='employee_request',
+            index=models.Index(fields=['employee', 'date_of_sub', 'id'], name='req_emp_sub_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='employee_request',
+            index=models.Index(fields=['manager', 'manager_status'], name='req_mgr_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='employee_request',
+            index=models.Index(fields=['admin_status', 'date_of_sub'], name='req_admin_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='employee_request',
+            index=models.Index(fields=['from_date', 'to_date'], name='req_travel_dates_idx'),
+        ),
+    ]
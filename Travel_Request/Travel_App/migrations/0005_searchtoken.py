@@ -0,0 +1,27 @@
+# Generated by Django 4.2 on 2026-10-18 14:42
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Travel_App', '0004_emailoutbox'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchToken',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('token', models.CharField(max_length=40)),
+                ('weight', models.SmallIntegerField(default=1)),
+                ('request', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_tokens', to='Travel_App.employee_request')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='searchtoken',
+            constraint=models.UniqueConstraint(fields=('token', 'request'), name='search_token_uniq'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 4.2 on 2026-10-18 14:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Travel_App', '0005_searchtoken'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RequestCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scope', models.CharField(choices=[('all', 'all'), ('manager', 'manager'), ('employee', 'employee')], max_length=10)),
+                ('owner_id', models.IntegerField()),
+                ('field', models.CharField(max_length=20)),
+                ('value', models.CharField(max_length=20)),
+                ('count', models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='requestcounter',
+            constraint=models.UniqueConstraint(fields=('scope', 'owner_id', 'field', 'value'), name='request_counter_uniq'),
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 4.2 on 2026-10-18 15:24
+
+import datetime
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Travel_App', '0006_requestcounter'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedRequest',
+            fields=[
+                ('date_of_sub', models.DateField(default=datetime.date.today)),
+                ('purpose', models.CharField(max_length=100)),
+                ('from_loc', models.CharField(max_length=100)),
+                ('to_loc', models.CharField(max_length=100)),
+                ('travel_mode', models.CharField(choices=[('Flight', 'Flight'), ('Train', 'Train'), ('Bus', 'Bus'), ('Car', 'Car')], max_length=20)),
+                ('from_date', models.DateField()),
+                ('to_date', models.DateField()),
+                ('lodging_required', models.CharField(choices=[('Yes', 'Yes'), ('No', 'No')], default='No', max_length=20)),
+                ('additional_request', models.CharField(max_length=300)),
+                ('manager_note', models.CharField(max_length=300)),
+                ('admin_note', models.CharField(max_length=300)),
+                ('no_of_resub', models.IntegerField()),
+                ('manager_status', models.CharField(choices=[('Approved', 'Approved'), ('Declined', 'Declined'), ('Pending', 'Pending')], default='Pending', max_length=20)),
+                ('admin_status', models.CharField(choices=[('Closed', 'Closed'), ('Not_Closed', 'Not_closed')], default='Not_closed', max_length=20)),
+                ('id', models.IntegerField(primary_key=True, serialize=False)),
+                ('archived_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('employee', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, to='Travel_App.employee')),
+                ('manager', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, to='Travel_App.manager')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='archivedrequest',
+            index=models.Index(fields=['date_of_sub', 'id'], name='arch_sub_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='archivedrequest',
+            index=models.Index(fields=['manager', 'date_of_sub', 'id'], name='arch_mgr_sub_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='archivedrequest',
+            index=models.Index(fields=['employee', 'date_of_sub', 'id'], name='arch_emp_sub_idx'),
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 4.2 on 2026-10-18 15:50
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Travel_App', '0007_archivedrequest'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RequestChange',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('request_id', models.IntegerField()),
+                ('employee_id', models.IntegerField()),
+                ('manager_id', models.IntegerField()),
+                ('kind', models.CharField(choices=[('upsert', 'upsert'), ('delete', 'delete')], max_length=10)),
+                ('changed_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='archivedrequest',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='employee_request',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddIndex(
+            model_name='employee_request',
+            index=models.Index(fields=['updated_at'], name='req_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='requestchange',
+            index=models.Index(fields=['manager_id', 'id'], name='change_mgr_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='requestchange',
+            index=models.Index(fields=['employee_id', 'id'], name='change_emp_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='requestchange',
+            index=models.Index(fields=['changed_at'], name='change_time_idx'),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 4.2 on 2026-10-18 16:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Travel_App', '0008_request_changes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='archivedrequest',
+            name='id',
+            field=models.BigIntegerField(primary_key=True, serialize=False),
+        ),
+        migrations.AlterField(
+            model_name='requestchange',
+            name='employee_id',
+            field=models.BigIntegerField(),
+        ),
+        migrations.AlterField(
+            model_name='requestchange',
+            name='manager_id',
+            field=models.BigIntegerField(),
+        ),
+        migrations.AlterField(
+            model_name='requestchange',
+            name='request_id',
+            field=models.BigIntegerField(),
+        ),
+        migrations.AlterField(
+            model_name='requestcounter',
+            name='owner_id',
+            field=models.BigIntegerField(),
+        ),
+    ]
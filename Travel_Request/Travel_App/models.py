@@ -1,4 +1,5 @@
 from django.db import models
+from django.utils import timezone
 from datetime import date
 from django.contrib.auth.models import User
 
@@ -64,7 +65,8 @@ manager_approval_status = (
     ("Pending", "Pending")
 )
 
-class Employee_Request(models.Model):
+class TravelRequestFields(models.Model):
+    """Columns shared by the live requests and their archive."""
     employee = models.ForeignKey("Employee", on_delete=models.PROTECT)
     manager = models.ForeignKey("Manager", on_delete=models.PROTECT)
     date_of_sub = models.DateField(default=date.today)
@@ -81,12 +83,117 @@ class Employee_Request(models.Model):
     no_of_resub = models.IntegerField()
     manager_status = models.CharField(max_length=20,choices=manager_approval_status,default="Pending")
     admin_status = models.CharField(max_length=20,choices=admin_closing_status,default="Not_closed")
+    # Set by save(); QuerySet.update() callers set it themselves
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        abstract = True
+
+class Employee_Request(TravelRequestFields):
+    class Meta:
+        indexes = [
+            # Dashboards page on (date_of_sub, id), see pagination.KeysetPagination
+            models.Index(fields=["date_of_sub", "id"], name="req_sub_idx"),
+            models.Index(fields=["manager", "date_of_sub", "id"], name="req_mgr_sub_idx"),
+            models.Index(fields=["employee", "date_of_sub", "id"], name="req_emp_sub_idx"),
+            # Manager queues filtered by approval status
+            models.Index(fields=["manager", "manager_status"], name="req_mgr_status_idx"),
+            # filter_sort_search filters
+            models.Index(fields=["admin_status", "date_of_sub"], name="req_admin_status_idx"),
+            models.Index(fields=["from_date", "to_date"], name="req_travel_dates_idx"),
+            models.Index(fields=["updated_at"], name="req_updated_idx"),
+        ]
+
+
+class ArchivedRequest(TravelRequestFields):
+    """Closed request moved out of Employee_Request by Travel_App.archive, under its original id."""
+    id = models.BigIntegerField(primary_key=True)
+    archived_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            # Same keyset orderings as the live table, for include_archived
+            models.Index(fields=["date_of_sub", "id"], name="arch_sub_idx"),
+            models.Index(fields=["manager", "date_of_sub", "id"], name="arch_mgr_sub_idx"),
+            models.Index(fields=["employee", "date_of_sub", "id"], name="arch_emp_sub_idx"),
+        ]
+
+
+outbox_status = (
+    ("Pending", "Pending"),
+    ("Sent", "Sent"),
+    ("Failed", "Failed")
+)
 
+class EmailOutbox(models.Model):
+    """Mail queued in the same transaction as the ticket change, sent by send_outbox."""
+    subject = models.CharField(max_length=200)
+    body = models.TextField()
+    from_email = models.CharField(max_length=100)
+    recipients = models.TextField()  # comma separated
+    status = models.CharField(max_length=20, choices=outbox_status, default="Pending")
+    attempts = models.IntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.CharField(max_length=300, blank=True, default="")
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "next_attempt_at"], name="outbox_due_idx"),
+        ]
+
+
+class SearchToken(models.Model):
+    """Inverted index for ranked request search, maintained by Travel_App.search."""
+    token = models.CharField(max_length=40)
+    request = models.ForeignKey("Employee_Request", on_delete=models.CASCADE, related_name="search_tokens")
+    weight = models.SmallIntegerField(default=1)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["token", "request"], name="search_token_uniq"),
+        ]
+
+
+counter_scopes = (
+    ("all", "all"),
+    ("manager", "manager"),
+    ("employee", "employee")
+)
 
+class RequestCounter(models.Model):
+    """Requests per owner and status value, kept in step by Travel_App.counters."""
+    scope = models.CharField(max_length=10, choices=counter_scopes)
+    owner_id = models.BigIntegerField()  # Manager/Employee id, 0 for scope "all"
+    field = models.CharField(max_length=20)  # manager_status or admin_status
+    value = models.CharField(max_length=20)
+    count = models.IntegerField(default=0)
 
-
-    
-        
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["scope", "owner_id", "field", "value"], name="request_counter_uniq"),
+        ]
 
 
+change_kinds = (
+    ("upsert", "upsert"),
+    ("delete", "delete")
+)
 
+class RequestChange(models.Model):
+    """Change feed of Employee_Request, written by Travel_App.changes; the id is the sync cursor."""
+    # Plain ids, not foreign keys: entries outlive the requests they describe
+    request_id = models.BigIntegerField()
+    employee_id = models.BigIntegerField()
+    manager_id = models.BigIntegerField()
+    kind = models.CharField(max_length=10, choices=change_kinds)
+    changed_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            # changes?since= per dashboard: (owner, id > cursor)
+            models.Index(fields=["manager_id", "id"], name="change_mgr_idx"),
+            models.Index(fields=["employee_id", "id"], name="change_emp_idx"),
+            models.Index(fields=["changed_at"], name="change_time_idx"),
+        ]
@@ -0,0 +1,131 @@
+"""
+Who is travelling when: trips overlapping a date window, and travellers per day.
+
+A trip overlaps ``[start, end]`` when ``from_date <= end`` and
+``to_date >= start``. Either half alone is an open-ended range over the
+whole history, so overlapping() also bounds from_date from below by the
+longest trip on record: no trip that left before ``start - longest`` can
+still be on the road. The query becomes one bounded range scan of
+req_travel_dates_idx (from_date, to_date), whose to_date column settles
+the rest of the condition inside the index.
+
+The longest trip is cached for settings.TRIP_BOUND_TTL seconds and raised
+as soon as a longer trip is saved (signals.py). Trips added with
+bulk_create() are only seen once the cached value expires, and so are
+saves in other processes unless the default cache is shared.
+"""
+from collections import defaultdict
+from datetime import date, timedelta
+from itertools import accumulate
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, DurationField, ExpressionWrapper, F, Max
+
+from .models import Employee_Request
+
+TRIP_BOUND_KEY = "occupancy:longest_trip_days"
+# Declined trips never happen
+NOT_TRAVELLING = ("Declined",)
+
+
+def _trip_bound_ttl():
+    return getattr(settings, "TRIP_BOUND_TTL", 300)
+
+
+def _as_date(value):
+    # Instances created from request data still hold the ISO strings
+    return value if isinstance(value, date) else date.fromisoformat(str(value))
+
+
+def longest_trip_days():
+    """Length in days of the longest trip (to_date - from_date), cached."""
+    days = cache.get(TRIP_BOUND_KEY)
+    if days is None:
+        length = ExpressionWrapper(F("to_date") - F("from_date"), output_field=DurationField())
+        longest = Employee_Request.objects.aggregate(longest=Max(length))["longest"]
+        days = max(longest.days, 0) if longest is not None else 0
+        cache.set(TRIP_BOUND_KEY, days, _trip_bound_ttl())
+    return days
+
+
+def extend_trip_bound(trip):
+    """Raise the cached longest trip if ``trip`` is longer."""
+    bound = cache.get(TRIP_BOUND_KEY)
+    if bound is None:
+        return
+    days = (_as_date(trip.to_date) - _as_date(trip.from_date)).days
+    if days > bound:
+        cache.set(TRIP_BOUND_KEY, days, _trip_bound_ttl())
+
+
+def travelling_requests():
+    return Employee_Request.objects.exclude(manager_status__in=NOT_TRAVELLING)
+
+
+def overlapping(queryset, start, end):
+    """Rows of ``queryset`` whose trip is on the road on any day of [start, end]."""
+    earliest = start - timedelta(days=longest_trip_days())
+    return queryset.filter(from_date__gte=earliest, from_date__lte=end, to_date__gte=start)
+
+
+def parse_window(params):
+    """
+    ``(start, end)`` dates from the ``start`` and ``end`` query parameters.
+
+    Raises ValueError with a message for the client when either is missing
+    or invalid, or the window is longer than settings.CALENDAR_MAX_DAYS.
+    """
+    try:
+        start = date.fromisoformat(params.get("start", "").strip())
+        end = date.fromisoformat(params.get("end", "").strip())
+    except ValueError:
+        raise ValueError("start and end must be dates in YYYY-MM-DD format")
+    if end < start:
+        raise ValueError("end must not be before start")
+    max_days = getattr(settings, "CALENDAR_MAX_DAYS", 366)
+    if (end - start).days + 1 > max_days:
+        raise ValueError(f"The window can span at most {max_days} days")
+    return start, end
+
+
+def daily_occupancy(start, end, queryset=None):
+    """
+    Travellers on the road each day of [start, end], in total, by destination
+    (to_loc) and by travel_mode.
+
+    The database groups the overlapping trips by dates, destination and
+    mode; each group then adds its count where it enters the window and
+    takes it off the day after it leaves, and a running sum per series
+    gives the daily figures. The work grows with the groups plus the days,
+    not with the days each trip spans.
+    """
+    queryset = travelling_requests() if queryset is None else queryset
+    groups = (overlapping(queryset, start, end).order_by()
+              .values("from_date", "to_date", "to_loc", "travel_mode").annotate(travellers=Count("id")))
+    days = (end - start).days + 1
+    total = [0] * (days + 1)
+    destinations = defaultdict(lambda: [0] * (days + 1))
+    modes = defaultdict(lambda: [0] * (days + 1))
+    for group in groups:
+        first = max((group["from_date"] - start).days, 0)
+        last = min((group["to_date"] - start).days, days - 1)
+        if last < first:  # to_date before from_date
+            continue
+        count = group["travellers"]
+        for changes in (total, destinations[group["to_loc"]], modes[group["travel_mode"]]):
+            changes[first] += count
+            changes[last + 1] -= count
+
+    total = list(accumulate(total))
+    destinations = {name: list(accumulate(changes)) for name, changes in sorted(destinations.items())}
+    modes = {name: list(accumulate(changes)) for name, changes in sorted(modes.items())}
+    return [
+        {
+            "date": (start + timedelta(days=i)).isoformat(),
+            "travellers": total[i],
+            "by_destination": {name: counts[i] for name, counts in destinations.items() if counts[i]},
+            "by_travel_mode": {name: counts[i] for name, counts in modes.items() if counts[i]},
+        }
+        for i in range(days)
+    ]
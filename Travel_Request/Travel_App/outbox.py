@@ -0,0 +1,180 @@
+import logging
+import time
+from datetime import timedelta
+
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.db.models import Count, Min, Q
+from django.utils import timezone
+
+from .models import EmailOutbox
+
+logger = logging.getLogger(__name__)
+
+BACKOFF_BASE_SECONDS = 30
+BACKOFF_MAX_SECONDS = 3600
+# How long a claimed batch stays hidden from other workers; longer than a batch takes to send
+LEASE_SECONDS = 300
+FAILURE_FIELDS = ["status", "attempts", "next_attempt_at", "last_error"]
+
+# Counters for the running worker, read by outbox_metrics(); the scrape
+# endpoint reports outbox_table_metrics() instead, which every process agrees on
+_metrics = {
+    "sent_total": 0,
+    "failed_total": 0,
+    "retried_total": 0,
+    "last_batch_size": 0,
+    "last_send_ms": 0.0,
+    "last_batch_ms": 0.0,
+}
+
+
+def enqueue_mail(subject, message, from_email, recipient_list):
+    """
+    Queue a mail for the background sender.
+
+    Call this inside the transaction that changes the ticket so the mail is
+    only ever sent for a change that was committed.
+    """
+    return EmailOutbox.objects.create(
+        subject=subject,
+        body=message,
+        from_email=from_email,
+        recipients=",".join(recipient_list),
+    )
+
+
+def enqueue_mails(messages, batch_size=500):
+    """
+    Queue many mails with one bulk insert.
+
+    ``messages`` holds ``(subject, message, from_email, recipient_list)``
+    tuples, as for enqueue_mail().
+    """
+    return EmailOutbox.objects.bulk_create([
+        EmailOutbox(subject=subject, body=message, from_email=from_email, recipients=",".join(recipient_list))
+        for subject, message, from_email, recipient_list in messages
+    ], batch_size=batch_size)
+
+
+def backoff_delay(attempts):
+    """Exponential retry delay after ``attempts`` failed sends."""
+    return timedelta(seconds=min(BACKOFF_BASE_SECONDS * 2 ** (attempts - 1), BACKOFF_MAX_SECONDS))
+
+
+def queue_depth():
+    return EmailOutbox.objects.filter(status="Pending").count()
+
+
+def outbox_metrics():
+    return dict(_metrics, queue_depth=queue_depth())
+
+
+def outbox_table_metrics():
+    """Mails queued and failed, and the age in seconds of the oldest queued one, from the table."""
+    totals = EmailOutbox.objects.filter(status__in=["Pending", "Failed"]).aggregate(
+        queued=Count("id", filter=Q(status="Pending")),
+        failed=Count("id", filter=Q(status="Failed")),
+        oldest=Min("created_at", filter=Q(status="Pending")),
+    )
+    oldest = totals.pop("oldest")
+    totals["oldest_pending_seconds"] = (timezone.now() - oldest).total_seconds() if oldest else 0.0
+    return totals
+
+
+def _record_failure(row, error, max_attempts):
+    # Count a failed attempt on ``row``: back off, or give up after max_attempts
+    row.attempts += 1
+    row.last_error = str(error)[:300]
+    if row.attempts >= max_attempts:
+        row.status = "Failed"
+        _metrics["failed_total"] += 1
+        logger.error(f"Outbox mail {row.id} failed permanently: {str(error)}")
+    else:
+        row.next_attempt_at = timezone.now() + backoff_delay(row.attempts)
+        _metrics["retried_total"] += 1
+        logger.warning(f"Outbox mail {row.id} failed, retry {row.attempts}: {str(error)}")
+
+
+def claim_batch(batch_size=100):
+    """
+    Lease up to ``batch_size`` due mails to this worker and commit.
+
+    Pushing next_attempt_at LEASE_SECONDS ahead hides the rows from other
+    workers without holding their locks while the mail goes out; if this
+    worker dies mid-batch they come due again when the lease runs out.
+    """
+    with transaction.atomic():
+        batch = list(
+            EmailOutbox.objects.select_for_update(skip_locked=True)
+            .filter(status="Pending", next_attempt_at__lte=timezone.now())
+            .order_by("next_attempt_at", "id")[:batch_size]
+        )
+        if batch:
+            EmailOutbox.objects.filter(pk__in=[row.pk for row in batch]).update(
+                next_attempt_at=timezone.now() + timedelta(seconds=LEASE_SECONDS))
+    return batch
+
+
+def _save(row, fields):
+    # One short transaction per result
+    EmailOutbox.objects.filter(pk=row.pk).update(**{field: getattr(row, field) for field in fields})
+
+
+def drain_outbox(batch_size=100, max_attempts=5, connection=None):
+    """
+    Send one batch of due mails over a single mail connection.
+
+    The batch is claimed first (claim_batch), so several workers can drain
+    the same table and no transaction stays open while the mail server
+    answers; each mail's result is saved as soon as it is known. If the
+    connection can't be opened, every mail of the batch counts a failed
+    attempt. Returns the number of mails sent.
+    """
+    started = time.perf_counter()
+    sent = 0
+    batch = claim_batch(batch_size)
+    if not batch:
+        _metrics["last_batch_size"] = 0
+        return 0
+
+    connection = connection or get_connection()
+    try:
+        connection.open()
+    except Exception as e:
+        # The mail server is unreachable: a failed attempt for the whole batch
+        logger.error(f"Outbox: could not open the mail connection: {str(e)}")
+        for row in batch:
+            _record_failure(row, e, max_attempts)
+        EmailOutbox.objects.bulk_update(batch, FAILURE_FIELDS)
+        _metrics["last_batch_size"] = len(batch)
+        return 0
+    send_time = 0.0
+    try:
+        for row in batch:
+            message = EmailMessage(row.subject, row.body, row.from_email, row.recipients.split(","),
+                                   connection=connection)
+            send_started = time.perf_counter()
+            try:
+                connection.send_messages([message])
+                error = None
+            except Exception as e:
+                error = e
+            send_time += time.perf_counter() - send_started
+            if error is None:
+                row.status = "Sent"
+                row.sent_at = timezone.now()
+                _save(row, ["status", "sent_at"])
+                sent += 1
+            else:
+                _record_failure(row, error, max_attempts)
+                _save(row, FAILURE_FIELDS)
+    finally:
+        connection.close()
+
+    _metrics["sent_total"] += sent
+    _metrics["last_batch_size"] = len(batch)
+    _metrics["last_send_ms"] = round(send_time * 1000 / len(batch), 3)
+    _metrics["last_batch_ms"] = round((time.perf_counter() - started) * 1000, 3)
+    logger.info(f"Outbox batch: {sent}/{len(batch)} sent in {_metrics['last_batch_ms']} ms")
+    return sent
@@ -0,0 +1,200 @@
+import base64
+import heapq
+import json
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+def _query_params(request):
+    # DRF Request or, from the async views, a plain HttpRequest
+    return getattr(request, 'query_params', request.GET)
+
+
+def seek_filter(ordering, key):
+    """Rows strictly after ``key`` in ``ordering``, e.g. (a, b) > (x, y)."""
+    # (a, b) after (x, y)  ==  a > x OR (a = x AND b > y), per direction
+    condition = Q()
+    equal = Q()
+    for field, value in zip(ordering, key):
+        name = field.lstrip('-')
+        lookup = 'lt' if field.startswith('-') else 'gt'
+        condition |= equal & Q(**{f'{name}__{lookup}': value})
+        equal &= Q(**{name: value})
+    # The redundant a >= x bound lets the planner seek into the index
+    # instead of walking it from the start for the OR above.
+    first = ordering[0]
+    bound = 'lte' if first.startswith('-') else 'gte'
+    return Q(**{f'{first.lstrip("-")}__{bound}': key[0]}) & condition
+
+
+def row_key(row, ordering):
+    """Cursor key of a model instance, values() dict or named values_list row."""
+    key = []
+    for field in ordering:
+        name = field.lstrip('-')
+        value = row[name] if isinstance(row, dict) else getattr(row, name)
+        key.append(value if isinstance(value, int) else str(value))
+    return key
+
+
+def sort_value(row, field):
+    """Value of ordering ``field`` (``a__b`` allowed) on an instance, values() dict or named row."""
+    if isinstance(row, dict):
+        return row[field]
+    if hasattr(row, field):
+        return getattr(row, field)
+    for name in field.split('__'):
+        row = getattr(row, name)
+    return row
+
+
+def merge_ordered(row_lists, ordering):
+    """
+    Merge row lists that are each sorted by ``ordering`` into one sorted list.
+
+    Every field of ``ordering`` must sort the same way, as the keyset
+    orderings here do.
+    """
+    if len(row_lists) == 1:
+        return list(row_lists[0])
+    names = [field.lstrip('-') for field in ordering]
+    return list(heapq.merge(*row_lists, key=lambda row: tuple(sort_value(row, name) for name in names),
+                            reverse=ordering[0].startswith('-')))
+
+
+def iterate_keyset(queryset, ordering, chunk_size=2000):
+    """
+    Yield every row of ``queryset`` in ``ordering``, one keyset chunk per query.
+
+    Memory stays at one chunk whatever the total, and unlike iterator() this
+    holds on MySQL too, whose client library buffers whole result sets.
+    """
+    queryset = queryset.order_by(*ordering)
+    key = None
+    while True:
+        chunk = queryset if key is None else queryset.filter(seek_filter(ordering, key))
+        rows = list(chunk[:chunk_size])
+        yield from rows
+        if len(rows) < chunk_size:
+            return
+        key = row_key(rows[-1], ordering)
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination keyed on a pair of indexed columns.
+
+    Each page is fetched with a ``WHERE (a, b) < (last_a, last_b)`` style
+    filter instead of an OFFSET, so page N costs the same as page 1. The
+    second ordering column must be unique (the primary key) to break ties.
+    """
+    ordering = ('-date_of_sub', '-id')
+    page_size = 50
+    max_page_size = 500
+    page_size_query_param = 'page_size'
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def __init__(self, ordering=None):
+        if ordering is not None:
+            self.ordering = tuple(ordering)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        return self.finish_page(list(self.page_queryset(queryset, request)))
+
+    def paginate_querysets(self, querysets, request):
+        """
+        One page over several querysets with the same columns and disjoint
+        keys, e.g. the live and the archived requests: each gives its own
+        page, and the pages are merged and cut back to one.
+        """
+        pages = [list(self.page_queryset(queryset, request)) for queryset in querysets]
+        return self.finish_page(merge_ordered(pages, self.page_ordering)[:self.page_size + 1])
+
+    def page_queryset(self, queryset, request):
+        """Return the lazy, sliced queryset for the requested page."""
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.cursor = self.decode_cursor(request, queryset.model)
+
+        reverse = self.cursor is not None and self.cursor['reverse']
+        # The order rows are fetched in; finish_page() flips reversed pages back
+        self.page_ordering = self._reversed_ordering() if reverse else self.ordering
+        if self.cursor is not None:
+            queryset = queryset.filter(seek_filter(self.page_ordering, self.cursor['key']))
+        return queryset.order_by(*self.page_ordering)[:self.page_size + 1]
+
+    def finish_page(self, rows):
+        """Trim the look-ahead row and work out which neighbours exist."""
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if self.cursor is not None and self.cursor['reverse']:
+            rows.reverse()
+            self.has_previous = has_more
+            self.has_next = True
+        else:
+            self.has_previous = self.cursor is not None
+            self.has_next = has_more
+        self.page = rows
+        return rows
+
+    def get_paginated_data(self, data):
+        return {
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        }
+
+    def get_paginated_response(self, data):
+        return Response(self.get_paginated_data(data))
+
+    def get_page_size(self, request):
+        try:
+            size = int(_query_params(request)[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if size <= 0:
+            return self.page_size
+        return min(size, self.max_page_size)
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(row_key(self.page[-1], self.ordering), reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(row_key(self.page[0], self.ordering), reverse=True)
+
+    def encode_cursor(self, key, reverse):
+        payload = json.dumps({'k': key, 'r': int(reverse)}, separators=(',', ':'))
+        token = base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+        return replace_query_param(self.base_url, self.cursor_query_param, token)
+
+    def decode_cursor(self, request, model):
+        """The cursor of ``request``, its key converted to ``model``'s ordering fields; 404 if malformed."""
+        token = _query_params(request).get(self.cursor_query_param)
+        if not token:
+            return None
+        try:
+            padded = token + '=' * (-len(token) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+            key = payload['k']
+            reverse = bool(payload['r'])
+            if not isinstance(key, list) or len(key) != len(self.ordering) or None in key:
+                raise ValueError(key)
+            key = [model._meta.get_field(field.lstrip('-')).to_python(value)
+                   for field, value in zip(self.ordering, key)]
+        except (TypeError, ValueError, KeyError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+        return {'key': key, 'reverse': reverse}
+
+    def _reversed_ordering(self):
+        return tuple(f[1:] if f.startswith('-') else f'-{f}' for f in self.ordering)
@@ -1,21 +1,18 @@
 from rest_framework.permissions import BasePermission
+
+from .profiles import has_role
  
 class IsManagerUser(BasePermission):
    
     def has_permission(self, request, view):
-            if(request.user.id)==None:
-                 return None
-            user = hasattr(request.user,'manager')
-            return user,request.user.id
+        return has_role(request, "manager")
  
 class IsEmployeeUser(BasePermission):
      
     def has_permission(self, request, view):
-        user = hasattr(request.user,'employee')
-        return user
+        return has_role(request, "employee")
    
 class IsAdminUser(BasePermission):
      
     def has_permission(self, request, view):
-        user = hasattr(request.user,'admin')
-        return user 
\ No newline at end of file
+        return has_role(request, "admin")
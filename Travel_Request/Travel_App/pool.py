@@ -0,0 +1,222 @@
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class PoolTimeout(Exception):
+    """No connection became free within the pool's checkout timeout."""
+
+
+class _Entry:
+    __slots__ = ("raw", "created_at")
+
+    def __init__(self, raw):
+        self.raw = raw
+        self.created_at = time.monotonic()
+
+
+class ConnectionPool:
+    """
+    A thread-safe pool of DB-API connections.
+
+    ``connect()`` opens a new raw connection and ``check(raw)`` raises if a
+    connection is no longer usable; it runs on every checkout of an idle
+    connection. Connections older than ``max_lifetime`` seconds are closed
+    instead of being handed out again. At most ``max_size`` connections
+    exist; ``acquire`` waits up to ``timeout`` seconds for one to be
+    released before raising PoolTimeout.
+    """
+
+    def __init__(self, connect, check=None, min_size=0, max_size=10, max_lifetime=1800, timeout=5.0,
+                 name="default"):
+        self.connect = connect
+        self.check = check
+        self.min_size = min_size
+        self.max_size = max_size
+        self.max_lifetime = max_lifetime
+        self.timeout = timeout
+        self.name = name
+        self._idle = []
+        self._in_use = {}
+        self._opening = 0
+        self._cond = threading.Condition()
+        self._stats = {"checkouts": 0, "created": 0, "discarded": 0, "failed_checks": 0, "timeouts": 0,
+                       "waits": 0, "wait_ms_total": 0.0, "wait_ms_max": 0.0}
+
+    @property
+    def size(self):
+        return len(self._idle) + len(self._in_use) + self._opening
+
+    def fill(self):
+        """Open connections until ``min_size`` exist."""
+        while True:
+            with self._cond:
+                if self.size >= self.min_size:
+                    return
+                self._opening += 1
+            entry = self._open()
+            with self._cond:
+                self._idle.append(entry)
+                self._cond.notify()
+
+    def _open(self):
+        try:
+            entry = _Entry(self.connect())
+        except Exception:
+            with self._cond:
+                self._opening -= 1
+                self._cond.notify()
+            raise
+        with self._cond:
+            self._opening -= 1
+            self._stats["created"] += 1
+        return entry
+
+    def _close_raw(self, raw):
+        try:
+            raw.close()
+        except Exception as e:
+            logger.warning(f"Pool {self.name}: error closing connection: {str(e)}")
+        with self._cond:
+            self._stats["discarded"] += 1
+
+    def _expired(self, entry):
+        return self.max_lifetime is not None and time.monotonic() - entry.created_at > self.max_lifetime
+
+    def acquire(self):
+        """Check out a healthy connection, opening one if the pool has room."""
+        started = time.monotonic()
+        deadline = started + self.timeout
+        waited = False
+        while True:
+            with self._cond:
+                while not self._idle and self.size >= self.max_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._stats["timeouts"] += 1
+                        raise PoolTimeout(f"Pool {self.name}: no connection free after {self.timeout}s "
+                                          f"({self.max_size} in use)")
+                    waited = True
+                    self._cond.wait(remaining)
+                if self._idle:
+                    entry = self._idle.pop()
+                else:
+                    entry = None
+                    self._opening += 1
+
+            if entry is None:
+                entry = self._open()
+            elif self._expired(entry) or not self._healthy(entry):
+                self._close_raw(entry.raw)
+                continue
+
+            with self._cond:
+                self._in_use[id(entry.raw)] = entry
+                self._stats["checkouts"] += 1
+                if waited:
+                    wait_ms = (time.monotonic() - started) * 1000
+                    self._stats["waits"] += 1
+                    self._stats["wait_ms_total"] += wait_ms
+                    self._stats["wait_ms_max"] = max(self._stats["wait_ms_max"], wait_ms)
+            return entry.raw
+
+    def _healthy(self, entry):
+        if self.check is None:
+            return True
+        try:
+            self.check(entry.raw)
+            return True
+        except Exception as e:
+            logger.warning(f"Pool {self.name}: dropping dead connection: {str(e)}")
+            with self._cond:
+                self._stats["failed_checks"] += 1
+            return False
+
+    def release(self, raw, discard=False):
+        """Return ``raw`` to the pool, or close it if ``discard`` or it has expired."""
+        with self._cond:
+            entry = self._in_use.pop(id(raw), None)
+            if entry is not None and not discard and not self._expired(entry):
+                self._idle.append(entry)
+                self._cond.notify()
+                return
+            self._cond.notify()
+        self._close_raw(raw)
+
+    def close_all(self):
+        """Close the idle connections; checked-out ones are closed when released."""
+        with self._cond:
+            idle, self._idle = self._idle, []
+            self.min_size = 0
+        for entry in idle:
+            self._close_raw(entry.raw)
+
+    def stats(self):
+        with self._cond:
+            stats = dict(self._stats, size=self.size, in_use=len(self._in_use), idle=len(self._idle),
+                         max_size=self.max_size)
+        stats["wait_ms_avg"] = round(stats["wait_ms_total"] / stats["waits"], 3) if stats["waits"] else 0.0
+        stats["wait_ms_total"] = round(stats["wait_ms_total"], 3)
+        stats["wait_ms_max"] = round(stats["wait_ms_max"], 3)
+        return stats
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+_pools_pid = os.getpid()
+
+
+def get_pool(alias, factory, key=None):
+    """
+    The pool for DB alias ``alias`` in this process, created with ``factory()``.
+
+    ``key`` identifies what the pool connects to (the resolved connection
+    parameters). When it changes, e.g. when the test runner points the
+    alias at the test database, the old pool is closed and a new one built,
+    so no connection to the previous database is handed out again.
+
+    Pools are dropped after a fork so children never share a parent's sockets.
+    """
+    global _pools_pid
+    with _pools_lock:
+        if _pools_pid != os.getpid():
+            _pools.clear()
+            _pools_pid = os.getpid()
+        current = _pools.get(alias)
+    if current is not None and current[0] == key:
+        return current[1]
+
+    # Built outside the lock: factory() may open connections, and a slow
+    # database must not hold up the lookups for every other alias
+    built = factory()
+    with _pools_lock:
+        current = _pools.get(alias)
+        if current is not None and current[0] == key:
+            # Another thread got there first
+            pool, stale = current[1], built
+        else:
+            pool, stale = built, current[1] if current is not None else None
+            _pools[alias] = (key, pool)
+    if stale is not None:
+        if stale is not built:
+            logger.info(f"Pool {alias}: connection parameters changed, replacing the pool")
+        # Connections still checked out are closed when released, as the new pool doesn't know them
+        stale.close_all()
+    return pool
+
+
+def drop_pool(alias):
+    with _pools_lock:
+        current = _pools.pop(alias, None)
+    if current is not None:
+        current[1].close_all()
+
+
+def pool_metrics():
+    """Stats of every connection pool in this process, by DB alias."""
+    with _pools_lock:
+        pools = dict(_pools) if _pools_pid == os.getpid() else {}
+    return {alias: pool.stats() for alias, (_, pool) in pools.items()}
@@ -0,0 +1,124 @@
+from collections import namedtuple
+
+from django.contrib.auth.models import User
+from rest_framework import exceptions
+
+from .models import Admin, Employee, Manager
+
+Profile = namedtuple("Profile", ["role", "employee", "manager", "admin"])
+
+ANONYMOUS_PROFILE = Profile(None, None, None, None)
+
+PROFILE_RELATIONS = ("employee__manager", "manager", "admin")
+
+# role claim of a signed token -> the query for the profile row it names
+CLAIM_PROFILES = {
+    "employee": lambda: Employee.objects.select_related("manager"),
+    "manager": lambda: Manager.objects.all(),
+    "admin": lambda: Admin.objects.all(),
+}
+
+
+def _profile_from_user(user):
+    employee = getattr(user, "employee", None)
+    manager = getattr(user, "manager", None)
+    admin = getattr(user, "admin", None)
+    if admin is not None:
+        role = "admin"
+    elif manager is not None:
+        role = "manager"
+    elif employee is not None:
+        role = "employee"
+    else:
+        role = None
+    return Profile(role, employee, manager, admin)
+
+
+def _profiles_cached(user):
+    return all(getattr(User, name).is_cached(user) for name in ("employee", "manager", "admin"))
+
+
+def resolve_profile(user):
+    """Load the Employee/Manager/Admin rows of ``user`` in at most one query."""
+    if user is None or not user.is_authenticated:
+        return ANONYMOUS_PROFILE
+    if not _profiles_cached(user):
+        user = User.objects.select_related(*PROFILE_RELATIONS).filter(pk=user.pk).first()
+        if user is None:
+            return ANONYMOUS_PROFILE
+    return _profile_from_user(user)
+
+
+async def aresolve_profile(user):
+    """resolve_profile() for async views, using the async ORM."""
+    if user is None or not user.is_authenticated:
+        return ANONYMOUS_PROFILE
+    if not _profiles_cached(user):
+        user = await User.objects.select_related(*PROFILE_RELATIONS).filter(pk=user.pk).afirst()
+        if user is None:
+            return ANONYMOUS_PROFILE
+    return _profile_from_user(user)
+
+
+def signed_claims(request):
+    """The payload of the caller's signed token, or None for other authentication."""
+    auth = getattr(request, "auth", None)
+    return auth if isinstance(auth, dict) else None
+
+
+def _claims_query(claims):
+    role = claims.get("role")
+    if role not in CLAIM_PROFILES:
+        return None, None
+    return role, CLAIM_PROFILES[role]().filter(user_auth_id=claims["uid"])
+
+
+def _profile_from_row(role, row):
+    if row is None:
+        # Deleted since the token was issued
+        raise exceptions.AuthenticationFailed("User inactive or deleted.")
+    return Profile(role, *(row if name == role else None for name in ("employee", "manager", "admin")))
+
+
+def resolve_claims(claims):
+    """
+    The profile a signed token was issued for: only the row of its role
+    claim, read from that profile table alone (no User or token lookup).
+    Raises AuthenticationFailed if that row is gone.
+    """
+    role, query = _claims_query(claims)
+    return _profile_from_row(role, query.first() if query is not None else None)
+
+
+async def aresolve_claims(claims):
+    """resolve_claims() for async views, using the async ORM."""
+    role, query = _claims_query(claims)
+    return _profile_from_row(role, await query.afirst() if query is not None else None)
+
+
+def has_role(request, role):
+    """
+    Whether the caller acts as ``role``. A signed token answers from its
+    role claim without a query; otherwise the profile is resolved.
+    """
+    claims = signed_claims(request)
+    if claims is not None:
+        return claims.get("role") == role
+    return getattr(get_profile(request), role) is not None
+
+
+def get_profile(request):
+    """
+    Role and profile row of the authenticated user, resolved once per request.
+
+    Permission classes and views share the result through the underlying
+    HttpRequest, so a request never looks the same profile up twice. With a
+    signed token only the row of the token's role is loaded.
+    """
+    http_request = getattr(request, "_request", request)
+    profile = getattr(http_request, "travel_profile", None)
+    if profile is None:
+        claims = signed_claims(request)
+        profile = resolve_claims(claims) if claims is not None else resolve_profile(request.user)
+        http_request.travel_profile = profile
+    return profile
@@ -0,0 +1,117 @@
+from django.conf import settings
+
+
+class TableProjection:
+    """
+    Read-only rendering of a table serializer straight from ``values_list()``.
+
+    ``layout`` mirrors the serializer's fields in order. Each entry is
+    ``(key, column)``, ``(key, column, "date")`` for DateFields, or
+    ``(key, [(sub_key, column), ...])`` for a nested name serializer. The
+    output is the same JSON shape the serializer produces, without building
+    model instances or running DRF field machinery per row.
+    """
+    key_columns = ("id", "date_of_sub")
+
+    def __init__(self, layout):
+        self.columns = list(self.key_columns)
+        self.plan = [self._compile(entry) for entry in layout]
+
+    def _index(self, column):
+        if column not in self.columns:
+            self.columns.append(column)
+        return self.columns.index(column)
+
+    def _compile(self, entry):
+        key, source = entry[0], entry[1]
+        if isinstance(source, list):
+            return (key, None, [(sub_key, self._index(column)) for sub_key, column in source], False)
+        return (key, self._index(source), None, len(entry) > 2 and entry[2] == "date")
+
+    def values(self, queryset, extra=()):
+        """Named ``values_list`` rows, usable with KeysetPagination."""
+        extra = [column for column in extra if column not in self.columns]
+        return queryset.values_list(*self.columns, *extra, named=True)
+
+    def render_row(self, row):
+        data = {}
+        for key, index, nested, is_date in self.plan:
+            if nested is not None:
+                data[key] = {sub_key: row[i] for sub_key, i in nested}
+            elif is_date:
+                value = row[index]
+                data[key] = value.isoformat() if value is not None else None
+            else:
+                data[key] = row[index]
+        return data
+
+    def render(self, rows):
+        render_row = self.render_row
+        return [render_row(row) for row in rows]
+
+
+EMPLOYEE_NAME = [("id", "employee_id"), ("first_name", "employee__first_name"),
+                 ("last_name", "employee__last_name")]
+MANAGER_NAME = [("id", "manager_id"), ("first_name", "manager__first_name"),
+                ("last_name", "manager__last_name"), ("email", "manager__email")]
+
+# Same fields, same order as serializers.ManagerTableSerializer
+MANAGER_TABLE = TableProjection([
+    ("req_id", "id"),
+    ("employee", EMPLOYEE_NAME),
+    ("from_date", "from_date", "date"),
+    ("to_date", "to_date", "date"),
+    ("purpose", "purpose"),
+    ("manager_status", "manager_status"),
+    ("from_loc", "from_loc"),
+    ("to_loc", "to_loc"),
+    ("travel_mode", "travel_mode"),
+    ("lodging_required", "lodging_required"),
+    ("additional_request", "additional_request"),
+    ("manager_note", "manager_note"),
+    ("admin_note", "admin_note"),
+    ("admin_status", "admin_status"),
+])
+
+# Same fields, same order as serializers.EmployeeTableSerializer
+EMPLOYEE_TABLE = TableProjection([
+    ("id", "id"),
+    ("employee_id", "employee_id"),
+    ("from_date", "from_date", "date"),
+    ("to_date", "to_date", "date"),
+    ("purpose", "purpose"),
+    ("manager_note", "manager_note"),
+    ("admin_note", "admin_note"),
+    ("manager_status", "manager_status"),
+    ("manager", MANAGER_NAME),
+    ("from_loc", "from_loc"),
+    ("to_loc", "to_loc"),
+    ("travel_mode", "travel_mode"),
+    ("lodging_required", "lodging_required"),
+    ("additional_request", "additional_request"),
+    ("admin_status", "admin_status"),
+])
+
+# Same fields, same order as serializers.AdminTableSerializer
+ADMIN_TABLE = TableProjection([
+    ("req_id", "id"),
+    ("employee", EMPLOYEE_NAME),
+    ("manager", MANAGER_NAME),
+    ("from_date", "from_date", "date"),
+    ("to_date", "to_date", "date"),
+    ("purpose", "purpose"),
+    ("manager_status", "manager_status"),
+    ("from_loc", "from_loc"),
+    ("to_loc", "to_loc"),
+    ("travel_mode", "travel_mode"),
+    ("lodging_required", "lodging_required"),
+    ("additional_request", "additional_request"),
+    ("admin_note", "admin_note"),
+    ("admin_status", "admin_status"),
+    ("no_of_resub", "no_of_resub"),
+])
+
+
+def projection_enabled(endpoint):
+    """True if ``endpoint`` is listed in settings.FAST_TABLE_ENDPOINTS."""
+    return endpoint in getattr(settings, "FAST_TABLE_ENDPOINTS", ())
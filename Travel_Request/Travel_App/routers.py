@@ -0,0 +1,110 @@
+from contextvars import ContextVar
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+
+# Set by @replica_reads for the body of a read-only view
+_replica_reads = ContextVar("replica_reads", default=False)
+
+PIN_CACHE_PREFIX = "ryw_pin"
+UNSAFE_METHODS = ("POST", "PUT", "PATCH", "DELETE")
+
+
+def replica_alias():
+    """settings.READ_REPLICA_ALIAS if that database is configured, else None."""
+    alias = getattr(settings, "READ_REPLICA_ALIAS", "replica")
+    return alias if alias in settings.DATABASES else None
+
+
+class ReadReplicaRouter:
+    """
+    Send reads made inside @replica_reads views to the replica.
+
+    Everything else, and any read inside a transaction on the primary,
+    goes to ``default``. Without a replica configured the router is a no-op.
+    """
+
+    def db_for_read(self, model, **hints):
+        if not _replica_reads.get():
+            return None
+        alias = replica_alias()
+        if alias is None or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return None
+        return alias
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Both aliases hold the same data
+        return True
+
+
+def _pin_key(user):
+    return f"{PIN_CACHE_PREFIX}:{user.pk}"
+
+
+def pin_to_primary(user):
+    """Serve ``user``'s reads from the primary for settings.READ_YOUR_WRITES_SECONDS."""
+    cache.set(_pin_key(user), True, getattr(settings, "READ_YOUR_WRITES_SECONDS", 5))
+
+
+def is_pinned(user):
+    return bool(user and user.is_authenticated and cache.get(_pin_key(user)))
+
+
+def replica_reads(view):
+    """
+    Run the view body with its reads on the replica.
+
+    Put it directly above the function, under @api_view, so authentication
+    and permission checks still read the primary. Users inside their
+    read-your-writes window stay on the primary.
+    """
+    @wraps(view)
+    def wrapped(request, *args, **kwargs):
+        if replica_alias() is None or is_pinned(request.user):
+            return view(request, *args, **kwargs)
+        token = _replica_reads.set(True)
+        try:
+            return view(request, *args, **kwargs)
+        finally:
+            _replica_reads.reset(token)
+    return wrapped
+
+
+class ReadYourWritesMiddleware:
+    """Pin a user to the primary after each of their successful writes."""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def _writer(self, request, response):
+        if request.method in UNSAFE_METHODS and response.status_code < 400 and replica_alias() is not None:
+            user = getattr(request, "user", None)
+            if user is not None and user.is_authenticated:
+                return user
+        return None
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        response = self.get_response(request)
+        user = self._writer(request, response)
+        if user is not None:
+            pin_to_primary(user)
+        return response
+
+    async def __acall__(self, request):
+        response = await self.get_response(request)
+        user = self._writer(request, response)
+        if user is not None:
+            await sync_to_async(pin_to_primary)(user)
+        return response
@@ -0,0 +1,113 @@
+import re
+
+from django.db.models import OuterRef, Q, Subquery, Sum
+
+from .models import Employee_Request, SearchToken
+from .pagination import iterate_keyset
+
+# Indexed columns and how much a hit in each counts towards the rank
+SEARCH_WEIGHTS = {
+    "purpose": 3,
+    "employee__first_name": 3,
+    "employee__last_name": 3,
+    "to_loc": 2,
+    "from_loc": 2,
+    "additional_request": 1,
+}
+MIN_TOKEN_LENGTH = 2
+MAX_TOKEN_LENGTH = 40
+INDEX_CHUNK_SIZE = 1000
+
+_WORD = re.compile(r"\w+")
+
+
+def tokenize(text):
+    """Lower-cased words of ``text`` that are long enough to index."""
+    return [w[:MAX_TOKEN_LENGTH] for w in _WORD.findall((text or "").lower()) if len(w) >= MIN_TOKEN_LENGTH]
+
+
+def _weighted_tokens(row):
+    weights = {}
+    for column, weight in SEARCH_WEIGHTS.items():
+        for token in tokenize(row[column]):
+            weights[token] = weights.get(token, 0) + weight
+    return weights
+
+
+def _instance_row(instance):
+    row = {}
+    for column in SEARCH_WEIGHTS:
+        value = instance
+        for part in column.split("__"):
+            value = getattr(value, part)
+        row[column] = value
+    return row
+
+
+def index_request(instance, created=False):
+    """Index one saved request from the instance itself, without re-reading it."""
+    if not created:
+        SearchToken.objects.filter(request_id=instance.id).delete()
+    SearchToken.objects.bulk_create([
+        SearchToken(request_id=instance.id, token=token, weight=weight)
+        for token, weight in _weighted_tokens(_instance_row(instance)).items()
+    ])
+
+
+def index_requests(request_ids):
+    """(Re)build the search tokens of the given Employee_Request ids."""
+    request_ids = list(request_ids)
+    for start in range(0, len(request_ids), INDEX_CHUNK_SIZE):
+        chunk = request_ids[start:start + INDEX_CHUNK_SIZE]
+        SearchToken.objects.filter(request_id__in=chunk).delete()
+        rows = Employee_Request.objects.filter(id__in=chunk).values("id", *SEARCH_WEIGHTS)
+        SearchToken.objects.bulk_create([
+            SearchToken(request_id=row["id"], token=token, weight=weight)
+            for row in rows
+            for token, weight in _weighted_tokens(row).items()
+        ])
+
+
+def rebuild_index(chunk_size=INDEX_CHUNK_SIZE, queryset=None):
+    """Index every request (or those in ``queryset``); returns how many were indexed."""
+    if queryset is None:
+        queryset = Employee_Request.objects.all()
+    total = 0
+    batch = []
+    for row in iterate_keyset(queryset.values("id"), ("id",), chunk_size):
+        batch.append(row["id"])
+        if len(batch) >= chunk_size:
+            index_requests(batch)
+            total += len(batch)
+            batch = []
+    index_requests(batch)
+    return total + len(batch)
+
+
+def _term_filter(term, prefix):
+    if not prefix:
+        return Q(token=term)
+    # A range rather than startswith: SQLite's case-insensitive LIKE cannot use the index
+    upper = term[:-1] + chr(ord(term[-1]) + 1)
+    return Q(token__gte=term, token__lt=upper)
+
+
+def search_requests(queryset, query):
+    """
+    Narrow ``queryset`` to requests matching every word of ``query``.
+
+    Each word is an index lookup on SearchToken; the last word also matches
+    as a prefix so partially typed queries work. The result is annotated with
+    ``search_rank``, the summed weight of the matched tokens.
+    """
+    terms = tokenize(query)
+    if not terms:
+        return queryset.none()
+    any_term = Q()
+    for position, term in enumerate(terms):
+        term_filter = _term_filter(term, prefix=position == len(terms) - 1)
+        queryset = queryset.filter(id__in=SearchToken.objects.filter(term_filter).values("request_id"))
+        any_term |= term_filter
+    rank = (SearchToken.objects.filter(any_term, request=OuterRef("pk"))
+            .values("request").annotate(total=Sum("weight")).values("total"))
+    return queryset.annotate(search_rank=Subquery(rank))
@@ -0,0 +1,46 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .list_cache import LIST_FOR_MODEL, bump_on_commit
+from .models import Employee, Employee_Request, Manager
+from .occupancy import extend_trip_bound
+from .search import SEARCH_WEIGHTS, index_request, index_requests
+
+REQUEST_SEARCH_FIELDS = {column for column in SEARCH_WEIGHTS if "__" not in column}
+
+
+@receiver(post_save, sender=Employee_Request)
+def reindex_request(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    if raw:
+        return
+    if update_fields is not None and not REQUEST_SEARCH_FIELDS.intersection(update_fields):
+        return
+    index_request(instance, created=created)
+
+
+@receiver(post_save, sender=Employee_Request)
+def track_longest_trip(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw:
+        return
+    if update_fields is not None and not {"from_date", "to_date"}.intersection(update_fields):
+        return
+    extend_trip_bound(instance)
+
+
+@receiver(post_save, sender=Employee)
+def reindex_employee_requests(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    if created or raw:
+        return
+    if update_fields is not None and not {"first_name", "last_name"}.intersection(update_fields):
+        return
+    index_requests(Employee_Request.objects.filter(employee=instance).values_list("id", flat=True))
+
+
+@receiver(post_save, sender=Employee)
+@receiver(post_delete, sender=Employee)
+@receiver(post_save, sender=Manager)
+@receiver(post_delete, sender=Manager)
+def invalidate_people_list(sender, raw=False, **kwargs):
+    if raw:
+        return
+    bump_on_commit(LIST_FOR_MODEL[sender])
@@ -1,3 +1,1320 @@
-from django.test import TestCase
+import base64
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import date, timedelta
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from asgiref.sync import async_to_sync, sync_to_async
+from django.conf import settings
+from django.contrib.auth.hashers import check_password
+from django.contrib.auth.signals import user_login_failed
+from django.contrib.auth.models import User
+from django.core import mail
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.signals import request_finished
+from django.db import close_old_connections, connection, connections
+from django.urls import resolve
+from django.db.utils import ConnectionHandler
+from django.test import AsyncClient, Client, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient, APIRequestFactory
+
+from .authentication import issue_signed_token
+from .profiles import get_profile
+from .projections import ADMIN_TABLE, EMPLOYEE_TABLE, MANAGER_TABLE
+from .serializers import AdminTableSerializer, EmployeeTableSerializer, ManagerTableSerializer
+from .models import Admin, ArchivedRequest, EmailOutbox, Employee, Employee_Request, Manager, RequestCounter, SearchToken
+from .outbox import claim_batch, drain_outbox, enqueue_mail
+from .search import rebuild_index
+from .importer import hash_passwords, import_people, read_csv
+from .throttling import LocMemBucketStore, reset_bucket_store
+from .counters import reconcile_counters
+from .routers import is_pinned
+from .pool import ConnectionPool, PoolTimeout, drop_pool, get_pool
+from .metrics import registry, reset_metrics
+from .benchmarks.endpoints import bench_fixtures, compare, count_queries, route_cases, run_benchmarks, URL_PREFIX
+from .benchmarks.seed import seed_all, seed_requests
+from .budgets import QueryBudgetExceeded, view_budget
+from .archive import archive_closed_requests
+from .changes import prune_changes
+from .events import InMemoryBroker, broker, reset_broker
+from . import async_views, views
+
+
+def make_manager(username="manager1"):
+    user = User.objects.create_user(username=username, password="pass1234")
+    return Manager.objects.create(username=username, first_name="Mona", last_name="Lisa",
+                                  email=f"{username}@example.com", user_auth=user)
+
+
+def make_employee(manager, username="employee1"):
+    user = User.objects.create_user(username=username, password="pass1234")
+    return Employee.objects.create(username=username, first_name="Eli", last_name="Stone",
+                                   manager=manager, Gender="F", Place="Kochi",
+                                   email=f"{username}@example.com", user_auth=user)
+
+
+def make_admin(username="admin1"):
+    user = User.objects.create_user(username=username, password="pass1234")
+    return Admin.objects.create(username=username, first_name="Ada", last_name="King",
+                                email=f"{username}@example.com", user_auth=user)
+
+
+def make_requests(employee, count, start=date(2025, 1, 1)):
+    return Employee_Request.objects.bulk_create([
+        Employee_Request(
+            employee=employee, manager=employee.manager,
+            date_of_sub=start + timedelta(days=i // 3),
+            purpose=f"Trip {i}", from_loc="Kochi", to_loc="Delhi", travel_mode="Flight",
+            from_date=start + timedelta(days=i), to_date=start + timedelta(days=i + 2),
+            additional_request="", manager_note="", admin_note="", no_of_resub=1,
+        )
+        for i in range(count)
+    ])
+
+
+@contextmanager
+def logins_on_the_test_connection():
+    """
+    Run the async logins' HASH_EXECUTOR on this thread's connection, which
+    holds the test's uncommitted data, and leave that connection open.
+    """
+    shared = connections["default"]
+    shared.inc_thread_sharing()
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="password-hash",
+                                  initializer=lambda: connections.__setitem__("default", shared))
+    try:
+        with mock.patch.object(async_views, "HASH_EXECUTOR", executor), \
+                mock.patch.object(async_views, "close_old_connections"):
+            yield
+    finally:
+        executor.shutdown()
+        shared.dec_thread_sharing()
+
+
+def client_for(profile):
+    client = APIClient()
+    token, _ = Token.objects.get_or_create(user=profile.user_auth)
+    client.credentials(HTTP_AUTHORIZATION=f"Token {token.key}")
+    return client
+
+
+class KeysetPaginationTests(TestCase):
+    def setUp(self):
+        self.manager = make_manager()
+        self.employee = make_employee(self.manager)
+        self.admin = make_admin()
+        make_requests(self.employee, 23)
+        self.client = client_for(self.admin)
+
+    def test_walks_every_row_once_in_both_directions(self):
+        seen = []
+        url = "/travel/admin_dashboard/?page_size=5"
+        pages = []
+        while url:
+            body = self.client.get(url).json()
+            pages.append(body)
+            seen.extend(row["req_id"] for row in body["results"])
+            url = body["next"]
+        self.assertEqual(len(seen), 23)
+        self.assertEqual(len(set(seen)), 23)
+        expected = list(Employee_Request.objects.order_by("-date_of_sub", "-id").values_list("id", flat=True))
+        self.assertEqual(seen, expected)
+
+        back = self.client.get(pages[-1]["previous"]).json()
+        self.assertEqual(back["results"], pages[-2]["results"])
+        self.assertIsNotNone(back["next"])
+
+    def test_page_size_is_capped(self):
+        response = self.client.get("/travel/admin_dashboard/?page_size=100000")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()["results"]), 23)
+        self.assertIsNone(response.json()["next"])
+        self.assertIsNone(response.json()["previous"])
+
+    def test_invalid_cursor_is_rejected(self):
+        clients = {"admin": self.client, "manager": client_for(self.manager), "employee": client_for(self.employee)}
+        for dashboard, client in clients.items():
+            response = client.get(f"/travel/{dashboard}_dashboard/?cursor=not-a-cursor")
+            self.assertEqual(response.status_code, 404, dashboard)
+
+    def test_wrongly_typed_cursor_is_rejected(self):
+        headers = {"Authorization": f"Token {Token.objects.get(user=self.admin.user_auth).key}"}
+        for key in (["not-a-date", "x"], ["2025-01-05", "x"], ["2025-01-05", None], [None, 1]):
+            payload = json.dumps({"k": key, "r": 0}).encode()
+            token = base64.urlsafe_b64encode(payload).decode().rstrip("=")
+            self.assertEqual(self.client.get(f"/travel/admin_dashboard/?cursor={token}").status_code, 404, key)
+            response = client_for(self.manager).get(f"/travel/manager_dashboard/?cursor={token}")
+            self.assertEqual(response.status_code, 404, key)
+            response = client_for(self.employee).get(f"/travel/employee_dashboard/?cursor={token}")
+            self.assertEqual(response.status_code, 404, key)
+            response = async_to_sync(AsyncClient().get)(f"/travel/async/admin_dashboard/?cursor={token}",
+                                                        headers=headers)
+            self.assertEqual(response.status_code, 404, key)
+
+    def test_employee_dashboard_is_paginated(self):
+        body = client_for(self.employee).get("/travel/employee_dashboard/?page_size=10").json()
+        self.assertEqual(len(body["results"]), 10)
+        self.assertIsNotNone(body["next"])
+
+
+class FlakyBackend(EmailBackend):
+    """Locmem backend that refuses mail for one recipient."""
+    def send_messages(self, messages):
+        if any("bounce@example.com" in m.to for m in messages):
+            raise ConnectionError("relay refused")
+        return super().send_messages(messages)
+
+
+class UnreachableBackend(EmailBackend):
+    """Locmem backend whose server can't be reached."""
+    def open(self):
+        raise ConnectionRefusedError("connection refused")
+
+
+class EmailOutboxClaimTests(TransactionTestCase):
+    def test_mail_goes_out_after_the_claim_commits(self):
+        queued = enqueue_mail("Subject", "Body", "admin@example.com", ["ok@example.com"])
+        seen = []
+
+        class WatchingBackend(EmailBackend):
+            def send_messages(self, messages):
+                seen.append((connection.in_atomic_block, EmailOutbox.objects.get(pk=queued.pk).next_attempt_at))
+                return super().send_messages(messages)
+
+        self.assertEqual(drain_outbox(connection=WatchingBackend()), 1)
+        (in_transaction, leased_until), = seen
+        self.assertFalse(in_transaction)
+        self.assertGreater(leased_until, timezone.now())
+        self.assertEqual(claim_batch(), [])
+        self.assertEqual(EmailOutbox.objects.get(pk=queued.pk).status, "Sent")
+
+
+class EmailOutboxTests(TestCase):
+    def setUp(self):
+        self.manager = make_manager()
+        self.employee = make_employee(self.manager)
+        self.ticket = make_requests(self.employee, 1)[0]
+
+    def test_status_update_queues_mail_instead_of_sending(self):
+        response = client_for(self.manager).put(
+            "/travel/manager_status_update/",
+            {"ticket_id": self.ticket.id, "manager_id": self.manager.id, "manager_status": "Approved"},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(mail.outbox), 0)
+        queued = EmailOutbox.objects.get()
+        self.assertEqual(queued.recipients, self.employee.email)
+
+        self.assertEqual(drain_outbox(), 1)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(EmailOutbox.objects.get().status, "Sent")
+
+    def test_failed_mail_backs_off_then_gives_up(self):
+        enqueue_mail("Subject", "Body", "admin@example.com", ["bounce@example.com"])
+        enqueue_mail("Subject", "Body", "admin@example.com", ["ok@example.com"])
+
+        self.assertEqual(drain_outbox(max_attempts=2, connection=FlakyBackend()), 1)
+        bounced = EmailOutbox.objects.get(recipients="bounce@example.com")
+        self.assertEqual((bounced.status, bounced.attempts), ("Pending", 1))
+        self.assertGreater(bounced.next_attempt_at, timezone.now())
+
+        EmailOutbox.objects.filter(pk=bounced.pk).update(next_attempt_at=timezone.now())
+        drain_outbox(max_attempts=2, connection=FlakyBackend())
+        bounced.refresh_from_db()
+        self.assertEqual((bounced.status, bounced.attempts), ("Failed", 2))
+
+    def test_unreachable_server_backs_off_the_batch(self):
+        enqueue_mail("Subject", "Body", "admin@example.com", ["ok@example.com"])
+        self.assertEqual(drain_outbox(connection=UnreachableBackend()), 0)
+        queued = EmailOutbox.objects.get()
+        self.assertEqual((queued.status, queued.attempts), ("Pending", 1))
+        self.assertIn("refused", queued.last_error)
+        self.assertGreater(queued.next_attempt_at, timezone.now())
+        self.assertEqual(drain_outbox(), 0)  # not due yet
+
+
+@override_settings(SIGNED_AUTH_TOKENS=True)
+class SignedTokenTests(TestCase):
+    def setUp(self):
+        self.employee = make_employee(make_manager())
+
+    def login(self):
+        response = APIClient().post("/travel/employee_login/",
+                                    {"username": "employee1", "password": "pass1234"}, format="json")
+        return response.json()["token"]
+
+    def test_signed_token_skips_token_table(self):
+        token = self.login()
+        self.assertFalse(Token.objects.exists())
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Token {token}")
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get("/travel/employee_dashboard/")
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse([q for q in queries if "authtoken_token" in q["sql"] or "auth_user" in q["sql"]])
+
+    def test_role_check_uses_the_token_claims(self):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Token {self.login()}")
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get("/travel/admin_dashboard/")
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(len(queries), 0)
+        # A profile deleted since the token was issued
+        self.employee.delete()
+        self.assertEqual(client.get("/travel/employee_dashboard/").status_code, 401)
+        self.assertEqual(client.post("/travel/new_travel_request/", {"purpose": "x"}, format="json").status_code, 401)
+        self.assertEqual(client.put("/travel/edit_travel_request/1/", {}, format="json").status_code, 401)
+        self.assertEqual(client.delete("/travel/delete_travel_request/1/").status_code, 401)
+
+    def test_logout_revokes_signed_token(self):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Token {self.login()}")
+        self.assertEqual(client.post("/travel/logout/").status_code, 200)
+        self.assertEqual(client.get("/travel/employee_dashboard/").status_code, 401)
+
+    def test_expired_and_tampered_tokens_are_rejected(self):
+        client = APIClient()
+        expired = issue_signed_token(self.employee.user_auth, "employee", ttl=-1)
+        client.credentials(HTTP_AUTHORIZATION=f"Token {expired}")
+        self.assertEqual(client.get("/travel/employee_dashboard/").status_code, 401)
+        client.credentials(HTTP_AUTHORIZATION=f"Token {self.login()[:-2]}xx")
+        self.assertEqual(client.get("/travel/employee_dashboard/").status_code, 401)
+
+
+class ProfileResolutionTests(TestCase):
+    def setUp(self):
+        self.manager = make_manager()
+        self.employee = make_employee(self.manager)
+        make_requests(self.employee, 3)
+
+    def test_token_auth_loads_profile_with_the_token(self):
+        client = client_for(self.employee)
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get("/travel/employee_dashboard/")
+        self.assertEqual(len(response.json()["results"]), 3)
+        # token + user + profiles come back in the first query; nothing after
+        # it goes back to the Employee table for the caller's profile
+        self.assertIn("authtoken_token", queries[0]["sql"])
+        self.assertFalse([q for q in queries[1:] if 'FROM "Travel_App_employee"' in q["sql"]])
+
+    def test_new_travel_request_reuses_profile(self):
+        client = client_for(self.employee)
+        payload = {"purpose": "Audit", "from_loc": "Kochi", "to_loc": "Pune", "travel_mode": "Train",
+                   "from_date": "2025-03-01", "to_date": "2025-03-04"}
+        with CaptureQueriesContext(connection) as queries:
+            response = client.post("/travel/new_travel_request/", payload, format="json")
+        self.assertEqual(response.status_code, 201)
+        # the employee and manager come from the authentication query
+        self.assertIn("authtoken_token", queries[0]["sql"])
+        self.assertFalse([q for q in queries[1:] if q["sql"].startswith("SELECT") and (
+            'FROM "Travel_App_employee"' in q["sql"] or 'FROM "Travel_App_manager"' in q["sql"])])
+
+    def test_roles_are_exclusive(self):
+        response = client_for(self.manager).get("/travel/employee_dashboard/")
+        self.assertEqual(response.status_code, 403)
+
+    def test_profile_is_resolved_once_per_request(self):
+        request = APIRequestFactory().get("/")
+        request.user = User.objects.get(pk=self.employee.user_auth_id)
+        with self.assertNumQueries(1):
+            profile = get_profile(request)
+            get_profile(request)
+        self.assertEqual(profile.role, "employee")
+        self.assertEqual(profile.employee, self.employee)
+
+
+class ManagerDashboardTests(TestCase):
+    def setUp(self):
+        self.manager = make_manager()
+        self.client = client_for(self.manager)
+
+    def test_query_count_does_not_grow_with_rows(self):
+        other = make_employee(make_manager("manager2"), "employee2")
+        make_requests(other, 5)
+        for total, username in ((1, "employee1"), (40, "employee3")):
+            make_requests(make_employee(self.manager, username), total)
+            # auth + profile, then one page query
+            with self.assertNumQueries(2):
+                response = self.client.get("/travel/manager_dashboard/")
+            self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()["results"]), 41)
+        self.assertTrue(all(row["employee"]["id"] != other.id for row in response.json()["results"]))
+
+    def test_manager_without_requests_gets_empty_page(self):
+        with self.assertNumQueries(2):
+            response = self.client.get("/travel/manager_dashboard/")
+        self.assertEqual(response.json(), {"next": None, "previous": None, "results": []})
+
+    def test_non_manager_gets_404(self):
+        employee = make_employee(self.manager)
+        self.assertEqual(client_for(employee).get("/travel/manager_dashboard/").status_code, 404)
+
+
+class TableProjectionTests(TestCase):
+    def setUp(self):
+        self.manager = make_manager()
+        make_requests(make_employee(self.manager), 4)
+        Employee_Request.objects.filter(id=Employee_Request.objects.first().id).update(
+            manager_status="Approved", admin_status="Closed", admin_note="Booked")
+
+    def test_projections_match_serializers(self):
+        queryset = Employee_Request.objects.select_related("employee", "manager").order_by("id")
+        for serializer_class, projection in ((AdminTableSerializer, ADMIN_TABLE),
+                                             (ManagerTableSerializer, MANAGER_TABLE),
+                                             (EmployeeTableSerializer, EMPLOYEE_TABLE)):
+            expected = serializer_class(queryset, many=True).data
+            actual = projection.render(projection.values(queryset))
+            self.assertEqual(json.loads(json.dumps(expected)), actual, serializer_class.__name__)
+            self.assertEqual(list(expected[0].keys()), list(actual[0].keys()))
+
+    def test_dashboard_output_is_identical_either_way(self):
+        client = client_for(self.manager)
+        with override_settings(FAST_TABLE_ENDPOINTS=["manager_dashboard"]):
+            fast = client.get("/travel/manager_dashboard/?page_size=3").json()
+        with override_settings(FAST_TABLE_ENDPOINTS=[]):
+            slow = client.get("/travel/manager_dashboard/?page_size=3").json()
+        self.assertEqual(fast, slow)
+
+
+class ExportTests(TestCase):
+    def setUp(self):
+        manager = make_manager()
+        make_requests(make_employee(manager), 7)
+        make_requests(make_employee(manager, "employee2"), 5)
+        Employee_Request.objects.filter(purpose="Trip 0").update(manager_status="Approved")
+        self.client = client_for(make_admin())
+
+    def read(self, response):
+        self.assertTrue(response.streaming)
+        return b"".join(response.streaming_content).decode()
+
+    @mock.patch("Travel_App.views.EXPORT_CHUNK_SIZE", 3)
+    def test_csv_export_streams_every_row_in_keyset_chunks(self):
+        with self.assertNumQueries(1):  # authentication only; rows load while streaming
+            response = self.client.get("/travel/export_requests/?sort_field=first_name")
+        with self.assertNumQueries(5):  # 12 rows in chunks of 3, plus the empty tail
+            lines = self.read(response).splitlines()
+        self.assertEqual(response["Content-Type"], "text/csv")
+        self.assertEqual(lines[0].split(",")[:4], ["req_id", "employee_id", "employee_first_name", "employee_last_name"])
+        ids = [int(line.split(",")[0]) for line in lines[1:]]
+        self.assertEqual(sorted(ids), sorted(Employee_Request.objects.values_list("id", flat=True)))
+
+    def test_ndjson_export_applies_filters(self):
+        response = self.client.get("/travel/export_requests/?output=ndjson&manager_status=Approved")
+        rows = [json.loads(line) for line in self.read(response).splitlines()]
+        self.assertEqual(len(rows), 2)
+        self.assertEqual({row["manager_status"] for row in rows}, {"Approved"})
+        self.assertEqual(set(rows[0]["employee"]), {"id", "first_name", "last_name"})
+
+    def test_unknown_output_is_rejected(self):
+        self.assertEqual(self.client.get("/travel/export_requests/?output=xlsx").status_code, 400)
+
+
+class SearchTests(TestCase):
+    def setUp(self):
+        self.manager = make_manager()
+        self.employee = make_employee(self.manager)
+        make_requests(self.employee, 3)
+        rebuild_index()
+        self.client = client_for(make_admin())
+
+    def search(self, q):
+        response = self.client.get("/travel/filter_sort_search/", {"q": q})
+        return [row["id"] for row in response.json()]
+
+    def test_new_and_edited_requests_are_indexed(self):
+        ticket = Employee_Request.objects.create(
+            employee=self.employee, manager=self.manager, purpose="Vendor audit", from_loc="Kochi",
+            to_loc="Mysuru", travel_mode="Car", from_date="2025-02-01", to_date="2025-02-02",
+            additional_request="Need a driver", manager_note="", admin_note="", no_of_resub=1)
+        self.assertEqual(self.search("mysuru driver"), [ticket.id])
+        self.assertEqual(self.search("myso"), [])
+        self.assertEqual(self.search("mys"), [ticket.id])  # last word matches as a prefix
+
+        ticket.to_loc = "Goa"
+        ticket.save()
+        self.assertEqual(self.search("mysuru"), [])
+        self.assertEqual(self.search("goa"), [ticket.id])
+
+    def test_results_are_ranked_and_renames_reindex(self):
+        low = Employee_Request.objects.filter(purpose="Trip 1").get()
+        low.additional_request = "Meet Quinn"
+        low.save()
+        self.employee.first_name = "Quinn"
+        self.employee.save()
+        results = self.search("quinn")
+        self.assertEqual(len(results), 3)
+        self.assertEqual(results[0], low.id)  # name hit (3) + note hit (1)
+
+
+class FacetTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        employee = make_employee(make_manager())
+        tickets = make_requests(employee, 5)
+        Employee_Request.objects.filter(id__in=[t.id for t in tickets[:2]]).update(
+            manager_status="Approved", travel_mode="Train")
+        Employee_Request.objects.filter(id=tickets[0].id).update(lodging_required="Yes")
+        self.client = client_for(make_admin())
+
+    def test_counts_come_from_one_query_and_are_cached(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get("/travel/request_facets/")
+        facets = response.json()
+        self.assertEqual(len([q for q in queries if "GROUP BY" in q["sql"]]), 1)
+        self.assertEqual(facets["total"], 5)
+        self.assertEqual(facets["manager_status"], {"Approved": 2, "Pending": 3})
+        self.assertEqual(facets["travel_mode"], {"Train": 2, "Flight": 3})
+        self.assertEqual(facets["lodging_required"], {"Yes": 1, "No": 4})
+
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get("/travel/request_facets/")
+        self.assertEqual(len([q for q in queries if "GROUP BY" in q["sql"]]), 0)
+
+    def test_counts_follow_the_filters(self):
+        facets = self.client.get("/travel/request_facets/", {"manager_status": "Approved"}).json()
+        self.assertEqual(facets["total"], 2)
+        self.assertEqual(facets["travel_mode"], {"Train": 2})
+
+        rebuild_index()
+        facets = self.client.get("/travel/request_facets/", {"q": "trip", "travel_mode": "Flight"}).json()
+        self.assertEqual(facets["manager_status"], {"Pending": 3})
+
+
+
+class BulkDecisionTests(TestCase):
+    def setUp(self):
+        self.manager = make_manager()
+        self.mine = make_requests(make_employee(self.manager), 4)
+        other = make_manager("manager2")
+        self.theirs = make_requests(make_employee(other, "employee2"), 1)
+        self.client = client_for(self.manager)
+
+    def decide(self, ticket_ids, manager_status="Approved"):
+        return self.client.put("/travel/manager_bulk_status_update/", {
+            "ticket_ids": ticket_ids, "manager_status": manager_status, "feedback": "Month end",
+        }, format="json")
+
+    def test_owned_tickets_are_updated_in_one_pass(self):
+        ids = [t.id for t in self.mine]
+        with CaptureQueriesContext(connection) as queries:
+            response = self.decide(ids + [self.theirs[0].id, 999999])
+        self.assertEqual(response.status_code, 200)
+        data = response.json()["data"]
+        self.assertEqual(data["updated"], 4)
+        self.assertEqual([r["status"] for r in data["results"]],
+                         ["updated"] * 4 + ["forbidden", "not_found"])
+        self.assertEqual(len([q for q in queries if q["sql"].startswith('UPDATE "Travel_App_employee_request"')]), 1)
+        self.assertEqual(Employee_Request.objects.filter(manager_status="Approved").count(), 4)
+        self.assertEqual(Employee_Request.objects.get(id=self.theirs[0].id).manager_status, "Pending")
+        self.assertEqual(EmailOutbox.objects.count(), 4)
+
+    def test_invalid_input_changes_nothing(self):
+        self.assertEqual(self.decide([self.mine[0].id], "Maybe").status_code, 400)
+        self.assertEqual(self.decide([]).status_code, 400)
+        self.assertEqual(self.decide(["1"]).status_code, 400)
+        self.assertFalse(Employee_Request.objects.filter(manager_status="Approved").exists())
+        self.assertEqual(EmailOutbox.objects.count(), 0)
+
+
+class ImportTests(TestCase):
+    def setUp(self):
+        self.manager = make_manager()
+
+    def rows(self, *lines):
+        header = "username,first_name,last_name,email,password,date_in,manager_username"
+        return read_csv([header, *lines])
+
+    def test_valid_rows_are_created_and_bad_rows_reported(self):
+        result = import_people("employee", self.rows(
+            "ann,Ann,Lee,ann@example.com,pw-ann,2025-01-02,manager1",
+            "bob,Bob,Ray,bob@example.com,pw-bob,,manager1",
+            "cat,Cat,Fox,ann@example.com,pw-cat,,manager1",
+            "dan,Dan,Oak,dan@example.com,,2025-13-01,nobody",
+            "manager1,Mo,Lee,mo@example.com,pw-mo,,manager1",
+        ), workers=0, chunk_size=1)
+        self.assertEqual(result["created"], 2)
+        self.assertEqual([error["line"] for error in result["errors"]], [4, 5, 6])
+        ann = Employee.objects.select_related("user_auth").get(username="ann")
+        self.assertEqual(ann.manager, self.manager)
+        self.assertEqual(ann.date_in, date(2025, 1, 2))
+        self.assertTrue(check_password("pw-ann", ann.user_auth.password))
+
+    def test_passwords_hash_in_a_process_pool(self):
+        hashes = hash_passwords(["one", "two", "three"], workers=2)
+        self.assertTrue(all(check_password(p, h) for p, h in zip(["one", "two", "three"], hashes)))
+
+    def test_endpoint_dry_run_writes_nothing(self):
+        client = client_for(make_admin())
+        upload = SimpleUploadedFile("people.csv", b"username,first_name,last_name,email,password\n"
+                                                  b"mia,Mia,Ng,mia@example.com,pw\n")
+        response = client.post("/travel/import_people/", {"kind": "manager", "file": upload, "dry_run": "true"})
+        self.assertEqual(response.json()["data"], {"created": 0, "valid": 1, "errors": []})
+        self.assertFalse(Manager.objects.filter(username="mia").exists())
+
+    @override_settings(IMPORT_MAX_ROWS=2)
+    def test_endpoint_rejects_files_over_the_limits(self):
+        client = client_for(make_admin())
+        rows = [f"p{i},P,Person,p{i}@example.com,pw" for i in range(3)]
+        csv = "\n".join(["username,first_name,last_name,email,password", *rows]).encode()
+        response = client.post("/travel/import_people/", {"kind": "manager", "file": SimpleUploadedFile("a.csv", csv)})
+        self.assertEqual(response.status_code, 413)
+        with override_settings(IMPORT_MAX_ROWS=3, IMPORT_MAX_BYTES=len(csv) - 1):
+            response = client.post("/travel/import_people/",
+                                   {"kind": "manager", "file": SimpleUploadedFile("a.csv", csv)})
+        self.assertEqual(response.status_code, 413)
+        self.assertFalse(Manager.objects.filter(username__startswith="p").exists())
+
+
+@override_settings(
+    THROTTLE_BUCKET_STORE="Travel_App.throttling.LocMemBucketStore",
+    REST_FRAMEWORK={**settings.REST_FRAMEWORK, "DEFAULT_THROTTLE_RATES": {
+        "login_ip": "100/min", "login_user": "2/min", "dashboard": "2/min"}},
+)
+class ThrottleTests(TestCase):
+    def setUp(self):
+        reset_bucket_store()
+        self.addCleanup(reset_bucket_store)
+        self.employee = make_employee(make_manager())
+
+    def login(self, username):
+        return APIClient().post("/travel/employee_login/", {"username": username, "password": "wrong"}, format="json")
+
+    def test_login_is_refused_per_username_before_hashing(self):
+        self.assertEqual(self.login("employee1").status_code, 401)
+        self.assertEqual(self.login("employee1").status_code, 401)
+        with mock.patch("Travel_App.views.authenticate") as authenticate:
+            response = self.login("employee1")
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response["Retry-After"], "30")
+        authenticate.assert_not_called()
+        self.assertEqual(self.login("someone-else").status_code, 401)
+
+    def test_forwarded_for_does_not_reset_the_address_bucket(self):
+        rates = {**settings.REST_FRAMEWORK["DEFAULT_THROTTLE_RATES"], "login_ip": "2/min", "login_user": "100/min"}
+        codes = []
+        with override_settings(REST_FRAMEWORK={**settings.REST_FRAMEWORK, "DEFAULT_THROTTLE_RATES": rates}):
+            for i in range(3):
+                response = APIClient().post("/travel/employee_login/", {"username": f"user{i}", "password": "x"},
+                                            format="json", HTTP_X_FORWARDED_FOR=f"203.0.113.{i}")
+                codes.append(response.status_code)
+        self.assertEqual(codes, [401, 401, 429])
+
+    def test_dashboard_buckets_are_per_token(self):
+        client = client_for(self.employee)
+        codes = [client.get("/travel/employee_dashboard/").status_code for _ in range(3)]
+        self.assertEqual(codes, [200, 200, 429])
+        other = client_for(make_employee(self.employee.manager, "employee2"))
+        self.assertEqual(other.get("/travel/employee_dashboard/").status_code, 200)
+
+    def test_bucket_refills_over_time(self):
+        store = LocMemBucketStore()
+        self.assertEqual(store.take("k", 2, 60, now=0), (True, 0))
+        self.assertEqual(store.take("k", 2, 60, now=0), (True, 0))
+        self.assertEqual(store.take("k", 2, 60, now=0), (False, 30))
+        self.assertEqual(store.take("k", 2, 60, now=30)[0], True)
+
+
+class StatusCounterTests(TestCase):
+    def setUp(self):
+        self.manager = make_manager()
+        self.employee = make_employee(self.manager)
+        self.employee_client = client_for(self.employee)
+        self.manager_client = client_for(self.manager)
+
+    def create(self):
+        response = self.employee_client.post("/travel/new_travel_request/", {
+            "purpose": "Audit", "from_loc": "Kochi", "to_loc": "Pune", "travel_mode": "Train",
+            "from_date": "2025-03-01", "to_date": "2025-03-04"}, format="json")
+        return response.json()["ticket_id"]
+
+    def summary(self, client):
+        return client.get("/travel/status_summary/").json()["data"]
+
+    def test_counters_follow_every_write_path(self):
+        first, second, third = self.create(), self.create(), self.create()
+        self.manager_client.put("/travel/manager_status_update/", {
+            "ticket_id": first, "manager_id": self.manager.id, "manager_status": "Approved"}, format="json")
+        self.manager_client.put("/travel/manager_bulk_status_update/", {
+            "ticket_ids": [second], "manager_status": "Declined"}, format="json")
+        self.employee_client.delete(f"/travel/delete_travel_request/{third}/")
+        client_for(make_admin()).post("/travel/close_ticket/", {"ticket_id": first}, format="json")
+
+        expected = {"manager_status": {"Approved": 1, "Declined": 1}, "admin_status": {"Closed": 1, "Not_closed": 1}}
+        self.assertEqual(self.summary(self.manager_client), expected)
+        self.assertEqual(self.summary(self.employee_client), expected)
+        self.assertEqual(reconcile_counters(fix=False), {})
+
+    def test_reconcile_reports_and_repairs_drift(self):
+        self.create()
+        make_requests(self.employee, 2)  # bulk_create bypasses the counters
+        drift = reconcile_counters()
+        self.assertEqual(drift[("manager", self.manager.id, "manager_status", "Pending")], (1, 3))
+        self.assertEqual(self.summary(self.manager_client)["manager_status"], {"Pending": 3})
+        self.assertEqual(reconcile_counters(), {})
+
+
+@skipUnless("replica" in settings.DATABASES, "needs a second database aliased 'replica'")
+@override_settings(READ_REPLICA_ALIAS="replica")
+class ReadReplicaTests(TransactionTestCase):
+    # The test replica is a separate, empty database, so a read that reaches
+    # it comes back empty. No wrapping transaction: reads inside one stay on
+    # the primary. The runner collects databases before skips apply, so
+    # only name the replica where it exists.
+    databases = {"default", "replica"} & set(settings.DATABASES)
+
+    def setUp(self):
+        cache.clear()
+        self.manager = make_manager()
+        make_requests(make_employee(self.manager), 2)
+        self.admin = make_admin()
+        self.client = client_for(self.admin)
+
+    def test_listed_reads_go_to_the_replica(self):
+        self.assertEqual(self.client.get("/travel/admin_dashboard/").json()["results"], [])
+        # endpoints without @replica_reads read the primary
+        self.assertEqual(self.client.get("/travel/status_summary/").status_code, 200)
+
+    def test_own_writes_pin_reads_to_the_primary(self):
+        response = self.client.post("/travel/add_manager/", {
+            "username": "manager2", "first_name": "Max", "last_name": "Ray", "email": "max@example.com",
+            "password": "pass1234", "date_of_joining": "2025-01-01"}, format="json")
+        self.assertEqual(response.status_code, 201)
+        self.assertTrue(is_pinned(self.admin.user_auth))
+        self.assertEqual(len(self.client.get("/travel/admin_dashboard/").json()["results"]), 2)
+
+
+class FakeConnection:
+    def __init__(self):
+        self.alive = True
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+class ConnectionPoolTests(TestCase):
+    def check(self, raw):
+        if not raw.alive:
+            raise ConnectionError("gone")
+
+    def test_connections_are_reused_and_dead_ones_replaced(self):
+        pool = ConnectionPool(FakeConnection, check=self.check, min_size=1, max_size=2)
+        pool.fill()
+        first = pool.acquire()
+        pool.release(first)
+        self.assertIs(pool.acquire(), first)
+        first.alive = False
+        pool.release(first)
+        second = pool.acquire()
+        self.assertIsNot(second, first)
+        self.assertTrue(first.closed)
+        stats = pool.stats()
+        self.assertEqual((stats["created"], stats["failed_checks"], stats["in_use"]), (2, 1, 1))
+
+    def test_checkout_waits_for_a_release_then_times_out(self):
+        pool = ConnectionPool(FakeConnection, max_size=1, timeout=0.2)
+        held = pool.acquire()
+        threading.Timer(0.05, pool.release, args=[held]).start()
+        self.assertIs(pool.acquire(), held)
+        self.assertEqual(pool.stats()["waits"], 1)
+        with self.assertRaises(PoolTimeout):
+            pool.acquire()
+
+    def test_expired_connections_are_not_handed_out(self):
+        pool = ConnectionPool(FakeConnection, max_lifetime=0)
+        first = pool.acquire()
+        pool.release(first)
+        self.assertTrue(first.closed)
+        self.assertIsNot(pool.acquire(), first)
+
+    def test_building_a_pool_does_not_block_other_aliases(self):
+        started, release, built = threading.Event(), threading.Event(), threading.Event()
+
+        def slow_factory():
+            started.set()
+            release.wait(5)
+            built.set()
+            return ConnectionPool(FakeConnection)
+        self.addCleanup(drop_pool, "slow_test")
+        self.addCleanup(drop_pool, "fast_test")
+        thread = threading.Thread(target=get_pool, args=("slow_test", slow_factory))
+        thread.start()
+        started.wait(5)
+        fast = get_pool("fast_test", lambda: ConnectionPool(FakeConnection))
+        self.assertFalse(built.is_set())
+        release.set()
+        thread.join()
+        self.assertIs(get_pool("fast_test", None), fast)
+
+    def test_pooled_backend_returns_connections_on_close(self):
+        path = os.path.join(tempfile.mkdtemp(), "pool.sqlite3")
+        handler = ConnectionHandler({
+            "default": {"ENGINE": "django.db.backends.sqlite3", "NAME": path},
+            "pooled_test": {"ENGINE": "Travel_App.backends.sqlite3", "NAME": path, "POOL": {"MAX_SIZE": 2}},
+        })
+        self.addCleanup(drop_pool, "pooled_test")
+        conn = handler["pooled_test"]
+        conn.ensure_connection()
+        raw = conn.connection
+        conn.close()
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT 1")
+        self.assertIs(conn.connection, raw)
+        conn.close()
+        self.assertEqual(conn.pool.stats()["idle"], 1)
+
+    def test_pool_follows_a_changed_database_name(self):
+        folder = tempfile.mkdtemp()
+        prod, test = os.path.join(folder, "prod.sqlite3"), os.path.join(folder, "test.sqlite3")
+        for path in (prod, test):
+            with sqlite3.connect(path) as raw:
+                raw.execute("CREATE TABLE marker (name TEXT)")
+        handler = ConnectionHandler({
+            "default": {"ENGINE": "django.db.backends.sqlite3", "NAME": prod},
+            "pooled_test": {"ENGINE": "Travel_App.backends.sqlite3", "NAME": prod, "POOL": {"MIN_SIZE": 1}},
+        })
+        self.addCleanup(drop_pool, "pooled_test")
+        conn = handler["pooled_test"]
+        conn.ensure_connection()
+        conn.close()
+        # What create_test_db() and throwaway_database() do
+        conn.settings_dict["NAME"] = test
+        with conn.cursor() as cursor:
+            cursor.execute("INSERT INTO marker VALUES ('written')")
+        conn.close()
+        counts = {}
+        for path in (prod, test):
+            with sqlite3.connect(path) as raw:
+                counts[path] = raw.execute("SELECT COUNT(*) FROM marker").fetchone()[0]
+        self.assertEqual(counts, {prod: 0, test: 1})
+
+
+class AsyncViewTests(TestCase):
+    def setUp(self):
+        self.enterContext(logins_on_the_test_connection())
+        self.manager = make_manager()
+        self.employee = make_employee(self.manager)
+        self.tickets = make_requests(self.employee, 3)
+        self.headers = {
+            role: {"Authorization": f"Token {Token.objects.create(user=profile.user_auth).key}"}
+            for role, profile in (("employee", self.employee), ("manager", self.manager))
+        }
+
+    async def test_dashboard_matches_the_sync_view(self):
+        response = await AsyncClient().get("/travel/async/employee_dashboard/", headers=self.headers["employee"])
+        self.assertEqual(response.status_code, 200)
+        sync = await sync_to_async(self.client.get)(
+            "/travel/employee_dashboard/", HTTP_AUTHORIZATION=self.headers["employee"]["Authorization"])
+        self.assertEqual(response.json(), sync.json())
+        forbidden = await AsyncClient().get("/travel/async/admin_dashboard/", headers=self.headers["employee"])
+        self.assertEqual(forbidden.status_code, 403)
+        self.assertEqual((await AsyncClient().get("/travel/async/admin_dashboard/")).status_code, 401)
+
+    async def test_status_update_writes_ticket_counters_and_mail_together(self):
+        ticket = self.tickets[0]
+        response = await AsyncClient().put(
+            "/travel/async/manager_status_update/", {"ticket_id": ticket.id, "manager_status": "Approved"},
+            content_type="application/json", headers=self.headers["manager"])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((await Employee_Request.objects.aget(id=ticket.id)).manager_status, "Approved")
+        self.assertEqual(await EmailOutbox.objects.acount(), 1)
+        counter = await RequestCounter.objects.aget(scope="manager", owner_id=self.manager.id,
+                                                    field="manager_status", value="Approved")
+        self.assertEqual(counter.count, 1)
+
+    async def test_checks_run_on_the_locked_row(self):
+        admin = await sync_to_async(make_admin)()
+        headers = {"Authorization": f"Token {(await Token.objects.acreate(user=admin.user_auth)).key}"}
+        await Employee_Request.objects.filter(id__in=[t.id for t in self.tickets]).aupdate(manager_status="Approved")
+        real_locked_ticket = async_views._locked_ticket
+
+        def racing(change):
+            # Another request's write lands between the checks' read and the lock
+            def locked_ticket(ticket_id, *args):
+                change(Employee_Request.objects.filter(id=ticket_id))
+                return real_locked_ticket(ticket_id, *args)
+            return mock.patch("Travel_App.async_views._locked_ticket", side_effect=locked_ticket)
+
+        async def close(ticket, change):
+            with racing(change):
+                return await AsyncClient().post("/travel/async/close_ticket/", {"ticket_id": ticket.id},
+                                                content_type="application/json", headers=headers)
+
+        declined = await close(self.tickets[0], lambda rows: rows.update(manager_status="Declined"))
+        self.assertEqual(declined.status_code, 400)
+        self.assertEqual((await Employee_Request.objects.aget(id=self.tickets[0].id)).admin_status, "Not_closed")
+        closed = await close(self.tickets[1], lambda rows: rows.update(admin_status="Closed"))
+        self.assertEqual(closed.json()["message"], "Admin note is required for closed tickets")
+        deleted = await close(self.tickets[2], lambda rows: rows.delete())
+        self.assertEqual(deleted.status_code, 404)
+        self.assertEqual(await EmailOutbox.objects.acount(), 0)
+
+        ticket = await sync_to_async(make_requests)(self.employee, 1)
+        with racing(lambda rows: rows.delete()):
+            response = await AsyncClient().put(
+                "/travel/async/manager_status_update/", {"ticket_id": ticket[0].id, "manager_status": "Declined"},
+                content_type="application/json", headers=self.headers["manager"])
+        self.assertEqual(response.status_code, 404)
+
+    async def test_login_hashes_off_the_event_loop(self):
+        threads = []
+        real_authenticate = async_views.authenticate
+
+        def authenticate(*args, **kwargs):
+            threads.append(threading.current_thread().name)
+            return real_authenticate(*args, **kwargs)
+        self.enterContext(mock.patch("Travel_App.async_views.authenticate", side_effect=authenticate))
+        client = AsyncClient()
+        ok = await client.post("/travel/async/employee_login/", {"username": "employee1", "password": "pass1234"},
+                               content_type="application/json")
+        self.assertEqual(ok.status_code, 200)
+        self.assertTrue(ok.json()["token"])
+        for username, password in (("employee1", "nope"), ("nobody", "pass1234"), ("manager1", "pass1234")):
+            response = await client.post("/travel/async/employee_login/",
+                                         {"username": username, "password": password},
+                                         content_type="application/json")
+            self.assertEqual(response.status_code, 401)
+        self.assertTrue(all(name.startswith("password-hash") for name in threads), threads)
+
+    async def test_admin_login_requires_is_admin(self):
+        admin = await sync_to_async(make_admin)()
+        credentials = {"username": "admin1", "password": "pass1234"}
+        ok = await AsyncClient().post("/travel/async/admin_login/", credentials, content_type="application/json")
+        self.assertEqual(ok.status_code, 200)
+        await Admin.objects.filter(pk=admin.pk).aupdate(is_admin=False)
+        for url in ("/travel/admin_login/", "/travel/async/admin_login/"):
+            response = await AsyncClient().post(url, credentials, content_type="application/json")
+            self.assertEqual(response.status_code, 403)
+
+    async def test_failed_login_sends_user_login_failed(self):
+        failed = []
+        receiver = lambda sender, credentials, **kwargs: failed.append(credentials["username"])
+        user_login_failed.connect(receiver)
+        self.addCleanup(user_login_failed.disconnect, receiver)
+        response = await AsyncClient().post("/travel/async/manager_login/",
+                                            {"username": "manager1", "password": "nope"},
+                                            content_type="application/json")
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(failed, ["manager1"])
+
+
+class RequestMetricsTests(TestCase):
+    def setUp(self):
+        reset_metrics()
+        self.employee = make_employee(make_manager())
+        make_requests(self.employee, 3)
+        self.client = client_for(self.employee)
+
+    def test_records_latency_queries_and_size_per_route(self):
+        response = self.client.get("/travel/employee_dashboard/")
+        timing = response["Server-Timing"]
+        self.assertIn("app;dur=", timing)
+        self.assertIn("serialize;dur=", timing)
+        self.client.get("/travel/employee_dashboard/")
+
+        stats = registry.snapshot()[("GET", "travel/employee_dashboard/")]
+        self.assertEqual(stats["count"], 2)
+        self.assertEqual(stats["buckets"][-1], 2)
+        self.assertEqual(stats["statuses"], {200: 2})
+        self.assertEqual(stats["response_bytes"], 2 * len(response.content))
+        queries = int(timing.split('desc="')[1].split()[0])
+        self.assertGreater(queries, 0)
+        self.assertEqual(stats["db_queries"], 2 * queries)
+
+    def test_async_view_queries_are_counted(self):
+        headers = {"Authorization": f"Token {Token.objects.get(user=self.employee.user_auth).key}"}
+        async_to_sync(AsyncClient().get)("/travel/async/employee_dashboard/", headers=headers)
+        stats = registry.snapshot()[("GET", "travel/async/employee_dashboard/")]
+        self.assertGreater(stats["db_queries"], 0)
+        self.assertIn("serialize", stats["phases"])
+
+    def test_prometheus_endpoint(self):
+        self.client.get("/travel/edit_travel_request/999/")
+        text = self.client.get("/metrics").content.decode()
+        self.assertIn('travel_http_request_duration_seconds_bucket{method="GET",'
+                      'route="travel/edit_travel_request/<int:request_id>/",le="+Inf"} 1', text)
+        self.assertIn("# TYPE travel_http_responses counter", text)
+        self.assertIn('travel_http_responses_total{method="GET",'
+                      'route="travel/edit_travel_request/<int:request_id>/",status="405"} 1', text)
+        self.assertNotIn("# TYPE travel_http_responses_total", text)
+        self.assertEqual(self.client.get("/metrics", REMOTE_ADDR="10.1.2.3").status_code, 403)
+
+    def test_outbox_metrics_come_from_the_table(self):
+        enqueue_mail("s", "m", "from@example.com", ["a@example.com"])
+        failed = enqueue_mail("s", "m", "from@example.com", ["b@example.com"])
+        EmailOutbox.objects.filter(pk=failed.pk).update(status="Failed")
+        EmailOutbox.objects.filter(status="Pending").update(created_at=timezone.now() - timedelta(minutes=10))
+        text = self.client.get("/metrics").content.decode()
+        self.assertIn("travel_outbox_queued 1\n", text)
+        self.assertIn("travel_outbox_failed 1\n", text)
+        age = float(text.split("\ntravel_outbox_oldest_pending_seconds ")[1].split()[0])
+        self.assertGreaterEqual(age, 600)
+
+    def test_pool_wait_time_is_exported(self):
+        stats = {"size": 2, "in_use": 1, "idle": 1, "checkouts": 7, "created": 2, "timeouts": 0, "waits": 3,
+                 "wait_ms_total": 1500.0, "wait_ms_max": 900.0}
+        with mock.patch("Travel_App.metrics.pool_metrics", return_value={"default": stats}):
+            text = self.client.get("/metrics").content.decode()
+        self.assertIn("# TYPE travel_db_pool_wait_seconds counter", text)
+        self.assertIn('travel_db_pool_wait_seconds_total{alias="default"} 1.500000', text)
+        self.assertIn('travel_db_pool_wait_max_seconds{alias="default"} 0.900000', text)
+        self.assertIn('travel_db_pool_checkouts_total{alias="default"} 7', text)
+
+
+@override_settings(REST_FRAMEWORK={**settings.REST_FRAMEWORK, "DEFAULT_THROTTLE_RATES": {}})
+class EndpointBenchmarkTests(TestCase):
+    def test_every_route_is_benchmarked(self):
+        seed_all(managers=2, employees=4, requests=30)
+        results = run_benchmarks(iterations=1, only=["employee_dashboard", "manager_bulk_status_update",
+                                                     "async_close_ticket"])
+        self.assertEqual(results["uncovered"], [])
+        self.assertEqual(set(results["routes"]), {"employee_dashboard", "manager_bulk_status_update",
+                                                  "async_close_ticket"})
+        for result in results["routes"].values():
+            self.assertEqual(result["status"], [200])
+            self.assertGreater(result["queries"], 0)
+        # Each case ran in a rolled-back transaction
+        self.assertFalse(EmailOutbox.objects.exists())
+
+    def test_compare_flags_slower_routes_and_extra_queries(self):
+        route = {"p50_ms": 10.0, "p95_ms": 20.0, "p99_ms": 30.0, "queries": 4.0, "peak_kb": 100.0, "status": [200]}
+        baseline = {"routes": {"a": route, "b": route}}
+        current = {"routes": {
+            "a": {**route, "p50_ms": 10.5, "p95_ms": 40.0},
+            "b": {**route, "queries": 5.0},
+            "new": route,
+        }}
+        self.assertEqual(compare(baseline, current), ["a: p95_ms 20.0 -> 40.0", "b: queries 4.0 -> 5.0"])
+
+
+@override_settings(REST_FRAMEWORK={**settings.REST_FRAMEWORK, "DEFAULT_THROTTLE_RATES": {}})
+class QueryBudgetTests(TestCase):
+    # The second size spans several dashboard pages and grows every result set
+    SIZES = (10, 300)
+    # Repeated calls are served from a cache
+    CACHED_ROUTES = {"request_facets", "list_employees", "list_managers", "travel_calendar", "travel_occupancy"}
+    FAST_TABLES = ["admin_dashboard", "manager_dashboard", "employee_dashboard"]
+
+    def setUp(self):
+        self.enterContext(logins_on_the_test_connection())
+
+    def test_every_view_stays_within_its_budget_at_every_size(self):
+        seed_all(managers=2, employees=3, requests=self.SIZES[0])
+        fx = bench_fixtures()
+        client = Client(raise_request_exception=False)
+        counts = {}
+        for previous, size in zip((self.SIZES[0], *self.SIZES), self.SIZES):
+            seed_requests(size - previous)
+            # Dashboards both through the projections and through the serializers
+            for fast_tables in (self.FAST_TABLES, []):
+                with override_settings(FAST_TABLE_ENDPOINTS=fast_tables):
+                    for case in route_cases(fx):
+                        counts.setdefault(case[0], set()).add(count_queries(client, fx, case)[1])
+
+        for name, method, path, role, data in route_cases(fx):
+            with self.subTest(name):
+                budget = view_budget(resolve(URL_PREFIX + path.split("?")[0]).func)
+                self.assertIsNotNone(budget, f"{name} has no @query_budget")
+                self.assertLessEqual(max(counts[name]), budget)
+                if name not in self.CACHED_ROUTES:
+                    self.assertEqual(len(counts[name]), 1, f"{name} queries vary with rows: {counts[name]}")
+
+    @override_settings(DEBUG=True, QUERY_BUDGET_RAISE=True)
+    def test_debug_middleware_raises_over_budget(self):
+        employee = make_employee(make_manager())
+        token = Token.objects.create(user=employee.user_auth).key
+        client = Client()
+        self.assertEqual(client.get("/travel/employee_dashboard/", HTTP_AUTHORIZATION=f"Token {token}").status_code, 200)
+        with mock.patch.object(views.employee_dashboard, "query_budget", 1):
+            with self.assertRaises(QueryBudgetExceeded):
+                client.get("/travel/employee_dashboard/", HTTP_AUTHORIZATION=f"Token {token}")
+
+
+class ListCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.manager = make_manager()
+        self.client = client_for(make_admin())
+
+    def test_hot_reads_skip_the_database_until_a_change_commits(self):
+        first = self.client.get("/travel/list_employees/")
+        self.assertEqual(first.json(), {"employees": []})
+        with self.assertNumQueries(1):  # the token
+            self.assertEqual(self.client.get("/travel/list_employees/").content, first.content)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            employee = make_employee(self.manager)
+        listed = self.client.get("/travel/list_employees/").json()["employees"]
+        self.assertEqual([row["id"] for row in listed], [employee.id])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.delete(f"/travel/delete_employee/{employee.id}/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.client.get("/travel/list_employees/").json(), {"employees": []})
+        # Managers have their own version
+        self.assertEqual(len(self.client.get("/travel/list_managers/").json()["managers"]), 1)
+
+    def test_bulk_import_bumps_and_etag_revalidates(self):
+        etag = self.client.get("/travel/list_managers/")["ETag"]
+        self.assertEqual(self.client.get("/travel/list_managers/", HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        with self.captureOnCommitCallbacks(execute=True):
+            import_people("manager", [(2, {"username": "m2", "first_name": "M", "last_name": "Two",
+                                          "email": "m2@example.com", "password": "pass1234"})], workers=0)
+        response = self.client.get("/travel/list_managers/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()["managers"]), 2)
+
+    @override_settings(LIST_CACHE_TTL=60)
+    def test_only_the_version_is_kept_without_expiry(self):
+        with mock.patch.object(cache, "set", wraps=cache.set) as cache_set:
+            self.client.get("/travel/list_managers/")
+        self.assertEqual(cache_set.call_args.args[2], 60)
+
+
+class ArchiveTests(TestCase):
+    def setUp(self):
+        self.manager = make_manager()
+        self.employee = make_employee(self.manager)
+        requests = make_requests(self.employee, 23)
+        # Closed and submitted before 2025-01-05: requests 1..11
+        Employee_Request.objects.exclude(id=requests[0].id).update(admin_status="Closed")
+        reconcile_counters()
+        rebuild_index()
+        self.old_ids = [r.id for r in requests[1:12]]
+        self.moved = archive_closed_requests(older_than_days=0, chunk_size=4, today=date(2025, 1, 5))
+        self.client = client_for(make_admin())
+
+    def test_moves_old_closed_requests_with_their_ids(self):
+        self.assertEqual(self.moved, 11)
+        self.assertEqual(sorted(ArchivedRequest.objects.values_list("id", flat=True)), self.old_ids)
+        self.assertEqual(Employee_Request.objects.filter(id__in=self.old_ids).count(), 0)
+        self.assertEqual(Employee_Request.objects.count(), 12)
+        self.assertFalse(SearchToken.objects.filter(request_id__in=self.old_ids).exists())
+        self.assertEqual(reconcile_counters(fix=False), {})
+        self.assertEqual(archive_closed_requests(older_than_days=0, today=date(2025, 1, 5)), 0)
+
+    def test_dashboards_read_the_archive_only_when_asked(self):
+        self.assertEqual(len(self.client.get("/travel/admin_dashboard/?page_size=100").json()["results"]), 12)
+
+        seen, pages = [], []
+        url = "/travel/admin_dashboard/?page_size=5&include_archived=1"
+        while url:
+            body = self.client.get(url).json()
+            pages.append(body)
+            seen.extend(row["req_id"] for row in body["results"])
+            url = body["next"]
+        live = Employee_Request.objects.values_list("date_of_sub", "id")
+        archived = ArchivedRequest.objects.values_list("date_of_sub", "id")
+        self.assertEqual(seen, [i for _, i in sorted([*live, *archived], reverse=True)])
+        back = self.client.get(pages[-1]["previous"]).json()
+        self.assertEqual(back["results"], pages[-2]["results"])
+
+        body = client_for(self.employee).get("/travel/async/employee_dashboard/?page_size=100&include_archived=1").json()
+        self.assertEqual(len(body["results"]), 23)
+
+    def test_filter_sort_search_merges_in_sort_order(self):
+        params = "admin_status=Closed&sort_field=to_date&sort_order=desc&include_archived=1"
+        for prefix in ("/travel/", "/travel/async/"):
+            rows = self.client.get(f"{prefix}filter_sort_search/?{params}").json()
+            self.assertEqual(len(rows), 22)
+            self.assertEqual([row["to_date"] for row in rows], sorted((row["to_date"] for row in rows), reverse=True))
+            response = self.client.get(f"{prefix}filter_sort_search/?q=trip&include_archived=1")
+            self.assertEqual(response.status_code, 400)
+
+
+class OccupancyTests(TestCase):
+    WINDOW = "start=2025-03-04&end=2025-03-10"
+
+    def setUp(self):
+        cache.clear()
+        self.employee = make_employee(make_manager())
+        self.client = client_for(make_admin())
+        self.before = self.trip("2025-03-01", "2025-03-05", "Delhi", "Flight")
+        self.across = self.trip("2025-03-04", "2025-03-20", "Pune", "Train")
+        self.after = self.trip("2025-03-08", "2025-03-12", "Delhi", "Flight")
+        self.trip("2025-02-01", "2025-02-10", "Delhi", "Flight")
+        self.trip("2025-03-05", "2025-03-06", "Delhi", "Flight", manager_status="Declined")
+
+    def trip(self, from_date, to_date, to_loc, travel_mode, **fields):
+        return Employee_Request.objects.create(
+            employee=self.employee, manager=self.employee.manager, purpose="Trip", from_loc="Kochi",
+            to_loc=to_loc, travel_mode=travel_mode, from_date=from_date, to_date=to_date,
+            additional_request="", manager_note="", admin_note="", no_of_resub=1, **fields)
+
+    def calendar_ids(self):
+        return [row["req_id"] for row in self.client.get(f"/travel/travel_calendar/?{self.WINDOW}").json()["results"]]
+
+    def test_calendar_lists_every_overlapping_trip(self):
+        self.assertEqual(self.calendar_ids(), [self.before.id, self.across.id, self.after.id])
+        # A trip longer than any before it widens the bound straight away
+        long_trip = self.trip("2025-01-01", "2025-03-04", "Goa", "Car")
+        self.assertEqual(self.calendar_ids(), [long_trip.id, self.before.id, self.across.id, self.after.id])
+
+    def test_occupancy_per_day(self):
+        days = self.client.get(f"/travel/travel_occupancy/?{self.WINDOW}").json()["days"]
+        self.assertEqual([day["travellers"] for day in days], [2, 2, 1, 1, 2, 2, 2])
+        self.assertEqual(days[4], {"date": "2025-03-08", "travellers": 2, "by_destination": {"Delhi": 1, "Pune": 1},
+                                   "by_travel_mode": {"Flight": 1, "Train": 1}})
+
+    def test_invalid_windows_are_rejected(self):
+        for query in ("", "start=2025-03-04", "start=2025-03-10&end=2025-03-04", "start=2024-01-01&end=2025-12-31"):
+            with self.subTest(query):
+                self.assertEqual(self.client.get(f"/travel/travel_occupancy/?{query}").status_code, 400)
+
+
+class DeltaSyncTests(TestCase):
+    def setUp(self):
+        self.manager = make_manager()
+        self.employee = make_employee(self.manager)
+        self.employee_client = client_for(self.employee)
+        self.manager_client = client_for(self.manager)
+
+    def create(self):
+        response = self.employee_client.post("/travel/new_travel_request/", {
+            "purpose": "Audit", "from_loc": "Kochi", "to_loc": "Pune", "travel_mode": "Train",
+            "from_date": "2025-03-01", "to_date": "2025-03-04"}, format="json")
+        return response.json()["ticket_id"]
+
+    def changes(self, client, since, **params):
+        query = "&".join(f"{name}={value}" for name, value in {"since": since, **params}.items())
+        return client.get(f"/travel/changes/?{query}").json()
+
+    @override_settings(CHANGES_SETTLE_SECONDS=0)
+    def test_changes_since_cursor_cover_every_write(self):
+        cursor = self.manager_client.get("/travel/changes/").json()["cursor"]
+        kept, dropped, bulk = self.create(), self.create(), self.create()
+        self.employee_client.delete(f"/travel/delete_travel_request/{dropped}/")
+        updated_at = Employee_Request.objects.get(id=bulk).updated_at
+        self.manager_client.put("/travel/manager_bulk_status_update/", {
+            "ticket_ids": [bulk], "manager_status": "Approved"}, format="json")
+        self.assertGreater(Employee_Request.objects.get(id=bulk).updated_at, updated_at)
+
+        body = self.changes(self.manager_client, cursor)
+        self.assertEqual([row["req_id"] for row in body["upserted"]], [kept, bulk])
+        self.assertEqual(body["upserted"][1]["manager_status"], "Approved")
+        self.assertEqual(body["deleted"], [dropped])
+        self.assertFalse(body["reset"])
+        self.assertEqual(self.changes(self.manager_client, body["cursor"])["upserted"], [])
+        # The employee's own dashboard sees the same tickets
+        self.assertEqual(len(self.changes(self.employee_client, cursor)["upserted"]), 2)
+
+    def test_unsettled_changes_are_sent_again(self):
+        cursor = self.manager_client.get("/travel/changes/").json()["cursor"]
+        ticket = self.create()
+        for _ in range(2):
+            body = self.changes(self.manager_client, cursor)
+            self.assertEqual([row["req_id"] for row in body["upserted"]], [ticket])
+            self.assertEqual(body["cursor"], cursor)
+
+    @override_settings(CHANGES_SETTLE_SECONDS=0)
+    def test_scoped_to_the_callers_dashboard(self):
+        other = make_employee(make_manager("manager2"), "employee2")
+        cursor = self.manager_client.get("/travel/changes/").json()["cursor"]
+        client_for(other).post("/travel/new_travel_request/", {
+            "purpose": "Audit", "from_loc": "Kochi", "to_loc": "Pune", "travel_mode": "Train",
+            "from_date": "2025-03-01", "to_date": "2025-03-04"}, format="json")
+        self.assertEqual(self.changes(self.manager_client, cursor)["upserted"], [])
+        response = self.manager_client.get(f"/travel/changes/?since={cursor}&dashboard=admin")
+        self.assertEqual(response.status_code, 403)
+
+    def test_cursor_before_pruned_changes_resets(self):
+        cursor = self.manager_client.get("/travel/changes/").json()["cursor"]
+        self.create()
+        prune_changes(older_than_days=-1)
+        self.create()
+        body = self.changes(self.manager_client, cursor)
+        self.assertTrue(body["reset"])
+        self.assertEqual(self.changes(self.manager_client, body["cursor"])["reset"], False)
+
+
+class TicketEventTests(TestCase):
+    def setUp(self):
+        reset_broker()
+        self.addCleanup(reset_broker)
+        self.manager = make_manager()
+        self.employee = make_employee(self.manager)
+        self.tickets = make_requests(self.employee, 3)
+        self.headers = {"Authorization": f"Token {Token.objects.create(user=self.employee.user_auth).key}"}
+
+    def events(self, body):
+        return [json.loads(line[len("data: "):]) for line in body.split("\n") if line.startswith("data: ")]
+
+    def test_replay_after_an_id_and_trimmed_history(self):
+        events = InMemoryBroker(history=2)
+        first = events.publish(["employee:1", "manager:1"], {"n": 1})
+        events.publish(["employee:1", "manager:1"], {"n": 2})
+        events.publish(["employee:2"], {"n": 3})
+        replayed, complete = events.replay(["employee:1", "manager:1"], first)
+        self.assertEqual([event for _, event in replayed], [{"n": 2}])
+        self.assertTrue(complete)
+        events.publish(["employee:1"], {"n": 4})
+        # The client already saw the dropped event, but not one before it
+        self.assertTrue(events.replay(["employee:1"], first)[1])
+        self.assertFalse(events.replay(["employee:1"], first - 1)[1])
+        self.assertFalse(events.replay(["employee:1"], 0)[1])
+
+    def test_status_updates_publish_to_employee_and_manager(self):
+        ticket = self.tickets[0]
+        with self.captureOnCommitCallbacks(execute=True):
+            response = client_for(self.manager).put("/travel/manager_status_update/", {
+                "ticket_id": ticket.id, "manager_id": self.manager.id, "manager_status": "Approved",
+                "feedback": "Fine"}, format="json")
+        self.assertEqual(response.status_code, 200)
+        for channel in (f"employee:{self.employee.id}", f"manager:{self.manager.id}"):
+            (_, event), = broker().replay([channel], 0)[0]
+            self.assertEqual((event["ticket_id"], event["manager_status"], event["manager_note"]),
+                             (ticket.id, "Approved", "Fine"))
+
+    async def test_reconnect_replays_missed_events(self):
+        channels = [f"employee:{self.employee.id}"]
+        seen = broker().publish(channels, {"ticket_id": 1})
+        broker().publish(channels, {"ticket_id": 2})
+        response = await AsyncClient().get("/travel/async/events/?stream_seconds=0",
+                                           headers={**self.headers, "Last-Event-ID": str(seen)})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        body = b"".join([chunk async for chunk in response.streaming_content]).decode()
+        self.assertNotIn("event: reset", body)
+        self.assertEqual(self.events(body), [{"ticket_id": 2}])
+
+        # History no longer reaches back to the client's id
+        stale = await AsyncClient().get("/travel/async/events/?stream_seconds=0&last_event_id=1",
+                                        headers=self.headers)
+        body = b"".join([chunk async for chunk in stale.streaming_content]).decode()
+        self.assertIn("event: reset", body)
+
+    async def test_live_events_reach_an_open_stream(self):
+        response = await AsyncClient().get("/travel/async/events/", headers=self.headers)
+        stream = response.streaming_content
+        self.assertTrue((await anext(stream)).startswith(b"retry:"))
+        broker().publish([f"manager:{self.manager.id}"], {"ticket_id": 1})
+        broker().publish([f"employee:{self.employee.id}"], {"ticket_id": 2})
+        chunk = (await anext(stream)).decode()
+        # As the ASGI handler does once the body is sent. request_finished
+        # would close the shared test connection, as the test client knows
+        request_finished.disconnect(close_old_connections)
+        try:
+            await sync_to_async(response.close)()
+        finally:
+            request_finished.connect(close_old_connections)
+        self.assertEqual(self.events(chunk), [{"ticket_id": 2}])
+        self.assertEqual(broker()._subscribers, {})
+
+    async def test_admins_have_no_stream(self):
+        admin = await sync_to_async(make_admin)()
+        token = await Token.objects.acreate(user=admin.user_auth)
+        response = await AsyncClient().get("/travel/async/events/", headers={"Authorization": f"Token {token.key}"})
+        self.assertEqual(response.status_code, 403)
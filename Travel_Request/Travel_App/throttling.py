@@ -0,0 +1,163 @@
+import hashlib
+import json
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.module_loading import import_string
+from rest_framework.authentication import get_authorization_header
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+PERIODS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+
+def parse_rate(rate):
+    """``"5/min"`` -> ``(5, 60)``: bucket capacity and seconds to refill it completely."""
+    count, period = rate.split("/")
+    return int(count), PERIODS[period[0]]
+
+
+class LocMemBucketStore:
+    """Token buckets in a dict of this process. For tests and single-process servers."""
+
+    def __init__(self):
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def take(self, key, capacity, period, now=None):
+        """
+        Take one token from bucket ``key``.
+
+        Returns ``(allowed, retry_after)``; ``retry_after`` is the number of
+        seconds until a token is available when the call is refused.
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            tokens, stamp = self._buckets.get(key, (capacity, now))
+            allowed, tokens, retry_after = _spend(tokens, stamp, now, capacity, period)
+            self._buckets[key] = (tokens, now)
+        return allowed, retry_after
+
+    def clear(self):
+        with self._lock:
+            self._buckets.clear()
+
+
+class CacheBucketStore:
+    """
+    Token buckets in a Django cache, shared by every worker using it.
+
+    Each bucket is one ``(tokens, timestamp)`` entry that expires after a
+    full refill period. Read and write are two cache calls, so concurrent
+    takes on one key can let a request or two slip through; that is fine
+    for throttling.
+    """
+
+    def __init__(self, alias=None):
+        self.alias = alias or getattr(settings, "THROTTLE_CACHE", "default")
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    def take(self, key, capacity, period, now=None):
+        now = time.time() if now is None else now
+        tokens, stamp = self.cache.get(key) or (capacity, now)
+        allowed, tokens, retry_after = _spend(tokens, stamp, now, capacity, period)
+        self.cache.set(key, (tokens, now), period)
+        return allowed, retry_after
+
+    def clear(self):
+        self.cache.clear()
+
+
+def _spend(tokens, stamp, now, capacity, period):
+    tokens = min(capacity, tokens + (now - stamp) * capacity / period)
+    if tokens >= 1:
+        return True, tokens - 1, 0
+    return False, tokens, (1 - tokens) * period / capacity
+
+
+_store = None
+
+
+def bucket_store():
+    """The store named by settings.THROTTLE_BUCKET_STORE, created once per process."""
+    global _store
+    if _store is None:
+        _store = import_string(getattr(settings, "THROTTLE_BUCKET_STORE",
+                                       "Travel_App.throttling.CacheBucketStore"))()
+    return _store
+
+
+def reset_bucket_store():
+    global _store
+    _store = None
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """
+    DRF throttle backed by a token bucket per ``(scope, ident)``.
+
+    The rate comes from REST_FRAMEWORK["DEFAULT_THROTTLE_RATES"][scope], e.g.
+    ``"5/min"`` allows bursts of 5 and refills one token every 12 seconds.
+    A refused request gets 429 with Retry-After from DRF.
+    """
+    scope = None
+
+    def get_ident_key(self, request):
+        raise NotImplementedError
+
+    def allow_request(self, request, view):
+        rate = api_settings.DEFAULT_THROTTLE_RATES.get(self.scope)
+        ident = self.get_ident_key(request)
+        if rate is None or ident is None:
+            return True
+        capacity, period = parse_rate(rate)
+        allowed, self.retry_after = bucket_store().take(f"throttle:{self.scope}:{ident}", capacity, period)
+        return allowed
+
+    def wait(self):
+        return self.retry_after
+
+
+class LoginIPThrottle(TokenBucketThrottle):
+    """
+    Login attempts per client address: REMOTE_ADDR, or the X-Forwarded-For
+    entry added by the outermost of REST_FRAMEWORK['NUM_PROXIES'] proxies.
+    """
+    scope = "login_ip"
+
+    def get_ident_key(self, request):
+        return self.get_ident(request)
+
+
+class LoginUsernameThrottle(TokenBucketThrottle):
+    """Login attempts per username, whichever address they come from."""
+    scope = "login_user"
+
+    def get_ident_key(self, request):
+        # Read the raw body so the view can still json.loads(request.body) afterwards
+        try:
+            username = json.loads(getattr(request, "_request", request).body or b"{}").get("username")
+        except (ValueError, AttributeError):
+            return None
+        if not isinstance(username, str) or not username:
+            return None
+        return hashlib.md5(username.lower().encode()).hexdigest()
+
+
+class DashboardThrottle(TokenBucketThrottle):
+    """Dashboard and search calls per auth token."""
+    scope = "dashboard"
+
+    def get_ident_key(self, request):
+        credential = get_authorization_header(request)
+        if not credential:
+            return self.get_ident(request)
+        return hashlib.md5(credential).hexdigest()
+
+
+LOGIN_THROTTLES = [LoginIPThrottle, LoginUsernameThrottle]
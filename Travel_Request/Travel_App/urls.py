@@ -1,5 +1,6 @@
 from django.urls import path
 from .views import *
+from . import async_views
 from rest_framework.authtoken.views import obtain_auth_token
 
 
@@ -16,18 +17,39 @@ urlpatterns = [
     path('manager_login/', manager_login),
     path('manager_dashboard/', manager_dashboard),
     path('filter_sort_search/', filter_sort_search),
+    path('request_facets/', request_facets),
+    path('changes/', request_changes),
+    path('travel_calendar/', travel_calendar),
+    path('travel_occupancy/', travel_occupancy),
+    path('status_summary/', status_summary),
+    path('export_requests/', export_requests),
     path('manager_status_update/', manager_status_update),
+    path('manager_bulk_status_update/', manager_bulk_status_update),
 
     path('admin_dashboard/', admin_dashboard),
     path('add_manager/', add_manager),
     path('edit_manager/<int:manager_id>/',edit_manager),
     path('delete_manager/<int:manager_id>/',delete_manager),
     path('add_employee/', add_employee),
+    path('import_people/', import_people_csv),
     path('edit_employee/<int:employee_id>/',edit_employee),
-    path('delete_employee/<int:employee_id>/',delete_manager),
+    path('delete_employee/<int:employee_id>/',delete_employee),
     path('admin_status_update/',admin_status_update),
     path('close_ticket/',close_ticket),
     path('list_employees/',list_employees),
     path('list_managers/',list_managers),
-    path('logout/',user_logout)
+    path('logout/',user_logout),
+
+    # Async (ASGI) variants, see async_views.py
+    path('async/employee_login/', async_views.employee_login),
+    path('async/manager_login/', async_views.manager_login),
+    path('async/admin_login/', async_views.admin_login),
+    path('async/employee_dashboard/', async_views.employee_dashboard),
+    path('async/manager_dashboard/', async_views.manager_dashboard),
+    path('async/admin_dashboard/', async_views.admin_dashboard),
+    path('async/filter_sort_search/', async_views.filter_sort_search),
+    path('async/manager_status_update/', async_views.manager_status_update),
+    path('async/admin_status_update/', async_views.admin_status_update),
+    path('async/close_ticket/', async_views.close_ticket),
+    path('async/events/', async_views.events),
 ]
@@ -1,31 +1,80 @@
 from django.shortcuts import render,get_object_or_404
-from django.contrib.auth import authenticate
-from rest_framework.decorators import api_view,permission_classes
+from django.contrib.auth import authenticate, logout
+from rest_framework.decorators import api_view,permission_classes,throttle_classes
 from rest_framework.response import Response
+from rest_framework.exceptions import APIException
 from rest_framework.status import HTTP_200_OK, HTTP_400_BAD_REQUEST, HTTP_404_NOT_FOUND,HTTP_401_UNAUTHORIZED, HTTP_500_INTERNAL_SERVER_ERROR
-from .models import Employee,Admin,Manager,Employee_Request
+from .models import Employee,Admin,Manager,Employee_Request,ArchivedRequest
 from .serializers import TicketRequestSerializer,EmployeeTableSerializer,EmployeeNameSerializer,ManagerNameSerializer,ManagerTableSerializer,AdminTableSerializer,ManagerSerializer,EmployeeSerializer
-from django.http import JsonResponse
+from django.http import JsonResponse, StreamingHttpResponse
 from django.views.decorators.csrf import csrf_exempt
 import json
 from django.contrib.auth.models import User
 from django.db.models import Q
 from .permissions import IsAdminUser, IsManagerUser, IsEmployeeUser
+from .pagination import KeysetPagination
+from .outbox import enqueue_mail, enqueue_mails
+from .authentication import issue_token, revoked_tokens
+from .profiles import get_profile
+from .projections import ADMIN_TABLE, EMPLOYEE_TABLE, MANAGER_TABLE, projection_enabled
+from .filters import cached_facet_counts, filter_requests
+from .importer import IMPORT_KINDS, import_people, read_csv
+from .throttling import LOGIN_THROTTLES, DashboardThrottle
+from .routers import replica_reads
+from .metrics import timed
+from .budgets import query_budget
+from .list_cache import cached_list_response
+from .counters import apply_deltas, count_change, counter_summary, record_change, snapshot
+from .export import EXPORT_CHUNK_SIZE, EXPORT_FORMATS
+from .pagination import iterate_keyset, merge_ordered
+from .archive import NOT_SEARCHABLE_MESSAGE, include_archived
+from .occupancy import daily_occupancy, overlapping, parse_window, travelling_requests
+from .changes import DASHBOARDS, DELETE, changes_since, latest_cursor, log_change, log_changes
+from .events import publish_status, publish_statuses
 from django.contrib.auth.models import User, Group
 from rest_framework.permissions import IsAuthenticated,AllowAny
 from rest_framework.authtoken.models import Token
 from django.utils.timezone import now 
 from rest_framework import status
-from django.core.mail import send_mail
+from django.db import transaction
 from datetime import datetime,date
 import logging
+from django.conf import settings
 from django.core.exceptions import ObjectDoesNotExist
 
 logger = logging.getLogger(__name__)
 
+MANAGER_STATUSES = ["Approved", "Declined", "Pending", "OnProgress"]
+BULK_DECISION_LIMIT = 500
+
+
+def table_page(request, queryset, serializer_class, projection, endpoint, archived=None):
+    """
+    One keyset page of a dashboard table, via the serializer or its values() projection.
+
+    ``archived`` (the same rows in ArchivedRequest) is merged in when the
+    request asks for include_archived.
+    """
+    paginator = KeysetPagination()
+    querysets = [queryset]
+    if archived is not None and include_archived(request.query_params):
+        querysets.append(archived)
+    if projection_enabled(endpoint):
+        page = paginator.paginate_querysets([projection.values(qs) for qs in querysets], request)
+        with timed("serialize"):
+            data = projection.render(page)
+    else:
+        page = paginator.paginate_querysets(querysets, request)
+        with timed("serialize"):
+            data = serializer_class(page, many=True).data
+    return paginator.get_paginated_response(data)
+
+
+@query_budget(3)
 @csrf_exempt
 @api_view(['POST'])
 @permission_classes([AllowAny])
+@throttle_classes(LOGIN_THROTTLES)
 def employee_login(request):
     """
     Authenticate an admin and return a token if credentials are valid.
@@ -34,36 +83,42 @@ def employee_login(request):
         data = json.loads(request.body)
         user = authenticate(username=data['username'], password=data['password'])
         if user is not None and hasattr(user,'employee'):
-            token, created = Token.objects.get_or_create(user=user)
+            token = issue_token(user, 'employee')
             logger.info(f"Employee {user.username} logged in successfully.")
-            return JsonResponse({'status': 'success', 'token': token.key})
+            return JsonResponse({'status': 'success', 'token': token})
         logger.warning(f"Failed login attempt for username: {data['username']}")
         return JsonResponse({'status': 'failed', 'message': 'Invalid credentials'}, status=401)
     logger.error("Invalid request method for employee_login")
     return JsonResponse({'status': 'failed', 'message': 'Invalid request method'}, status=400)    
 
 
+@query_budget(3)
 @api_view(['GET'])
 @permission_classes([IsAuthenticated, IsEmployeeUser])
+@throttle_classes([DashboardThrottle])
 def employee_dashboard(request):
     try:
         # Get the authenticated user
         user = request.user
         # Retrieve the employee associated with the authenticated user
-        employee = Employee.objects.filter(user_auth=user).first()
+        employee = get_profile(request).employee
         if not employee:
             logger.error(f"Invalid Employee for user: {user.username}")
             return Response({"error": "Invalid Employee"}, status=status.HTTP_404_NOT_FOUND)
         # Get the employee's travel requests
-        req = Employee_Request.objects.filter(employee=employee)
-        serializer = EmployeeTableSerializer(req, many=True)
+        # The serializer nests the manager; the projection joins it anyway
+        req = Employee_Request.objects.filter(employee=employee).select_related("manager")
+        archived = ArchivedRequest.objects.filter(employee=employee).select_related("manager")
+        response = table_page(request, req, EmployeeTableSerializer, EMPLOYEE_TABLE, 'employee_dashboard',
+                              archived=archived)
         
         logger.info(f"Employee {user.username} accessed their dashboard.")
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        return response
     except Employee_Request.DoesNotExist:
         logger.error(f"No requests found for employee: {user.username}")
         return Response({"error": "No requests found"}, status=status.HTTP_404_NOT_FOUND) 
 
+@query_budget(5)
 @csrf_exempt
 @api_view(['POST'])
 @permission_classes([IsAuthenticated, IsEmployeeUser])
@@ -73,7 +128,7 @@ def new_travel_request(request):
         user = request.user
 
         # Validate Employee
-        employee = Employee.objects.filter(user_auth=user).first()
+        employee = get_profile(request).employee
         if not employee:
             logger.error(f"Invalid Employee for user: {user.username}")
             return Response({"status": "failed", "message": "Invalid Employee"}, status=status.HTTP_404_NOT_FOUND)
@@ -85,24 +140,27 @@ def new_travel_request(request):
             return Response({"status": "failed", "message": "Manager not assigned"}, status=status.HTTP_404_NOT_FOUND)
 
         # Create a new travel request entry
-        new_ticket = Employee_Request.objects.create(
-            employee=employee,  
-            manager=manager,  
-            date_of_sub=data.get("date_of_sub", date.today()),  # Default to today
-            purpose=data.get("purpose"),
-            from_loc=data.get("from_loc"),
-            to_loc=data.get("to_loc"),
-            travel_mode=data.get("travel_mode"),
-            from_date=data.get("from_date"),
-            to_date=data.get("to_date"),
-            lodging_required=data.get("lodging_required", "No"),
-            additional_request=data.get("additional_request", ""),
-            manager_note=data.get("manager_note", ""),
-            admin_note=data.get("admin_note", ""),
-            no_of_resub=data.get("no_of_resub", 1),
-            manager_status=data.get("manager_status", "Pending"),
-            admin_status=data.get("admin_status", "Not_closed"),
-        )
+        with transaction.atomic():
+            new_ticket = Employee_Request.objects.create(
+                employee=employee,  
+                manager=manager,  
+                date_of_sub=data.get("date_of_sub", date.today()),  # Default to today
+                purpose=data.get("purpose"),
+                from_loc=data.get("from_loc"),
+                to_loc=data.get("to_loc"),
+                travel_mode=data.get("travel_mode"),
+                from_date=data.get("from_date"),
+                to_date=data.get("to_date"),
+                lodging_required=data.get("lodging_required", "No"),
+                additional_request=data.get("additional_request", ""),
+                manager_note=data.get("manager_note", ""),
+                admin_note=data.get("admin_note", ""),
+                no_of_resub=data.get("no_of_resub", 1),
+                manager_status=data.get("manager_status", "Pending"),
+                admin_status=data.get("admin_status", "Not_closed"),
+            )
+            count_change(after=snapshot(new_ticket))
+            log_change(new_ticket)
 
         logger.info(f"New travel request created by employee: {user.username}")
         return Response(
@@ -110,74 +168,97 @@ def new_travel_request(request):
             status=status.HTTP_201_CREATED
         )
 
+    except APIException:
+        # e.g. AuthenticationFailed from get_profile, with its own status
+        raise
+
     except Exception as e:
         logger.error(f"Error creating travel request for employee: {user.username} - {str(e)}")
         return Response({"status": "failed", "message": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
 # Edit Travel Request
+@query_budget(8)
 @api_view(['PUT'])
 @permission_classes([IsAuthenticated, IsEmployeeUser])
 def edit_travel_request(request, request_id):
     try:
         user = request.user
         # Validate Employee
-        employee = Employee.objects.filter(user_auth=user).first()
+        employee = get_profile(request).employee
         if not employee:
             logger.error(f"Invalid Employee for user: {user.username}")
             return Response({"status": "failed", "message": "Invalid Employee"}, status=status.HTTP_404_NOT_FOUND)
 
-        # Validate Travel Request
-        travel_request = Employee_Request.objects.filter(id=request_id, employee=employee).first()
-        if not travel_request:
-            logger.error(f"Travel request {request_id} not found for employee: {user.username}")
-            return Response({"status": "failed", "message": "Travel request not found"}, status=status.HTTP_404_NOT_FOUND)
-
-        # Update Travel Request
-        data = request.data
-        serializer = EmployeeTableSerializer(travel_request, data=data, partial=True)
-        if serializer.is_valid():
-            serializer.save()
-            logger.info(f"Travel request {request_id} updated by employee: {user.username}")
-            return Response({"status": "success", "message": "Travel request updated successfully", "updated_data": serializer.data}, status=HTTP_200_OK)
+        # Locked, so the counter deltas start from the row as it is now
+        with transaction.atomic():
+            # Validate Travel Request
+            travel_request = Employee_Request.objects.select_for_update().filter(id=request_id, employee=employee).first()
+            if not travel_request:
+                logger.error(f"Travel request {request_id} not found for employee: {user.username}")
+                return Response({"status": "failed", "message": "Travel request not found"}, status=status.HTTP_404_NOT_FOUND)
+
+            # Update Travel Request
+            data = request.data
+            serializer = EmployeeTableSerializer(travel_request, data=data, partial=True)
+            if serializer.is_valid():
+                before = snapshot(travel_request)
+                serializer.save()
+                count_change(before, snapshot(travel_request))
+                log_change(travel_request)
+                logger.info(f"Travel request {request_id} updated by employee: {user.username}")
+                return Response({"status": "success", "message": "Travel request updated successfully", "updated_data": serializer.data}, status=HTTP_200_OK)
         logger.error(f"Error updating travel request {request_id} - {serializer.errors}")
         return Response({"status": "failed", "message": serializer.errors}, status=HTTP_400_BAD_REQUEST)
 
+    except APIException:
+        raise
+
     except Exception as e:
         logger.error(f"Error updating travel request {request_id} for employee: {user.username} - {str(e)}")
         return Response({"status": "failed", "message": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
 
 # Delete Travel Request
+@query_budget(6)
 @api_view(['DELETE'])
 @permission_classes([IsAuthenticated, IsEmployeeUser])
 def delete_travel_request(request, request_id):
     try:
         user = request.user
         # Validate Employee
-        employee = Employee.objects.filter(user_auth=user).first()
+        employee = get_profile(request).employee
         if not employee:
             logger.error(f"Invalid Employee for user: {user.username}")
             return Response({"status": "failed", "message": "Invalid Employee"}, status=status.HTTP_404_NOT_FOUND)
 
-        # Validate Travel Request
-        travel_request = Employee_Request.objects.filter(id=request_id, employee=employee).first()
-        if not travel_request:
-            logger.error(f"Travel request {request_id} not found for employee: {user.username}")
-            return Response({"status": "failed", "message": "Travel request not found"}, status=status.HTTP_404_NOT_FOUND)
-
-        # Delete Travel Request
-        travel_request.delete()
+        # Locked, so the counter deltas start from the row as it is now
+        with transaction.atomic():
+            # Validate Travel Request
+            travel_request = Employee_Request.objects.select_for_update().filter(id=request_id, employee=employee).first()
+            if not travel_request:
+                logger.error(f"Travel request {request_id} not found for employee: {user.username}")
+                return Response({"status": "failed", "message": "Travel request not found"}, status=status.HTTP_404_NOT_FOUND)
+
+            # Delete Travel Request
+            count_change(before=snapshot(travel_request))
+            log_change(travel_request, DELETE)
+            travel_request.delete()
         logger.info(f"Travel request {request_id} deleted by employee: {user.username}")
         return Response({"status": "success", "message": "Travel request deleted successfully"}, status=HTTP_200_OK)
 
+    except APIException:
+        raise
+
     except Exception as e:
         logger.error(f"Error deleting travel request {request_id} for employee: {user.username} - {str(e)}")
         return Response({"status": "failed", "message": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
         
+@query_budget(3)
 @csrf_exempt
 @api_view(['POST'])
 @permission_classes([AllowAny])
+@throttle_classes(LOGIN_THROTTLES)
 def manager_login(request):
     """
     Authenticate an admin and return a token if credentials are valid.
@@ -186,92 +267,190 @@ def manager_login(request):
         data = json.loads(request.body)
         user = authenticate(username=data['username'], password=data['password'])
         if user is not None and hasattr(user,'manager'):
-            token, created = Token.objects.get_or_create(user=user)
-            return JsonResponse({'status': 'success', 'token': token.key})
+            token = issue_token(user, 'manager')
+            return JsonResponse({'status': 'success', 'token': token})
         return JsonResponse({'status': 'failed', 'message': 'Invalid credentials'}, status=401)
     return JsonResponse({'status': 'failed', 'message': 'Invalid request method'}, status=400)
+@query_budget(3)
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@throttle_classes([DashboardThrottle])
 def manager_dashboard(request):
     try:
-        # Fetch the Manager instance linked to the authenticated user
-        manager = Manager.objects.get(user_auth=request.user)
-
-        # Get all employees under this manager
-        employees = Employee.objects.filter(manager=manager)
-
-        # If no employees are assigned to this manager, return an empty list
-        if not employees.exists():
-            logger.info(f"Manager {request.user.username} has no employees assigned.")
-            return Response([], status=HTTP_200_OK)  # ✅ Return an empty list
+        # Manager profile is resolved with the token, see profiles.get_profile
+        manager = get_profile(request).manager
+        if manager is None:
+            raise Manager.DoesNotExist
 
-        # Get all travel requests assigned to these employees
-        history_list = Employee_Request.objects.filter(employee__in=employees).select_related("employee")
-
-        # If no requests exist, return an empty list
-        if not history_list.exists():
-            logger.info(f"Manager {request.user.username} has no assigned travel requests.")
-            return Response([], status=HTTP_200_OK)  # ✅ Return an empty list
-
-        # Serialize the data
-        serializer = ManagerTableSerializer(history_list, many=True)
+        # Every request carries its manager, so one indexed query (req_mgr_sub_idx) per page
+        history_list = Employee_Request.objects.filter(manager=manager).select_related("employee")
+        archived = ArchivedRequest.objects.filter(manager=manager).select_related("employee")
+        response = table_page(request, history_list, ManagerTableSerializer, MANAGER_TABLE, 'manager_dashboard',
+                              archived=archived)
 
         logger.info(f"Manager {request.user.username} accessed their dashboard successfully.")
-        return Response(serializer.data, status=HTTP_200_OK)  # ✅ Return data directly
+        return response  # ✅ Return data directly
 
     except Manager.DoesNotExist:
         logger.error(f"Manager record not found for user {request.user.username}")
         return Response({'error': 'Manager record not found'}, status=HTTP_404_NOT_FOUND)
 
+    except APIException:
+        # e.g. NotFound for a bad cursor; DRF renders it with its own status
+        raise
+
     except Exception as e:
         logger.error(f"Error accessing manager dashboard: {str(e)}")
         return Response({'error': str(e)}, status=HTTP_500_INTERNAL_SERVER_ERROR)
 
+@query_budget(3)
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@throttle_classes([DashboardThrottle])
+@replica_reads
 def filter_sort_search(request):
     """Filters and sorts Employee Requests based on query parameters"""
-    
-    # Get filter parameters from request
-    first_name = request.query_params.get("first_name", "").strip()
-    last_name = request.query_params.get("last_name", "").strip()
-    employee_id = request.query_params.get("employee_id", "").strip()
-    start_date = request.query_params.get("start_date", "").strip()
-    end_date = request.query_params.get("end_date", "").strip()
-    manager_status = request.query_params.get("manager_status", "").strip()
-    admin_status = request.query_params.get("admin_status", "").strip()
-    sort_field = request.query_params.get("sort_field", "date_of_sub").strip()
-    sort_order = request.query_params.get("sort_order", "asc").strip()
-
-    # Start with all records
-    queryset = Employee_Request.objects.all()
-
-    # Apply filters
-    if first_name:
-        queryset = queryset.filter(employee__first_name__icontains=first_name)
-    if last_name:
-        queryset = queryset.filter(employee__last_name__icontains=last_name)
-    if employee_id:
-        queryset = queryset.filter(employee__id=employee_id)
-    if start_date:
-        queryset = queryset.filter(from_date__gte=start_date)
-    if end_date:
-        queryset = queryset.filter(to_date__lte=end_date)
-    if manager_status:
-        queryset = queryset.filter(manager_status=manager_status)
-    if admin_status:
-        queryset = queryset.filter(admin_status=admin_status)
-
-    # Sorting logic
-    if sort_field in ["date_of_sub", "from_date", "to_date", "first_name", "last_name"]:
-        if sort_order == "desc":
-            sort_field = f"-{sort_field}"
-        queryset = queryset.order_by(sort_field)
+    queryset, ordering = filter_requests(request.query_params)
+    queryset = queryset.order_by(*ordering).select_related("manager")
+    if include_archived(request.query_params):
+        if request.query_params.get("q", "").strip():
+            return Response({'status': 'failed', 'message': NOT_SEARCHABLE_MESSAGE}, status=HTTP_400_BAD_REQUEST)
+        archived, _ = filter_requests(request.query_params, ArchivedRequest.objects.all())
+        # The merge compares the sort columns, employee names included
+        queryset = merge_ordered([queryset.select_related("employee"),
+                                  archived.order_by(*ordering).select_related("manager", "employee")], ordering)
 
     # Serialize and return filtered/sorted data
     serializer = EmployeeTableSerializer(queryset, many=True)
-    return Response(serializer.data)
+    with timed("serialize"):
+        data = serializer.data
+    return Response(data)
+
+@query_budget(3)
+@api_view(['GET'])
+@permission_classes([IsAuthenticated, IsAdminUser])
+@throttle_classes([DashboardThrottle])
+@replica_reads
+def travel_calendar(request):
+    """
+    Trips on the road on any day of ?start=&end= (declined ones left out),
+    a keyset page at a time in from_date order.
+    """
+    try:
+        start, end = parse_window(request.query_params)
+    except ValueError as e:
+        return Response({'status': 'failed', 'message': str(e)}, status=HTTP_400_BAD_REQUEST)
+    trips = overlapping(travelling_requests().select_related("employee", "manager"), start, end)
+    paginator = KeysetPagination(ordering=("from_date", "id"))
+    page = paginator.paginate_queryset(ADMIN_TABLE.values(trips), request)
+    with timed("serialize"):
+        data = ADMIN_TABLE.render(page)
+    return paginator.get_paginated_response(data)
+
+@query_budget(3)
+@api_view(['GET'])
+@permission_classes([IsAuthenticated, IsAdminUser])
+@throttle_classes([DashboardThrottle])
+@replica_reads
+def travel_occupancy(request):
+    """Travellers per day of ?start=&end=, in total, by destination and by travel mode."""
+    try:
+        start, end = parse_window(request.query_params)
+    except ValueError as e:
+        return Response({'status': 'failed', 'message': str(e)}, status=HTTP_400_BAD_REQUEST)
+    return Response({'start': start.isoformat(), 'end': end.isoformat(), 'days': daily_occupancy(start, end)})
 
+@query_budget(4)
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+@throttle_classes([DashboardThrottle])
+def request_changes(request):
+    """
+    Dashboard rows upserted or deleted since ?since=<cursor>, see changes.py.
+
+    ?dashboard= is employee, manager or admin (default: the caller's role).
+    Without since only the current cursor is returned: get it before
+    loading the dashboard, then poll with it.
+    """
+    profile = get_profile(request)
+    dashboard = request.query_params.get('dashboard', profile.role)
+    if dashboard not in DASHBOARDS:
+        return Response({'status': 'failed', 'message': f'dashboard must be one of {", ".join(DASHBOARDS)}'}, status=HTTP_400_BAD_REQUEST)
+    _, owner_column, profile_field = DASHBOARDS[dashboard]
+    owner = getattr(profile, profile_field)
+    if owner is None:
+        return Response({'status': 'failed', 'message': f'No {dashboard} dashboard for this user'}, status=status.HTTP_403_FORBIDDEN)
+
+    since = request.query_params.get('since')
+    if since is None:
+        return Response({'cursor': str(latest_cursor()), 'has_more': False, 'reset': False, 'upserted': [], 'deleted': []})
+    if not since.isdigit():
+        return Response({'status': 'failed', 'message': 'Invalid cursor'}, status=HTTP_400_BAD_REQUEST)
+    return Response(changes_since(int(since), dashboard, owner.id if owner_column else None))
+
+@query_budget(2)
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+@throttle_classes([DashboardThrottle])
+@replica_reads
+def request_facets(request):
+    """
+    Counts per manager_status, admin_status, travel_mode and lodging_required
+    for the requests matching the filter_sort_search filters.
+    """
+    return Response(cached_facet_counts(request.query_params))
+
+@query_budget(2)
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+@throttle_classes([DashboardThrottle])
+def status_summary(request):
+    """
+    Request counts per manager_status and admin_status for the caller's badges.
+
+    Managers get their queue, employees their own requests, admins the
+    totals or, with ``manager_id``/``employee_id``, one person's counts.
+    """
+    profile = get_profile(request)
+    if profile.manager is not None:
+        scope, owner_id = 'manager', profile.manager.id
+    elif profile.employee is not None:
+        scope, owner_id = 'employee', profile.employee.id
+    elif profile.admin is not None:
+        scope, owner_id = 'all', 0
+        for param in ('manager_id', 'employee_id'):
+            value = request.query_params.get(param, '').strip()
+            if value:
+                if not value.isdigit():
+                    return Response({'status': 'failed', 'message': f'{param} must be an id'}, status=HTTP_400_BAD_REQUEST)
+                scope, owner_id = param[:-3], int(value)
+    else:
+        return Response({'status': 'failed', 'message': 'No profile for this user'}, status=HTTP_404_NOT_FOUND)
+    return Response({'status': 'success', 'data': counter_summary(scope, owner_id)})
+
+@query_budget(2)
+@api_view(['GET'])
+@permission_classes([IsAuthenticated, IsAdminUser])
+@throttle_classes([DashboardThrottle])
+def export_requests(request):
+    """
+    Stream every request matching the filter_sort_search filters as CSV or NDJSON.
+    """
+    output = request.query_params.get("output", "csv").strip()
+    if output not in EXPORT_FORMATS:
+        return Response({'status': 'failed', 'message': 'output must be csv or ndjson'}, status=HTTP_400_BAD_REQUEST)
+
+    queryset, ordering = filter_requests(request.query_params)
+    # Sort columns outside the table (the search rank) are fetched for the keyset too
+    sort_columns = [field.lstrip('-') for field in ordering]
+    rows = iterate_keyset(ADMIN_TABLE.values(queryset, extra=sort_columns), ordering, chunk_size=EXPORT_CHUNK_SIZE)
+    content_type, stream = EXPORT_FORMATS[output]
+    response = StreamingHttpResponse(stream(rows, ADMIN_TABLE), content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="travel_requests.{output}"'
+    logger.info(f"Admin {request.user.username} started a {output} export.")
+    return response
+
+@query_budget(9)
 @api_view(["PUT"])
 @permission_classes([IsAuthenticated, IsManagerUser])
 def manager_status_update(request):
@@ -282,37 +461,41 @@ def manager_status_update(request):
         manager_status = data.get('manager_status')
         feedback = data.get('feedback', '')
 
-        try:
-            ticket = Employee_Request.objects.get(id=ticket_id)
-        except Employee_Request.DoesNotExist:
-            logger.error(f"Ticket {ticket_id} not found for manager_status_update")
-            return JsonResponse({'status': 'error', 'message': 'Ticket not found', 'data': None}, status=404)
+        # Locked, so the counter deltas start from the row as it is now
+        with transaction.atomic():
+            try:
+                ticket = Employee_Request.objects.select_for_update().select_related("employee", "manager").get(id=ticket_id)
+            except Employee_Request.DoesNotExist:
+                logger.error(f"Ticket {ticket_id} not found for manager_status_update")
+                return JsonResponse({'status': 'error', 'message': 'Ticket not found', 'data': None}, status=404)
 
-        try:
-            manager_instance = Manager.objects.get(pk=manager_id)
-        except Manager.DoesNotExist:
-            logger.error(f"Manager {manager_id} not found for manager_status_update")
-            return JsonResponse({'status': 'error', 'message': 'Manager not found', 'data': None}, status=404)
-
-        if ticket.manager != manager_instance:
-            logger.warning(f"Unauthorized status update attempt by manager {manager_id} for ticket {ticket_id}")
-            return JsonResponse({'status': 'error', 'message': 'Unauthorized: You can only manage requests assigned to you', 'data': None}, status=403)
-
-        valid_statuses = ["Approved", "Declined", "Pending", "OnProgress"]
-        if manager_status not in valid_statuses:
-            logger.error(f"Invalid status {manager_status} provided by manager {manager_id} for ticket {ticket_id}")
-            return JsonResponse({'status': 'error', 'message': 'Invalid status. Choose from Approved, Canceled, or Pending.', 'data': None}, status=400)
-
-        ticket.manager_status = manager_status
-        ticket.manager_note = feedback
-        ticket.save()
-        send_mail(
-            'Travel Request Status Update',
-            f'Your travel request with ID {ticket.id} has been updated to {manager_status}.',
-            'manager@example.com',
-            [ticket.employee.email],
-            fail_silently=False,
-        )
+            try:
+                manager_instance = Manager.objects.get(pk=manager_id)
+            except Manager.DoesNotExist:
+                logger.error(f"Manager {manager_id} not found for manager_status_update")
+                return JsonResponse({'status': 'error', 'message': 'Manager not found', 'data': None}, status=404)
+
+            if ticket.manager != manager_instance:
+                logger.warning(f"Unauthorized status update attempt by manager {manager_id} for ticket {ticket_id}")
+                return JsonResponse({'status': 'error', 'message': 'Unauthorized: You can only manage requests assigned to you', 'data': None}, status=403)
+
+            if manager_status not in MANAGER_STATUSES:
+                logger.error(f"Invalid status {manager_status} provided by manager {manager_id} for ticket {ticket_id}")
+                return JsonResponse({'status': 'error', 'message': 'Invalid status. Choose from Approved, Canceled, or Pending.', 'data': None}, status=400)
+
+            before = snapshot(ticket)
+            ticket.manager_status = manager_status
+            ticket.manager_note = feedback
+            ticket.save()
+            count_change(before, snapshot(ticket))
+            log_change(ticket)
+            publish_status(ticket)
+            enqueue_mail(
+                'Travel Request Status Update',
+                f'Your travel request with ID {ticket.id} has been updated to {manager_status}.',
+                'manager@example.com',
+                [ticket.employee.email],
+            )
 
         logger.info(f"Manager {manager_id} updated status of ticket {ticket_id} to {manager_status}")
         return JsonResponse({'data': {'ticket_id': ticket.id, 'employee_id': ticket.employee.pk, 'manager_id': ticket.manager.pk, 'manager_status': ticket.manager_status, 'manager_note': ticket.manager_note}}, status=200)
@@ -326,8 +509,82 @@ def manager_status_update(request):
         return JsonResponse({'status': 'error', 'message': str(e), 'data': None}, status=500)
 
 
+@query_budget(6)
+@api_view(["PUT"])
+@permission_classes([IsAuthenticated, IsManagerUser])
+def manager_bulk_status_update(request):
+    """
+    Apply one decision to many tickets of the calling manager.
+
+    Body: ``{"ticket_ids": [...], "manager_status": "...", "feedback": "..."}``.
+    Ownership is checked with one query, the owned tickets are changed with
+    one UPDATE and their notifications are queued with one insert, all in a
+    single transaction with the counter update. Returns a result per ticket id.
+    """
+    try:
+        data = json.loads(request.body)
+    except json.JSONDecodeError:
+        logger.error("Invalid JSON format in manager_bulk_status_update")
+        return JsonResponse({'status': 'error', 'message': 'Invalid JSON format', 'data': None}, status=400)
+
+    manager = get_profile(request).manager
+    ticket_ids = data.get('ticket_ids')
+    manager_status = data.get('manager_status')
+    feedback = data.get('feedback', '')
+
+    if not isinstance(ticket_ids, list) or not ticket_ids or not all(type(i) is int for i in ticket_ids):
+        return JsonResponse({'status': 'error', 'message': 'ticket_ids must be a non-empty list of ids', 'data': None}, status=400)
+    if len(ticket_ids) > BULK_DECISION_LIMIT:
+        return JsonResponse({'status': 'error', 'message': f'At most {BULK_DECISION_LIMIT} tickets per call', 'data': None}, status=400)
+    if manager_status not in MANAGER_STATUSES:
+        return JsonResponse({'status': 'error', 'message': f'Invalid status. Choose from {", ".join(MANAGER_STATUSES)}.', 'data': None}, status=400)
+
+    ticket_ids = list(dict.fromkeys(ticket_ids))
+    results = []
+    owned = []
+    with transaction.atomic():
+        # Locked so the counter deltas are computed from the rows being changed
+        tickets = {
+            row['id']: row
+            for row in Employee_Request.objects.select_for_update().filter(id__in=ticket_ids)
+            .values('id', 'employee_id', 'manager_id', 'manager_status', 'admin_status', 'admin_note', 'employee__email')
+        }
+        for ticket_id in ticket_ids:
+            if ticket_id not in tickets:
+                results.append({'ticket_id': ticket_id, 'status': 'not_found'})
+            elif tickets[ticket_id]['manager_id'] != manager.id:
+                results.append({'ticket_id': ticket_id, 'status': 'forbidden'})
+            else:
+                results.append({'ticket_id': ticket_id, 'status': 'updated'})
+                owned.append(ticket_id)
+
+        if owned:
+            Employee_Request.objects.filter(id__in=owned, manager=manager).update(
+                manager_status=manager_status, manager_note=feedback, updated_at=now())
+            log_changes(tickets[ticket_id] for ticket_id in owned)
+            publish_statuses({**tickets[ticket_id], 'manager_status': manager_status, 'manager_note': feedback}
+                             for ticket_id in owned)
+            deltas = None
+            for ticket_id in owned:
+                before = snapshot(tickets[ticket_id])
+                deltas = record_change(before, {**before, 'manager_status': manager_status}, deltas)
+            apply_deltas(deltas)
+            enqueue_mails(
+                ('Travel Request Status Update',
+                 f'Your travel request with ID {ticket_id} has been updated to {manager_status}.',
+                 'manager@example.com',
+                 [tickets[ticket_id]['employee__email']])
+                for ticket_id in owned
+            )
+
+    logger.info(f"Manager {manager.id} set {len(owned)} of {len(ticket_ids)} tickets to {manager_status}")
+    return JsonResponse({'status': 'success', 'data': {'updated': len(owned), 'results': results}}, status=200)
+
+
+@query_budget(3)
 @api_view(['POST'])
 @permission_classes([AllowAny])
+@throttle_classes(LOGIN_THROTTLES)
 def admin_login(request):
     """
     Authenticate an admin and return a token if credentials are valid.
@@ -343,12 +600,12 @@ def admin_login(request):
                 admin_user = Admin.objects.get(user_auth=user, is_admin=True)
 
                 # Generate or get authentication token
-                token, created = Token.objects.get_or_create(user=user)
+                token = issue_token(user, 'admin')
                 logger.info(f"Admin {user.username} logged in successfully.")
 
                 return Response({
                     'status': 'success',
-                    'token': token.key
+                    'token': token
                 }, status=200)
 
             except Admin.DoesNotExist:
@@ -361,16 +618,22 @@ def admin_login(request):
     return Response({'status': 'failed', 'message': 'Invalid request method'}, status=400)
 
 # Admin Dashboard
+@query_budget(3)
 @api_view(['GET'])
 @permission_classes([IsAuthenticated, IsAdminUser])
+@throttle_classes([DashboardThrottle])
+@replica_reads
 def admin_dashboard(request):
     history_list = Employee_Request.objects.select_related("employee", "manager").all()
-    serializer = AdminTableSerializer(history_list, many=True)
+    archived = ArchivedRequest.objects.select_related("employee", "manager").all()
+    response = table_page(request, history_list, AdminTableSerializer, ADMIN_TABLE, 'admin_dashboard',
+                          archived=archived)
     logger.info(f"Admin {request.user.username} accessed the dashboard.")
-    return Response(serializer.data, status=HTTP_200_OK)
+    return response
 
 
 
+@query_budget(4)
 @api_view(["POST"])
 @permission_classes([IsAdminUser])
 def add_manager(request):
@@ -420,6 +683,7 @@ def add_manager(request):
 
 
 # Edit Manager
+@query_budget(3)
 @api_view(["PUT"])
 @permission_classes([IsAdminUser])
 def edit_manager(request, manager_id):
@@ -444,6 +708,7 @@ def edit_manager(request, manager_id):
     return Response({'status': 'failed', 'message': serializer.errors}, status=status.HTTP_400_BAD_REQUEST)
 
 # Delete Manager
+@query_budget(15)
 @api_view(["DELETE"])
 @permission_classes([IsAdminUser])
 def delete_manager(request, manager_id):
@@ -459,6 +724,7 @@ def delete_manager(request, manager_id):
         return Response({'status': 'failed', 'message': 'Manager not found'}, status=status.HTTP_404_NOT_FOUND)
 
 
+@query_budget(4)
 @api_view(["POST"])
 @permission_classes([IsAdminUser])
 def add_employee(request):
@@ -512,7 +778,43 @@ def add_employee(request):
         logger.error(f"Error adding employee: {str(e)}")
         return Response({'status': 'failed', 'message': str(e)}, status=500)
 
+@query_budget(9)
+@api_view(["POST"])
+@permission_classes([IsAuthenticated, IsAdminUser])
+def import_people_csv(request):
+    """
+    Bulk-create employees or managers from an uploaded CSV ``file``.
+
+    ``kind`` is employee or manager; ``dry_run=true`` only validates. Rows
+    with errors are reported by line number and the rest are imported.
+
+    The import runs inside the request, so files over settings.IMPORT_MAX_BYTES
+    or IMPORT_MAX_ROWS get a 413; `manage.py import_people` takes those.
+    """
+    kind = request.data.get('kind')
+    upload = request.FILES.get('file')
+    if kind not in IMPORT_KINDS or upload is None:
+        return Response({'status': 'failed', 'message': 'kind (employee or manager) and file are required'}, status=400)
+    max_rows = getattr(settings, 'IMPORT_MAX_ROWS', 25)
+    max_bytes = getattr(settings, 'IMPORT_MAX_BYTES', 256 * 1024)
+    too_large = (f'The endpoint imports at most {max_rows} rows ({max_bytes} bytes); '
+                 f'use `manage.py import_people` for larger files')
+    if upload.size > max_bytes:
+        return Response({'status': 'failed', 'message': too_large}, status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+    try:
+        rows = read_csv(upload.read().decode('utf-8-sig').splitlines())
+    except UnicodeDecodeError:
+        return Response({'status': 'failed', 'message': 'File must be UTF-8 CSV'}, status=400)
+    if len(rows) > max_rows:
+        return Response({'status': 'failed', 'message': too_large}, status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+
+    dry_run = str(request.data.get('dry_run', '')).lower() == 'true'
+    result = import_people(kind, rows, workers=getattr(settings, 'IMPORT_HASH_WORKERS', 0), dry_run=dry_run)
+    logger.info(f"Admin {request.user.username} imported {result['created']} {kind} rows, {len(result['errors'])} rejected.")
+    return Response({'status': 'success', 'data': result}, status=200)
+
 # Edit employee
+@query_budget(4)
 @api_view(["PUT"])
 @permission_classes([IsAdminUser])
 def edit_employee(request, employee_id):
@@ -537,6 +839,7 @@ def edit_employee(request, employee_id):
     return Response({'status': 'failed', 'message': serializer.errors}, status=status.HTTP_400_BAD_REQUEST)
 
 # Delete Employee
+@query_budget(14)
 @api_view(["DELETE"])
 @permission_classes([IsAdminUser])
 def delete_employee(request, employee_id):
@@ -553,6 +856,7 @@ def delete_employee(request, employee_id):
 
 
 # Admin Status Update
+@query_budget(8)
 @api_view(["POST"])
 @permission_classes([IsAdminUser])
 def admin_status_update(request):
@@ -564,67 +868,73 @@ def admin_status_update(request):
         status_update = data.get('status_update')  # Approved, Canceled, Pending
         feedback = data.get('feedback', '')  # Admin note
 
-        try:
-            ticket = Employee_Request.objects.get(id=ticket_id)
-        except Employee_Request.DoesNotExist:
-            logger.error(f"Request {ticket_id} not found.")
-            return JsonResponse({
-                'status': 'error',
-                'message': 'Request not found',
-                'data': None
-            }, status=404)
-
-        # Validate user role and permissions
-        if user_role == "Manager":
-            # Managers can only modify their own requests
-            if ticket.manager_id.id != int(user_id):
-                logger.warning(f"Unauthorized status update attempt by manager {user_id} for ticket {ticket_id}")
+        # Locked, so the counter deltas start from the row as it is now
+        with transaction.atomic():
+            try:
+                ticket = Employee_Request.objects.select_for_update().select_related("employee").get(id=ticket_id)
+            except Employee_Request.DoesNotExist:
+                logger.error(f"Request {ticket_id} not found.")
                 return JsonResponse({
                     'status': 'error',
-                    'message': 'Unauthorized: You can only update requests assigned to you',
+                    'message': 'Request not found',
+                    'data': None
+                }, status=404)
+
+            before = snapshot(ticket)
+
+            # Validate user role and permissions
+            if user_role == "Manager":
+                # Managers can only modify their own requests
+                if ticket.manager_id != int(user_id):
+                    logger.warning(f"Unauthorized status update attempt by manager {user_id} for ticket {ticket_id}")
+                    return JsonResponse({
+                        'status': 'error',
+                        'message': 'Unauthorized: You can only update requests assigned to you',
+                        'data': None
+                    }, status=403)
+                ticket.manager_status = status_update
+                ticket.manager_note = feedback  # Add manager feedback
+
+            elif user_role == "Admin":
+                # Admins can update any request
+                ticket.manager_status = status_update
+                ticket.admin_note = feedback  # Admin provides feedback
+        
+            else:
+                logger.error(f"Invalid role {user_role} provided.")
+                return JsonResponse({
+                    'status': 'error',
+                    'message': 'Invalid role. Only "Manager" or "Admin" allowed.',
                     'data': None
                 }, status=403)
-            ticket.manager_status = status_update
-            ticket.manager_note = feedback  # Add manager feedback
 
-        elif user_role == "Admin":
-            # Admins can update any request
-            ticket.manager_status = status_update
-            ticket.admin_note = feedback  # Admin provides feedback
-        
-        else:
-            logger.error(f"Invalid role {user_role} provided.")
-            return JsonResponse({
-                'status': 'error',
-                'message': 'Invalid role. Only "Manager" or "Admin" allowed.',
-                'data': None
-            }, status=403)
-
-        # Validate status input
-        valid_statuses = ["Approved", "Canceled", "Pending"]
-        if status_update not in valid_statuses:
-            logger.error(f"Invalid status {status_update} provided.")
-            return JsonResponse({
-                'status': 'error',
-                'message': 'Invalid status. Choose from Approved, Canceled, or Pending.',
-                'data': None
-            }, status=400)
+            # Validate status input
+            valid_statuses = ["Approved", "Canceled", "Pending"]
+            if status_update not in valid_statuses:
+                logger.error(f"Invalid status {status_update} provided.")
+                return JsonResponse({
+                    'status': 'error',
+                    'message': 'Invalid status. Choose from Approved, Canceled, or Pending.',
+                    'data': None
+                }, status=400)
 
-        ticket.save()
-        send_mail(
-            'Travel Request Status Update',
-            f'Your travel request with ID {ticket.id} has been updated to {status_update}.',
-            'indulekshmi@example.com',
-            [ticket.employee.email],
-            fail_silently=False,
-        )
+            ticket.save()
+            count_change(before, snapshot(ticket))
+            log_change(ticket)
+            publish_status(ticket)
+            enqueue_mail(
+                'Travel Request Status Update',
+                f'Your travel request with ID {ticket.id} has been updated to {status_update}.',
+                'indulekshmi@example.com',
+                [ticket.employee.email],
+            )
         logger.info(f"Status of ticket {ticket_id} updated to {status_update} by {user_role} {user_id}")
 
         return JsonResponse({
             'data': {
                 'ticket_id': ticket.id,
-                'employee_id': ticket.employee_id.id,
-                'manager_id': ticket.manager_id.id,
+                'employee_id': ticket.employee_id,
+                'manager_id': ticket.manager_id,
                 'manager_status': ticket.manager_status,
                 'manager_note': ticket.manager_note,
                 'admin_note': ticket.admin_note,  # Include admin note if updated
@@ -648,6 +958,7 @@ def admin_status_update(request):
         }, status=500)
 
 # Close Ticket
+@query_budget(10)
 @api_view(["POST"])
 @permission_classes([IsAdminUser])
 def close_ticket(request):
@@ -656,70 +967,76 @@ def close_ticket(request):
         ticket_id = data.get("ticket_id")
         admin_note = data.get("admin_note", "").strip()
 
-        # Ensure ticket exists
-        try:
-            ticket = Employee_Request.objects.get(id=ticket_id)
-        except Employee_Request.DoesNotExist:
-            logger.error(f"Ticket {ticket_id} not found.")
-            return JsonResponse({
-                "status": "error",
-                "message": "Ticket not found",
-                "data": None
-            }, status=404)
-
-        # Admin can only close requests that are approved by the manager
-        if ticket.manager_status != "Approved":
-            return JsonResponse({
-                "status": "error",
-                "message": "Only approved requests can be closed",
-                "data": {
-                    "ticket_id": ticket.id,
-                    "manager_status": ticket.manager_status,
-                    "admin_status": ticket.admin_status
-                }
-            }, status=400)
-
-        # If admin_status is already "Closed", allow updating the admin note
-        if ticket.admin_status == "Closed":
-            if not admin_note:
+        # Locked, so the counter deltas start from the row as it is now
+        with transaction.atomic():
+            # Ensure ticket exists
+            try:
+                ticket = Employee_Request.objects.select_for_update().select_related("employee").get(id=ticket_id)
+            except Employee_Request.DoesNotExist:
+                logger.error(f"Ticket {ticket_id} not found.")
                 return JsonResponse({
                     "status": "error",
-                    "message": "Admin note is required for closed tickets",
+                    "message": "Ticket not found",
                     "data": None
+                }, status=404)
+
+            # Admin can only close requests that are approved by the manager
+            if ticket.manager_status != "Approved":
+                return JsonResponse({
+                    "status": "error",
+                    "message": "Only approved requests can be closed",
+                    "data": {
+                        "ticket_id": ticket.id,
+                        "manager_status": ticket.manager_status,
+                        "admin_status": ticket.admin_status
+                    }
                 }, status=400)
-            ticket.admin_note = admin_note
+
+            # If admin_status is already "Closed", allow updating the admin note
+            if ticket.admin_status == "Closed":
+                if not admin_note:
+                    return JsonResponse({
+                        "status": "error",
+                        "message": "Admin note is required for closed tickets",
+                        "data": None
+                    }, status=400)
+                ticket.admin_note = admin_note
+                ticket.save()
+                log_change(ticket)
+                publish_status(ticket)
+                return JsonResponse({
+                    "status": "success",
+                    "message": "Admin note updated for closed ticket",
+                    "data": {
+                        "ticket_id": ticket.id,
+                        "admin_status": ticket.admin_status,
+                        "admin_note": ticket.admin_note
+                    }
+                }, status=200)
+
+            # Otherwise, close the ticket
+            before = snapshot(ticket)
+            ticket.admin_status = "Closed"
+            ticket.admin_note = admin_note if admin_note else "No additional notes."
             ticket.save()
-            return JsonResponse({
-                "status": "success",
-                "message": "Admin note updated for closed ticket",
-                "data": {
-                    "ticket_id": ticket.id,
-                    "admin_status": ticket.admin_status,
-                    "admin_note": ticket.admin_note
-                }
-            }, status=200)
-
-        # Otherwise, close the ticket
-        ticket.admin_status = "Closed"
-        ticket.admin_note = admin_note if admin_note else "No additional notes."
-        ticket.save()
-        
-        # Send email notification
-        send_mail(
-            "Travel Request Closed",
-            f"Your travel request with ID {ticket.id} has been closed. Note: {ticket.admin_note}",
-            "admin@example.com",
-            [ticket.employee.email],            
-            fail_silently=False,
-        )
+            count_change(before, snapshot(ticket))
+            log_change(ticket)
+            publish_status(ticket)
+            # Queue the email notification, sent by the send_outbox worker
+            enqueue_mail(
+                "Travel Request Closed",
+                f"Your travel request with ID {ticket.id} has been closed. Note: {ticket.admin_note}",
+                "admin@example.com",
+                [ticket.employee.email],
+            )
 
         return JsonResponse({
             "status": "success",
             "message": "Ticket closed successfully",
             "data": {
                 "ticket_id": ticket.id,
-                "employee_id": ticket.employee.id,
-                "manager_id": ticket.manager.id,
+                "employee_id": ticket.employee_id,
+                "manager_id": ticket.manager_id,
                 "manager_status": ticket.manager_status,
                 "admin_status": ticket.admin_status,
                 "admin_note": ticket.admin_note
@@ -743,20 +1060,23 @@ def close_ticket(request):
 
 
 
+# Served from the versioned list cache, filled from the primary so a fill
+# can't store replica-lagged rows under a new version
+@query_budget(2)
 @api_view(['GET'])
 @permission_classes([IsAdminUser])
 def list_employees(request):
-    employees = Employee.objects.all().values('id', 'first_name', 'last_name', 'email')
     logger.info("Admin accessed the list of employees.")
-    return Response({"employees": list(employees)})
+    return cached_list_response(request, "employees")
 
+@query_budget(2)
 @api_view(['GET'])
 @permission_classes([IsAdminUser])
 def list_managers(request):
-    managers = Manager.objects.all().values('id', 'first_name', 'last_name', 'email')
     logger.info("Admin accessed the list of managers.")
-    return Response({"managers": list(managers)})
+    return cached_list_response(request, "managers")
 
+@query_budget(3)
 @csrf_exempt
 @api_view(["POST"])
 @permission_classes([AllowAny])
@@ -812,6 +1132,7 @@ def add_admin(request):
             'message': str(e)
         }, status=500)
 
+@query_budget(2)
 @csrf_exempt
 @api_view(['POST'])
 def user_logout(request):
@@ -820,7 +1141,11 @@ def user_logout(request):
     Log out the user and delete their authentication token.
     """
     if request.method == 'POST':
-        request.user.auth_token.delete()
+        if isinstance(request.auth, dict):
+            # Signed token: nothing stored to delete, so revoke it until it expires
+            revoked_tokens.revoke(request.auth['jti'], request.auth['exp'])
+        else:
+            request.user.auth_token.delete()
         logout(request)
         logger.info("User logged out successfully")
         return JsonResponse({'status': 'success', 'message': 'Logged out successfully'})
@@ -3,6 +3,11 @@ ASGI config for Travel_Request project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Serve the project with it (e.g. ``uvicorn Travel_Request.asgi:application``)
+for the travel/async/ views; the travel/async/events/ stream holds a
+connection open per client, which only an ASGI server handles without a
+thread each.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/4.2/howto/deployment/asgi/
 """
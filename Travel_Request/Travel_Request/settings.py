@@ -44,12 +44,15 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'Travel_App.metrics.RequestMetricsMiddleware',
+    'Travel_App.budgets.QueryBudgetMiddleware',  # DEBUG only
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'Travel_App.routers.ReadYourWritesMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -80,15 +83,31 @@ WSGI_APPLICATION = 'Travel_Request.wsgi.application'
 
 DATABASES = {
      'default': {
-        'ENGINE': 'django.db.backends.mysql',
+        # django.db.backends.mysql with a connection pool, see Travel_App/backends
+        'ENGINE': 'Travel_App.backends.mysql',
         'NAME': 'travel_request', #Name of the database created for this project
         'USER': 'root', #Enter your mysql username
         'PASSWORD': '', #Enter your mysql password
         'HOST': 'localhost',
         'PORT': '3306',
+        'POOL': {
+            'MIN_SIZE': 2,
+            'MAX_SIZE': 10,
+            'MAX_LIFETIME': 1800,  # seconds
+            'TIMEOUT': 5,  # seconds to wait for a free connection
+        },
     }
 }
 
+# Optional read replica for the dashboard and search reads; see
+# Travel_App/routers.py. Add a 'replica' entry (same engine, pointing at the
+# replica host) to enable it. Locally two SQLite files work as well.
+# After a user's own write their reads stay on the primary for
+# READ_YOUR_WRITES_SECONDS.
+DATABASE_ROUTERS = ['Travel_App.routers.ReadReplicaRouter']
+READ_REPLICA_ALIAS = 'replica'
+READ_YOUR_WRITES_SECONDS = 5
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
@@ -133,14 +152,99 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework.authentication.TokenAuthentication',
+        'Travel_App.authentication.SignedTokenAuthentication',
+        'Travel_App.authentication.ProfileTokenAuthentication',
         
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
     ),
+    # Proxies in front of the app that append to X-Forwarded-For. With 0 the
+    # login_ip bucket keys on REMOTE_ADDR; otherwise a client could send a new
+    # X-Forwarded-For with every attempt
+    'NUM_PROXIES': 0,
+    # Token bucket rates, see Travel_App/throttling.py
+    'DEFAULT_THROTTLE_RATES': {
+        'login_ip': '30/min',
+        'login_user': '5/min',
+        'dashboard': '120/min',
+    },
 }
 
+# Where throttle buckets live. CacheBucketStore uses the THROTTLE_CACHE alias
+# (point it at a shared cache such as Redis with several workers);
+# LocMemBucketStore keeps them in the process.
+THROTTLE_BUCKET_STORE = 'Travel_App.throttling.CacheBucketStore'
+THROTTLE_CACHE = 'default'
+
+# Issue HMAC-signed tokens from the login views instead of DRF Token rows.
+# Signed tokens are verified without a database query; see Travel_App/authentication.py
+SIGNED_AUTH_TOKENS = False
+SIGNED_TOKEN_TTL = 8 * 60 * 60  # seconds
+
+# Endpoints that render their table straight from .values() instead of the
+# DRF serializer (same JSON shape); see Travel_App/projections.py. Opt in one
+# at a time: 'admin_dashboard', 'manager_dashboard', 'employee_dashboard'
+FAST_TABLE_ENDPOINTS = []
+
+# Seconds request_facets keeps the counts for one filter combination
+FACET_CACHE_TTL = 30
+
+# The import_people endpoint imports inside the request: files over these
+# limits get a 413 (use `manage.py import_people`), and passwords are hashed
+# on IMPORT_HASH_WORKERS processes (0: in the web worker, no pool forked)
+IMPORT_MAX_ROWS = 25
+IMPORT_MAX_BYTES = 256 * 1024
+IMPORT_HASH_WORKERS = 0
+
+# Threads the async login views hash passwords on (Travel_App/async_views.py)
+ASYNC_HASH_WORKERS = 4
+
+# Request metrics (Travel_App/metrics.py): Server-Timing headers on every
+# response, and the addresses allowed to scrape /metrics
+METRICS_SERVER_TIMING = True
+METRICS_ALLOWED_IPS = ['127.0.0.1', '::1']
+
+# In DEBUG, raise instead of logging when a request runs more queries than
+# its view's @query_budget (Travel_App/budgets.py)
+QUERY_BUDGET_RAISE = False
+
+# Cache alias for the list_employees/list_managers responses
+# (Travel_App/list_cache.py); use a shared cache with several workers.
+# Seconds a rendered list is kept (its version key never expires)
+LIST_CACHE = 'default'
+LIST_CACHE_TTL = 300
+
+# Closed requests submitted more than ARCHIVE_AFTER_DAYS ago are moved to the
+# archive table by `manage.py archive_requests`, ARCHIVE_CHUNK_SIZE per
+# transaction (Travel_App/archive.py)
+ARCHIVE_AFTER_DAYS = 365
+ARCHIVE_CHUNK_SIZE = 500
+
+# travel_calendar/travel_occupancy (Travel_App/occupancy.py): the longest
+# window one request may ask for, and seconds the longest trip on record is cached
+CALENDAR_MAX_DAYS = 366
+TRIP_BOUND_TTL = 300
+
+# Delta sync (Travel_App/changes.py): entries per changes?since= response,
+# seconds before a change is safe to move the cursor past (longer than any
+# write transaction), and days of changes kept by prune_request_changes
+CHANGES_PAGE_SIZE = 500
+CHANGES_SETTLE_SECONDS = 10
+CHANGES_RETENTION_DAYS = 7
+
+# Live ticket events (Travel_App/events.py): the broker class, events kept per
+# channel for Last-Event-ID replay, events a slow client may fall behind
+# before its stream is ended, seconds between keep-alives, seconds before a
+# stream ends and the client reconnects, and the reconnect delay sent to it;
+# InMemoryBroker only reaches streams in the same process
+EVENTS_BROKER = 'Travel_App.events.InMemoryBroker'
+EVENTS_HISTORY = 1000
+EVENTS_QUEUE_SIZE = 100
+EVENTS_HEARTBEAT_SECONDS = 15
+EVENTS_STREAM_SECONDS = 300
+EVENTS_RETRY_MS = 3000
+
 CORS_ALLOW_ALL_ORIGINS = True  # Not recommended for production
 
 # Looking to send emails in production? Check out our Email API/SMTP product!
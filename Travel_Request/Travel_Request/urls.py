@@ -1,5 +1,7 @@
 from django.urls import path,include
+from Travel_App.metrics import metrics
 
 urlpatterns = [
     path('travel/',include('Travel_App.urls')),
+    path('metrics', metrics),
 ]
\ No newline at end of file